@@ -0,0 +1,81 @@
+import json
+import os
+
+from Drive_Test_Ingest import project_dir
+from Problem_Rules import load_problem_rules
+
+# Settings written by the backend (Set KPI Thresholds page, /run-analysis), including the incremental mode switch
+THRESHOLDS_PATH = os.path.join(project_dir, "thresholds.json")
+
+# Default values of the analysis thresholds that are not thresholds of the problem rules (Problem_Rules.json)
+ANALYSIS_DEFAULTS = {
+    'MIN_NUM_SAMPLES': 7,
+    'MAX_NUM_SAMPLES': 15,
+    'MAX_DISTANCE': 500,
+    'MAX_UE_TRANSMIT_POWER': 20,
+    'MIN_RSRQ': -18
+}
+
+# Keys of thresholds.json (Set KPI Thresholds page, /run-analysis) and the threshold each one sets
+THRESHOLD_FILE_KEYS = {
+    'min': 'MIN_NUM_SAMPLES',
+    'max': 'MAX_NUM_SAMPLES',
+    'throughput': 'TARGET_THROUGHPUT',
+    'rsrp': 'TARGET_RSRP',
+    'rsrq': 'MIN_RSRQ',
+    'sinr': 'MIN_SINR',
+    'ue': 'MAX_UE_TRANSMIT_POWER',
+    'handover': 'MIN_SERVING_RSRP',
+    'distance': 'MAX_DISTANCE',
+    'overlap': 'MAX_RSRP_OVERLAP_RANGE',
+    'prb': 'PRB_Utilization_Threshold',
+    'rsrp_neighbor_difference': 'RSRP_NEIGHBOUR_DIFFERENCE'
+}
+
+# Thresholds of the preprocessing (HTTP filtering, cell join, distance/power check and spot segmentation);
+# the other thresholds only change the problem detection
+PREPROCESS_THRESHOLDS = ['TARGET_THROUGHPUT', 'MIN_NUM_SAMPLES', 'MAX_NUM_SAMPLES', 'MAX_DISTANCE', 'MAX_UE_TRANSMIT_POWER']
+
+# Thresholds counted in samples
+INTEGER_THRESHOLDS = ['MIN_NUM_SAMPLES', 'MAX_NUM_SAMPLES']
+
+# Function to convert a saved threshold (number or text from the GUI) to a number, whole numbers as int
+def _to_number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+# Function to load the thresholds of the analysis
+def load_analysis_thresholds(rules=None, thresholds_path=THRESHOLDS_PATH):
+    """
+    Starts from ANALYSIS_DEFAULTS and the thresholds of the problem rules,
+    then applies the values saved in thresholds.json. A missing file keeps
+    the defaults, and so does a value that is not a number.
+
+    Parameters:
+        rules (ProblemRules): Problem rules of the analysis (default: load_problem_rules()).
+        thresholds_path (str): Path of the saved thresholds.
+
+    Returns:
+        dict: Value of each threshold, by constant name.
+    """
+    rules = rules or load_problem_rules()
+    thresholds = {**ANALYSIS_DEFAULTS, **rules.thresholds}
+    if not os.path.exists(thresholds_path):
+        return thresholds
+    try:
+        with open(thresholds_path) as f:
+            saved = json.load(f)
+    except (ValueError, OSError):
+        print(f"Warning: {thresholds_path} could not be read, the default thresholds are used.")
+        return thresholds
+
+    for key, name in THRESHOLD_FILE_KEYS.items():
+        if key not in saved:
+            continue
+        try:
+            value = _to_number(saved[key])
+        except (TypeError, ValueError):
+            print(f"Warning: invalid value {saved[key]!r} for '{key}' in {thresholds_path}, {thresholds[name]} is used.")
+            continue
+        thresholds[name] = int(round(value)) if name in INTEGER_THRESHOLDS else value
+    return thresholds
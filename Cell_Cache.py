@@ -0,0 +1,133 @@
+import os
+import pandas as pd
+
+from Drive_Test_Ingest import CACHE_DIR, PARQUET_AVAILABLE, compute_file_hash, project_dir
+
+# Parquet copies of the uploaded cell files, stored under their content hash
+CELL_CACHE_DIR = os.path.join(CACHE_DIR, "Cell")
+
+# Cell file uploaded by the user
+CELL_FILE_PATH = os.path.join(project_dir, "Uploaded_Cell.xlsx")
+
+# Columns of the cell file converted to numbers (text that is not a number becomes NaN)
+CELL_NUMERIC_COLUMNS = ['eNodeB id', 'PCI', 'DLARFCN', 'AZIMUTH', 'Latitude', 'Longitude']
+
+# Sector suffixes of the L2600 cells renamed to the sector numbering of the other bands (e.g. L26_X_11 -> L26_X_01)
+L26_SECTOR_SUFFIXES = {'_11': '_01', '_12': '_02', '_13': '_03', '_14': '_04'}
+
+# Version of the cached cell artifact, increased when the columns derived at ingest change
+CELL_CACHE_VERSION = 2
+
+# Content hash of the cell files already hashed by this process, per (path, size, modification time)
+_file_hashes = {}
+
+# Function to convert the key columns of the cell file to numbers
+def normalize_cell_columns(df):
+    for col in CELL_NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+# Function to add the normalized sector keys used to match the bands of a sector
+def add_sector_keys(df, name_column='CellNAME'):
+    """
+    Adds 'modified_CellName' (L2600 sector suffixes renamed) and
+    'CellNAME_Lookup' (modified name without its band prefix, e.g. L1214_03
+    for L21_L1214_03): the cells of the same sector share the lookup key.
+    Names that are not text are kept as they are.
+
+    Parameters:
+        df (pd.DataFrame): Cell data with a cell name column.
+        name_column (str): Name of the cell name column.
+
+    Returns:
+        pd.DataFrame: The same data with the two key columns added.
+    """
+    names = df[name_column]
+    if names.dtype != object:
+        df['modified_CellName'] = names
+        df['CellNAME_Lookup'] = names
+        return df
+
+    is_text = names.map(lambda name: isinstance(name, str)).astype(bool)
+    renamed = is_text & names.str.startswith('L26_', na=False) & names.str[-3:].isin(list(L26_SECTOR_SUFFIXES))
+    modified = names.where(~renamed, names.str[:-3] + names.str[-3:].map(L26_SECTOR_SUFFIXES))
+    has_prefix = is_text & modified.str.contains('_', regex=False, na=False)
+    df['modified_CellName'] = modified
+    df['CellNAME_Lookup'] = modified.where(~has_prefix, modified.str.partition('_')[2])
+    return df
+
+# Function to normalize a cell file read from the workbook
+def prepare_cell_file(df):
+    df = normalize_cell_columns(df)
+    if 'CellNAME' in df.columns:
+        df = add_sector_keys(df)
+    return df
+
+# Function to hash a cell file, once per version of the file in this process
+def get_cell_file_hash(cell_path):
+    stat = os.stat(cell_path)
+    key = (os.path.abspath(cell_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        _file_hashes[key] = compute_file_hash(cell_path)
+    return _file_hashes[key]
+
+# Function to get the cached Parquet path of a cell file
+def get_cell_cache_path(file_hash):
+    return os.path.join(CELL_CACHE_DIR, f"{file_hash}.v{CELL_CACHE_VERSION}.parquet")
+
+# Function to convert an uploaded cell file into the Parquet cache (parsed only once per content)
+def ingest_cell_file(cell_path=CELL_FILE_PATH, file_hash=None):
+    """
+    Converts an uploaded cell workbook into a Parquet file with normalized
+    numeric columns and sector keys, stored under its content hash. A cell
+    file already ingested is not parsed again.
+
+    Parameters:
+        cell_path (str): Path of the uploaded cell workbook.
+        file_hash (str): Content hash of the file when already known (e.g. computed while uploading).
+
+    Returns:
+        str: Path of the cached Parquet file, or None if it cannot be written (Parquet support not
+            installed, or columns mixing numbers and text that Parquet cannot store).
+    """
+    if not PARQUET_AVAILABLE:
+        return None
+
+    parquet_path = get_cell_cache_path(file_hash or get_cell_file_hash(cell_path))
+    if os.path.exists(parquet_path):
+        return parquet_path
+
+    cells = prepare_cell_file(pd.read_excel(cell_path))
+
+    # Write to a temporary file first so an interrupted run never leaves a partial cache entry
+    os.makedirs(CELL_CACHE_DIR, exist_ok=True)
+    tmp_path = parquet_path + ".tmp"
+    try:
+        cells.to_parquet(tmp_path, index=False)
+    except (ValueError, TypeError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+# Function to load the cell file through the Parquet cache
+def load_cell_file(cell_path=CELL_FILE_PATH, columns=None):
+    """
+    Loads a cell file with its key columns converted to numbers and its
+    sector keys (see add_sector_keys), reading the cached Parquet copy when
+    available instead of parsing the workbook.
+
+    Parameters:
+        cell_path (str): Path of the uploaded cell workbook.
+        columns (list): Optional subset of columns to read.
+
+    Returns:
+        pd.DataFrame: The cell data.
+    """
+    parquet_path = ingest_cell_file(cell_path)
+    if parquet_path is None:
+        cells = prepare_cell_file(pd.read_excel(cell_path))
+        return cells[columns] if columns is not None else cells
+    return pd.read_parquet(parquet_path, columns=columns)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+# Function to convert identity values (PCI, EARFCN, eNodeB id) to float64 keys
+def _as_keys(values):
+    values = pd.Series(values)
+    try:
+        return values.astype('float64').to_numpy()
+    except (TypeError, ValueError):
+        return pd.to_numeric(values, errors='coerce').astype('float64').to_numpy()
+
+class CellIndex:
+    """
+    Hash index over the cell file, built once per file so that the site
+    position, serving cell name and azimuth of all drive-test samples are
+    looked up with vectorized joins instead of a scan of the whole cell
+    table per sample.
+
+    As with the row-by-row lookups it replaces, the first row of the cell
+    file matching a key wins and samples with a missing key get no match.
+    """
+    def __init__(self, data_Enode):
+        # Site position per eNodeB id
+        enb_ids = _as_keys(data_Enode['eNodeB id'])
+        first_site = ~pd.Index(enb_ids).duplicated() & ~np.isnan(enb_ids)
+        self.site_index = pd.Index(enb_ids[first_site])
+        self.site_latitudes = data_Enode['Latitude'].to_numpy()[first_site]
+        self.site_longitudes = data_Enode['Longitude'].to_numpy()[first_site]
+
+        # Cell name per (PCI, DLARFCN, eNodeB id)
+        if {'PCI', 'DLARFCN', 'CellNAME'}.issubset(data_Enode.columns):
+            keys = [_as_keys(data_Enode['PCI']), _as_keys(data_Enode['DLARFCN']), enb_ids]
+            cell_keys = pd.MultiIndex.from_arrays(keys)
+            first_cell = ~cell_keys.duplicated() & ~np.isnan(np.column_stack(keys)).any(axis=1)
+            self.cell_index = cell_keys[first_cell]
+            self.cell_rows = data_Enode.index.to_numpy()[first_cell]
+            self.cell_names = data_Enode['CellNAME'].to_numpy()[first_cell]
+            if 'AZIMUTH' in data_Enode.columns:
+                self.cell_azimuths = _as_keys(data_Enode['AZIMUTH'])[first_cell]
+            else:
+                self.cell_azimuths = np.full(len(self.cell_index), np.nan)
+        else:
+            self.cell_index = None
+
+    # Function to get the latitude and longitude of the site of each eNodeB id
+    def get_site_coordinates(self, enb_ids):
+        """
+        Parameters:
+            enb_ids (array-like): 'Cell Identity (eNB Part)' of the samples.
+
+        Returns:
+            tuple: (latitudes, longitudes) arrays, NaN for an unknown eNodeB id.
+        """
+        positions = self.site_index.get_indexer(_as_keys(enb_ids))
+        found = positions >= 0
+        latitudes = np.full(len(positions), np.nan)
+        longitudes = np.full(len(positions), np.nan)
+        latitudes[found] = self.site_latitudes[positions[found]]
+        longitudes[found] = self.site_longitudes[positions[found]]
+        return latitudes, longitudes
+
+    # Function to get the position of the serving cell of each sample in the cell index (-1 when unknown)
+    def _get_cell_positions(self, pcis, earfcns, enb_ids):
+        keys = [_as_keys(pcis), _as_keys(earfcns), _as_keys(enb_ids)]
+        if self.cell_index is None or not len(keys[0]):
+            return np.full(len(keys[0]), -1, dtype=np.intp)
+        positions = self.cell_index.get_indexer(pd.MultiIndex.from_arrays(keys))
+        positions[np.isnan(np.column_stack(keys)).any(axis=1)] = -1
+        return positions
+
+    # Function to get the name of the serving cell of each sample
+    def get_cell_names(self, pcis, earfcns, enb_ids):
+        """
+        Parameters:
+            pcis, earfcns, enb_ids (array-like): Serving PCI, DL EARFCN and eNodeB id of the samples.
+
+        Returns:
+            np.ndarray: Cell names (object array), "" for an unknown cell.
+        """
+        positions = self._get_cell_positions(pcis, earfcns, enb_ids)
+        names = np.full(len(positions), "", dtype=object)
+        found = positions >= 0
+        names[found] = self.cell_names[positions[found]]
+        return names
+
+    # Function to get the rows of the cell file serving any of the samples
+    def get_cell_rows(self, pcis, earfcns, enb_ids):
+        """
+        Returns:
+            np.ndarray: Sorted distinct index labels of data_Enode, for the serving cells found.
+        """
+        positions = self._get_cell_positions(pcis, earfcns, enb_ids)
+        return np.unique(self.cell_rows[positions[positions >= 0]]) if (positions >= 0).any() else np.zeros(0, dtype=np.int64)
+
+    # Function to get the azimuth of the serving cell of each sample
+    def get_cell_azimuths(self, pcis, earfcns, enb_ids):
+        """
+        Returns:
+            np.ndarray: Azimuths in degrees (float64), NaN for an unknown cell.
+        """
+        positions = self._get_cell_positions(pcis, earfcns, enb_ids)
+        azimuths = np.full(len(positions), np.nan)
+        found = positions >= 0
+        azimuths[found] = self.cell_azimuths[positions[found]]
+        return azimuths
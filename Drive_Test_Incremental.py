@@ -0,0 +1,242 @@
+import copy
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import pandas as pd
+
+from Analysis_Thresholds import THRESHOLDS_PATH
+from Drive_Test_Ingest import (CACHE_DIR, STREAM_CHUNK_SIZE, DriveTestStreamState, compute_file_hash,
+                               preprocess_stream_chunk, segment_stream_chunk)
+from Drive_Test_Schema import add_timestamp, apply_drive_test_schema
+
+# Saved state of the incremental runs, one folder per pipeline script
+INCREMENTAL_CACHE_DIR = os.path.join(CACHE_DIR, "Incremental")
+
+# Bytes compared at the start of the log and before the last offset to recognize an appended log (1 MB)
+FINGERPRINT_SIZE = 1024 * 1024
+
+# Function to check whether the incremental mode was requested for live drive tests
+def incremental_mode_enabled():
+    if not os.path.exists(THRESHOLDS_PATH):
+        return False
+    try:
+        with open(THRESHOLDS_PATH) as f:
+            return bool(json.load(f).get('incremental', False))
+    except (ValueError, OSError):
+        return False
+
+# Function to build the key of the settings an incremental run depends on
+def get_config_key(values, file_paths=()):
+    """
+    Hashes the thresholds and the content of the files (cell file, scripts, ...)
+    the results depend on. A saved incremental state is only resumed with the same key.
+    """
+    digest = hashlib.sha256(repr(values).encode())
+    for path in file_paths:
+        digest.update(compute_file_hash(path).encode() if os.path.exists(path) else b"-")
+    return digest.hexdigest()
+
+# Function to hash a byte range of a file
+def _hash_byte_range(file_path, start, end):
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(end - start)).hexdigest()
+
+# Function to find the end of the last complete line, ignoring a line the logger is still writing
+def _find_last_line_end(file_path):
+    with open(file_path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - FINGERPRINT_SIZE)
+            f.seek(start)
+            block = f.read(end - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+class ByteRangeReader:
+    """
+    Read-only binary file object over the bytes [start, end) of a file, so
+    pandas parses only the rows appended since the last run.
+    """
+    def __init__(self, file_path, start, end):
+        self.file = open(file_path, "rb")
+        self.file.seek(start)
+        self.remaining = end - start
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+class IncrementalDriveTest:
+    """
+    Processes a drive-test log that keeps growing between runs (live drive).
+
+    After each run it saves the byte offset of the last complete line and
+    the stream state (filled cell identity, HTTP flag and open spot segment),
+    so the next run only parses and divides the appended rows. Outputs are
+    appended instead of rewritten: the rows of the still-open spot are
+    written provisionally and replaced by the next run.
+    """
+    def __init__(self, name, csv_path, target_throughput, min_num_samples, max_num_samples, config_key=""):
+        self.csv_path = csv_path
+        self.run_dir = os.path.join(INCREMENTAL_CACHE_DIR, name)
+        self.state_path = os.path.join(self.run_dir, "state.pkl")
+        self.target_throughput = target_throughput
+        self.min_num_samples = min_num_samples
+        self.max_num_samples = max_num_samples
+        self.params = (target_throughput, min_num_samples, max_num_samples, config_key)
+        self.end_offset = _find_last_line_end(csv_path)
+
+        saved = None
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "rb") as f:
+                saved = pickle.load(f)
+        self.resumed = saved is not None and self._can_resume(saved)
+
+        if self.resumed:
+            self.offset = saved['offset']
+            self.columns = saved['columns']
+            self.empty_columns = saved['empty_columns']
+            self.state = saved['stream_state']
+            self.output_sizes = saved['output_sizes']
+            self.output_columns = saved['output_columns']
+            self.frame_count = saved['frame_count']
+
+            # A column empty so far that gets values would change the preprocessing of the old rows too
+            appended_empty = self._find_empty_columns()
+            if appended_empty is not None and any(col not in appended_empty for col in self.empty_columns):
+                self.resumed = False
+
+        if not self.resumed:
+            shutil.rmtree(self.run_dir, ignore_errors=True)
+            self.offset = 0
+            self.columns = None
+            self.empty_columns = self._find_empty_columns() or []
+            self.state = DriveTestStreamState()
+            self.output_sizes = {}
+            self.output_columns = {}
+            self.frame_count = 0
+        os.makedirs(self.run_dir, exist_ok=True)
+
+        # Outputs already truncated back to their committed size in this run
+        self.opened_outputs = set()
+
+    # Function to check that the log is the saved one with rows appended
+    def _can_resume(self, saved):
+        if saved['params'] != self.params or saved['offset'] > self.end_offset:
+            return False
+        head_end = min(saved['offset'], FINGERPRINT_SIZE)
+        tail_start = max(0, saved['offset'] - FINGERPRINT_SIZE)
+        return (_hash_byte_range(self.csv_path, 0, head_end) == saved['head_hash']
+                and _hash_byte_range(self.csv_path, tail_start, saved['offset']) == saved['tail_hash'])
+
+    # Function to read the rows not processed yet, chunk by chunk
+    def _read_new_rows(self):
+        if self.offset >= self.end_offset:
+            return
+        reader = ByteRangeReader(self.csv_path, self.offset, self.end_offset)
+        try:
+            if self.columns is None:
+                chunks = pd.read_csv(reader, chunksize=STREAM_CHUNK_SIZE, low_memory=False)
+            else:
+                chunks = pd.read_csv(reader, chunksize=STREAM_CHUNK_SIZE, low_memory=False, header=None, names=self.columns)
+            for chunk in chunks:
+                yield chunk
+        finally:
+            reader.close()
+
+    # Function to find the columns with only null values in the rows not processed yet (None if there are none)
+    def _find_empty_columns(self):
+        has_values = None
+        for chunk in self._read_new_rows():
+            chunk_has_values = chunk.notna().any()
+            has_values = chunk_has_values if has_values is None else has_values | chunk_has_values
+        if has_values is None:
+            return None
+        return list(has_values.index[~has_values])
+
+    # Function to yield the new rows preprocessed and divided into closed spot areas
+    def chunks(self):
+        for chunk in self._read_new_rows():
+            if self.columns is None:
+                self.columns = list(chunk.columns)
+            chunk = add_timestamp(apply_drive_test_schema(chunk, categorical=False))
+            chunk = preprocess_stream_chunk(chunk, self.empty_columns, self.target_throughput, self.state)
+            ready = segment_stream_chunk(chunk, self.min_num_samples, self.max_num_samples, self.state)
+            if len(ready):
+                yield ready
+
+    # Function to get the rows of the still-open spot, divided as if the log ended here
+    def flush(self):
+        if self.state.pending is None or not len(self.state.pending):
+            return None
+        state = copy.deepcopy(self.state)
+        return segment_stream_chunk(state.pending.iloc[:0], self.min_num_samples, self.max_num_samples, state, final=True)
+
+    # Function to append rows to an output CSV
+    def write_output(self, output_path, frame, provisional=False):
+        """
+        Appends rows to an output CSV. Rows written provisionally in the
+        previous run are removed first; provisional rows of this run must be
+        written after all its final rows.
+        """
+        if output_path not in self.opened_outputs:
+            committed_size = self.output_sizes.get(output_path, 0) if self.resumed else 0
+            if committed_size and os.path.exists(output_path) and os.path.getsize(output_path) >= committed_size:
+                with open(output_path, "r+b") as f:
+                    f.truncate(committed_size)
+            else:
+                self.output_sizes.pop(output_path, None)
+                self.output_columns.pop(output_path, None)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+            self.opened_outputs.add(output_path)
+
+        # Keep the columns of the existing header
+        header = output_path not in self.output_columns
+        if header:
+            self.output_columns[output_path] = list(frame.columns)
+        frame = frame.reindex(columns=self.output_columns[output_path])
+        frame.to_csv(output_path, index=False, mode='a', header=header)
+
+        if not provisional:
+            self.output_sizes[output_path] = os.path.getsize(output_path)
+
+    # Function to keep a frame of final rows for the next runs
+    def save_frame(self, frame):
+        frame.to_pickle(os.path.join(self.run_dir, f"frame_{self.frame_count:06d}.pkl"))
+        self.frame_count += 1
+
+    # Function to get the paths of the frames kept by this and the previous runs, to read them one at a time
+    def get_frame_paths(self):
+        return [os.path.join(self.run_dir, f"frame_{index:06d}.pkl") for index in range(self.frame_count)]
+
+    # Function to save the state reached by this run
+    def commit(self):
+        saved = {
+            'params': self.params,
+            'offset': self.end_offset,
+            'head_hash': _hash_byte_range(self.csv_path, 0, min(self.end_offset, FINGERPRINT_SIZE)),
+            'tail_hash': _hash_byte_range(self.csv_path, max(0, self.end_offset - FINGERPRINT_SIZE), self.end_offset),
+            'columns': self.columns,
+            'empty_columns': self.empty_columns,
+            'stream_state': self.state,
+            'output_sizes': self.output_sizes,
+            'output_columns': self.output_columns,
+            'frame_count': self.frame_count
+        }
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(saved, f)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,582 @@
+import gzip
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (needed by pandas for Parquet support)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from Drive_Test_Schema import TIMESTAMP_COLUMN, add_timestamp, apply_drive_test_schema, split_timestamp
+from Drive_Test_Utils import http_interval_mask
+
+# Cached artifacts live next to the uploaded files in the project root
+project_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(project_dir, "Cache")
+DRIVE_TEST_CACHE_DIR = os.path.join(CACHE_DIR, "Drive_Test")
+
+# Version of the cached drive-test Parquet files, increased whenever apply_drive_test_schema changes the stored dtypes
+# (2: radio KPIs back to float64 and PCIs/EARFCNs as integers)
+DRIVE_TEST_CACHE_VERSION = 2
+
+# Logs of a multi-file campaign, uploaded together instead of a single Uploaded_Test.csv
+CAMPAIGN_DIR = os.path.join(project_dir, "Uploaded_Tests")
+
+# Column tagging each sample of a campaign with the log it comes from
+SOURCE_LOG_COLUMN = 'Source_Log'
+
+# Size of the blocks read while hashing a file (8 MB)
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Accepted drive-test file suffixes; compressed files are kept as uploaded and decompressed while parsing
+DRIVE_TEST_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst', '.zip')
+
+# Typical compression ratio of drive-test exports, used to estimate the size of a gzip/zstd file
+COMPRESSION_RATIO_ESTIMATE = 10
+
+# Function to get the accepted suffix of an uploaded file name
+def get_file_suffix(file_name, suffixes=DRIVE_TEST_SUFFIXES):
+    file_name = file_name.lower()
+    matches = [suffix for suffix in suffixes if file_name.endswith(suffix)]
+    return max(matches, key=len) if matches else None
+
+# Function to find the uploaded drive-test file, whatever its compression
+def find_drive_test_file(directory, base_name="Uploaded_Test"):
+    """
+    Finds the drive-test file uploaded as base_name with one of the accepted
+    suffixes (plain, gzip, zstd or zip CSV).
+
+    Returns:
+        str: Path of the uploaded file, or of base_name.csv if none exists.
+    """
+    for suffix in DRIVE_TEST_SUFFIXES:
+        path = os.path.join(directory, base_name + suffix)
+        if os.path.exists(path):
+            return path
+    return os.path.join(directory, base_name + ".csv")
+
+# Function to open a compressed file as a stream of its decompressed content
+def open_decompressed(file_obj, file_name):
+    """
+    Wraps a (possibly compressed) binary file object so that its content is
+    decompressed while it is read, without writing the decompressed file.
+
+    Parameters:
+        file_obj: Binary file object of the compressed file (must be seekable for zip files).
+        file_name (str): Name of the file, its suffix selects the compression.
+
+    Returns:
+        tuple: (binary file object of the decompressed content, name of the decompressed file).
+    """
+    lower_name = file_name.lower()
+    if lower_name.endswith('.gz'):
+        return gzip.GzipFile(fileobj=file_obj), file_name[:-3]
+    if lower_name.endswith('.zst'):
+        if not ZSTD_AVAILABLE:
+            raise ImportError("The zstandard package is required to read .zst files")
+        return zstandard.ZstdDecompressor().stream_reader(file_obj), file_name[:-4]
+    if lower_name.endswith('.zip'):
+        archive = zipfile.ZipFile(file_obj)
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        if not members:
+            raise ValueError(f"{file_name} contains no file")
+        return archive.open(members[0]), os.path.basename(members[0].filename)
+    return file_obj, file_name
+
+# Function to estimate the decompressed size of a drive-test file
+def estimate_uncompressed_size(file_path):
+    if file_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(file_path) as archive:
+            return sum(info.file_size for info in archive.infolist())
+    if file_path.lower().endswith(('.gz', '.zst')):
+        return os.path.getsize(file_path) * COMPRESSION_RATIO_ESTIMATE
+    return os.path.getsize(file_path)
+
+# Function to compute the content hash of a file without loading it at once
+def compute_file_hash(file_path):
+    """
+    Computes the SHA-256 hash of a file, reading it block by block.
+
+    Parameters:
+        file_path (str): Path of the file to hash.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Function to save an uploaded stream to disk block by block while hashing it
+def save_stream_with_hash(stream, file_path):
+    """
+    Writes a binary stream (e.g. an uploaded file) to disk in blocks and
+    computes its SHA-256 hash on the way, so the file is neither held in
+    memory nor read a second time to be hashed.
+
+    Parameters:
+        stream: Binary file object to save.
+        file_path (str): Destination path, replaced only once the whole stream is written.
+
+    Returns:
+        str: Hex digest of the saved content.
+    """
+    digest = hashlib.sha256()
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+            f.write(block)
+    os.replace(tmp_path, file_path)
+    return digest.hexdigest()
+
+# Function to get the cached Parquet path of a drive-test file
+def get_drive_test_cache_path(file_hash):
+    return os.path.join(DRIVE_TEST_CACHE_DIR, f"{file_hash}.v{DRIVE_TEST_CACHE_VERSION}.parquet")
+
+# Function to convert a drive-test CSV into the Parquet cache (parsed only once per content)
+def ingest_drive_test(csv_path):
+    """
+    Converts an uploaded drive-test CSV into a compressed Parquet file stored
+    under its content hash. If the same content was already ingested, the
+    existing file is reused and the CSV is not parsed again.
+
+    Parameters:
+        csv_path (str): Path of the uploaded drive-test CSV.
+
+    Returns:
+        str: Path of the cached Parquet file, or None if Parquet support is not installed.
+    """
+    if not PARQUET_AVAILABLE:
+        return None
+
+    parquet_path = get_drive_test_cache_path(compute_file_hash(csv_path))
+    if os.path.exists(parquet_path):
+        return parquet_path
+
+    data = add_timestamp(apply_drive_test_schema(pd.read_csv(csv_path, low_memory=False)))
+
+    # Write to a temporary file first so an interrupted run never leaves a partial cache entry
+    # (one per writer: concurrent runs may ingest the same content at the same time)
+    os.makedirs(DRIVE_TEST_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(parquet_path) + ".", suffix=".tmp", dir=DRIVE_TEST_CACHE_DIR)
+    os.close(fd)
+    try:
+        data.to_parquet(tmp_path, index=False, compression="zstd")
+        os.replace(tmp_path, parquet_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return parquet_path
+
+# Function to load a drive-test file through the Parquet cache
+def load_drive_test(csv_path, columns=None):
+    """
+    Loads a drive-test file, reading the cached Parquet copy when available,
+    with the compact dtypes of the drive-test schema and the parsed timestamp.
+
+    Parameters:
+        csv_path (str): Path of the uploaded drive-test CSV.
+        columns (list): Optional subset of columns to read; the others are never loaded.
+
+    Returns:
+        pd.DataFrame: The drive-test data.
+    """
+    parquet_path = ingest_drive_test(csv_path)
+    if parquet_path is None:
+        return add_timestamp(apply_drive_test_schema(pd.read_csv(csv_path, usecols=columns, low_memory=False)))
+
+    return add_timestamp(apply_drive_test_schema(pd.read_parquet(parquet_path, columns=columns, memory_map=True)))
+
+# Number of rows read per chunk in streaming mode
+STREAM_CHUNK_SIZE = 250000
+
+# Drive-test files at least this large are processed in streaming mode (1 GB)
+STREAMING_MIN_FILE_SIZE = 1024 ** 3
+
+# Maximum time between two bad-throughput samples of the same spot
+SPOT_MAX_GAP = np.timedelta64(4, 's')
+
+# Columns allowed to be empty on a sample (neighbors are not always reported)
+NEIGHBOR_COLUMNS = [
+    'Neighbor Cell RSRP (dBm): N1', 'Neighbor Cell Identity: N1', 'Neighbor Cell DL EARFCN: N1',
+    'Neighbor Cell RSRP (dBm): N2', 'Neighbor Cell Identity: N2', 'Neighbor Cell DL EARFCN: N2',
+    'Neighbor Cell RSRP (dBm): N3', 'Neighbor Cell Identity: N3', 'Neighbor Cell DL EARFCN: N3',
+    'Neighbor Cell RSRP (dBm): N4', 'Neighbor Cell Identity: N4', 'Neighbor Cell DL EARFCN: N4'
+]
+
+# Function to decide whether a drive-test file should be processed in streaming mode
+def should_stream(csv_path):
+    return estimate_uncompressed_size(csv_path) >= STREAMING_MIN_FILE_SIZE
+
+# Function to find which columns of a file hold at least one value
+def find_columns_with_values(csv_path, chunksize=STREAM_CHUNK_SIZE):
+    has_values = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, low_memory=False):
+        chunk_has_values = chunk.notna().any()
+        has_values = chunk_has_values if has_values is None else has_values | chunk_has_values
+    return has_values
+
+# Function to find the columns that contain only null values in the whole file
+def find_empty_columns(csv_path, chunksize=STREAM_CHUNK_SIZE):
+    has_values = find_columns_with_values(csv_path, chunksize)
+    if has_values is None:
+        return []
+    return list(has_values.index[~has_values])
+
+# Function to find the columns of a multi-file campaign and those with no value in any of its logs
+def find_campaign_columns(log_paths, chunksize=STREAM_CHUNK_SIZE):
+    """
+    The logs of a campaign are divided separately but written to the same
+    outputs, so they must all keep the same columns. As for a single file
+    holding all the logs, a column is dropped only if it is empty in every
+    log; a column missing from the header of a log counts as empty there.
+
+    Returns:
+        tuple: (columns of the campaign, in the order of the first log that has them; empty columns).
+    """
+    has_values = pd.Series(dtype=bool)
+    for path in log_paths:
+        log_has_values = find_columns_with_values(path, chunksize)
+        if log_has_values is None:
+            continue
+        columns = list(has_values.index) + [col for col in log_has_values.index if col not in has_values.index]
+        has_values = has_values.reindex(columns, fill_value=False) | log_has_values.reindex(columns, fill_value=False)
+    return list(has_values.index), list(has_values.index[~has_values])
+
+class DriveTestStreamState:
+    """
+    Pipeline state carried from one chunk of a drive-test file to the next:
+    the last known cell identity, the HTTP interval flag and the open spot segment.
+    """
+    def __init__(self):
+        # Last known values of the forward-filled cell identity columns
+        self.last_enb_part = np.nan
+        self.last_cell_part = np.nan
+
+        # HTTP flag after the last row (1 between HTTP End and HTTP Start)
+        self.http_flag = False
+
+        # Open spot segment: raw spot counter, its number of samples and the time of its last sample
+        self.spot_area_num = 1
+        self.spot_count = 0
+        self.spot_prev_time = None
+
+        # Rows held back because the spot segment they belong to (or follow) is still open
+        self.pending = None
+        self.pending_spots = np.empty(0, dtype=np.int64)
+
+        # Number of valid spots already emitted, so spot numbers keep increasing by 1
+        self.valid_spots = 0
+
+# Function to apply the row-wise preprocessing steps to one chunk
+def preprocess_stream_chunk(chunk, empty_columns, target_throughput, state):
+    """
+    Applies the null-column drop, cell identity forward fill, HTTP interval
+    filtering, null-row drop and per-sample flags to one chunk, continuing
+    from the state left by the previous chunk.
+    """
+    chunk = chunk.drop(columns=[col for col in empty_columns if col in chunk.columns])
+
+    # Fill forward the cell identity, continuing from the last value of the previous chunk
+    chunk['Cell Identity (eNB Part)'] = chunk['Cell Identity (eNB Part)'].ffill()
+    chunk['Cell Identity (Cell Part)'] = chunk['Cell Identity (Cell Part)'].ffill()
+    if pd.notna(state.last_enb_part):
+        chunk['Cell Identity (eNB Part)'] = chunk['Cell Identity (eNB Part)'].fillna(state.last_enb_part)
+    if pd.notna(state.last_cell_part):
+        chunk['Cell Identity (Cell Part)'] = chunk['Cell Identity (Cell Part)'].fillna(state.last_cell_part)
+    if len(chunk):
+        state.last_enb_part = chunk['Cell Identity (eNB Part)'].iloc[-1]
+        state.last_cell_part = chunk['Cell Identity (Cell Part)'].iloc[-1]
+
+    # Remove rows between HTTP End & HTTP Start, continuing the flag of the previous chunk
+    keep, state.http_flag = http_interval_mask(
+        chunk['HTTP Start'].notna().to_numpy(), chunk['HTTP End'].notna().to_numpy(), state.http_flag
+    )
+    chunk = chunk[keep]
+    chunk = chunk.drop(columns=['HTTP Start', 'HTTP End', 'HTTP IP Service Access Failure'])
+
+    # Drop rows with null throughput or null serving values
+    chunk = chunk.dropna(subset=['PDSCH Phy Throughput (kbps)'])
+    chunk = chunk.dropna(subset=[col for col in chunk.columns if col not in NEIGHBOR_COLUMNS])
+
+    # Add the "Bad Throughput" column
+    chunk['Bad Throughput'] = (chunk['PDSCH Phy Throughput (kbps)'] < target_throughput).astype(int)
+
+    # Rebuild 'Date' and 'Time' from the parsed timestamp
+    return split_timestamp(chunk)
+
+# Function to find the bad-throughput samples that open a new spot segment
+def find_spot_starts(times, max_num_samples, max_gap=SPOT_MAX_GAP, prev_time=None, count=0):
+    """
+    A sample opens a new segment if it is more than max_gap after the
+    previous bad-throughput sample, or if the current segment already holds
+    max_num_samples samples. The gaps split the samples into runs, and each
+    run is cut every max_num_samples samples, so no loop over the samples
+    is needed.
+
+    Parameters:
+        times (np.ndarray): Timestamps of the bad-throughput samples, in order.
+        max_num_samples (int): Maximum number of samples of a segment.
+        max_gap (np.timedelta64): Maximum time between two samples of a segment.
+        prev_time (np.datetime64): Time of the last sample of the open segment (None: no open segment).
+        count (int): Number of samples of the open segment.
+
+    Returns:
+        tuple: (boolean array, True where a sample opens a segment; number of samples of the last segment).
+    """
+    n = len(times)
+    if n == 0:
+        return np.zeros(0, dtype=bool), count
+
+    gap_starts = np.empty(n, dtype=bool)
+    gap_starts[0] = prev_time is None or bool(times[0] - prev_time > max_gap)
+    gap_starts[1:] = (times[1:] - times[:-1]) > max_gap
+
+    # Position of each sample in its run; the first run continues the open segment when no gap precedes it
+    positions = np.arange(n)
+    positions = positions - np.maximum.accumulate(np.where(gap_starts, positions, 0))
+    if not gap_starts[0]:
+        first_gaps = np.flatnonzero(gap_starts)
+        positions[:first_gaps[0] if len(first_gaps) else n] += count
+
+    # A segment holds at least one sample, whatever max_num_samples is
+    max_length = max(int(np.ceil(max_num_samples)), 1)
+    positions %= max_length
+    return positions == 0, int(positions[-1]) + 1
+
+# Function to drop the segments with too few samples and number the valid ones by 1
+def number_valid_spots(raw_spots, min_num_samples, first_number=0):
+    """
+    Parameters:
+        raw_spots (np.ndarray): Non-decreasing raw segment number of each sample (0: no segment).
+        min_num_samples (int): Minimum number of samples of a valid segment.
+        first_number (int): Number of valid spots before these samples.
+
+    Returns:
+        tuple: (spot number of each sample, 0 if its segment is not valid; number of valid spots).
+    """
+    spot_nums = np.zeros(len(raw_spots), dtype=np.int64)
+    in_spot = raw_spots > 0
+    if not in_spot.any():
+        return spot_nums, 0
+    offsets = raw_spots[in_spot] - raw_spots[in_spot].min()
+    is_valid = np.bincount(offsets) >= min_num_samples
+    numbers = first_number + np.cumsum(is_valid)
+    spot_nums[in_spot] = np.where(is_valid[offsets], numbers[offsets], 0)
+    return spot_nums, int(is_valid.sum())
+
+# Function to assign Spot_Area_Num to the rows whose spot segments are closed
+def segment_stream_chunk(chunk, min_num_samples, max_num_samples, state, final=False, max_gap=SPOT_MAX_GAP):
+    """
+    Assigns spot segments to a preprocessed chunk and returns the rows whose
+    segments can no longer grow. Rows from the first sample of the still-open
+    segment onwards are kept in the state and returned with the next chunk.
+    """
+    raw_spots = np.zeros(len(chunk), dtype=np.int64)
+    if len(chunk):
+        bad = chunk['Bad Throughput'].to_numpy() == 1
+        bad_times = chunk[TIMESTAMP_COLUMN].to_numpy()[bad]
+        if len(bad_times):
+            starts, count = find_spot_starts(bad_times, max_num_samples, max_gap, state.spot_prev_time, state.spot_count)
+            raw_spots[bad] = state.spot_area_num + np.cumsum(starts)
+            state.spot_area_num, state.spot_count, state.spot_prev_time = int(raw_spots[bad][-1]), count, bad_times[-1]
+
+    if state.pending is not None:
+        chunk = pd.concat([state.pending, chunk])
+        raw_spots = np.concatenate([state.pending_spots, raw_spots])
+
+    # The last segment is still open if it is not full and no later sample is more than 4 s after it
+    cut = len(chunk)
+    if not final and len(chunk) and state.spot_prev_time is not None and state.spot_count < max_num_samples:
+        if not (chunk[TIMESTAMP_COLUMN].to_numpy()[-1] - state.spot_prev_time > max_gap):
+            cut = int(np.flatnonzero(raw_spots == state.spot_area_num)[0])
+
+    ready, ready_spots = chunk.iloc[:cut], raw_spots[:cut]
+    state.pending, state.pending_spots = chunk.iloc[cut:], raw_spots[cut:]
+
+    # Invalidate segments with fewer than min_num_samples rows and renumber the valid ones by 1
+    spot_nums, valid_count = number_valid_spots(ready_spots, min_num_samples, state.valid_spots)
+    state.valid_spots += valid_count
+
+    ready = ready.drop(columns=[TIMESTAMP_COLUMN])
+    ready['Spot_Area_Num'] = spot_nums
+    return ready
+
+# Function to stream a drive-test file through the preprocessing chunk by chunk
+def stream_drive_test(csv_path, target_throughput, min_num_samples, max_num_samples,
+                      chunksize=STREAM_CHUNK_SIZE, state=None):
+    """
+    Reads a drive-test CSV in chunks and yields it preprocessed and divided
+    into spot areas, keeping only one chunk (plus the open spot segment) in
+    memory. The file must be in chronological order, as written by the logger.
+
+    The file is parsed twice. A first pass (find_empty_columns) finds the
+    columns empty in the whole file: as in memory, only those are dropped,
+    and the rows with a null serving value in the other columns are dropped
+    from the first chunk on, which a chunk alone cannot tell. Both passes
+    hold one chunk at a time, and they run once per upload, since the
+    divided frames are cached by preprocess_drive_test.
+
+    Parameters:
+        csv_path (str): Path of the drive-test CSV.
+        target_throughput (float): Throughput below which a sample has bad throughput.
+        min_num_samples (int): Minimum number of samples of a valid spot.
+        max_num_samples (int): Maximum number of samples of a spot.
+        chunksize (int): Number of rows read per chunk.
+        state (DriveTestStreamState): Optional state to continue from.
+
+    Yields:
+        pd.DataFrame: Preprocessed rows with their final 'Spot_Area_Num'.
+    """
+    empty_columns = find_empty_columns(csv_path, chunksize)
+    state = state or DriveTestStreamState()
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, low_memory=False):
+        chunk = add_timestamp(apply_drive_test_schema(chunk, categorical=False))
+        chunk = preprocess_stream_chunk(chunk, empty_columns, target_throughput, state)
+        ready = segment_stream_chunk(chunk, min_num_samples, max_num_samples, state)
+        if len(ready):
+            yield ready
+
+    # Flush the rows of the last open segment
+    if state.pending is not None and len(state.pending):
+        yield segment_stream_chunk(state.pending.iloc[:0], min_num_samples, max_num_samples, state, final=True)
+
+# Function to list the logs of the uploaded multi-file campaign
+def get_campaign_logs():
+    if not os.path.isdir(CAMPAIGN_DIR):
+        return []
+    return sorted(
+        os.path.join(CAMPAIGN_DIR, name) for name in os.listdir(CAMPAIGN_DIR)
+        if get_file_suffix(name) is not None
+    )
+
+# Function to preprocess and divide one whole drive-test log
+def preprocess_drive_test_log(csv_path, target_throughput, min_num_samples, max_num_samples, columns=None, empty_columns=None):
+    """
+    Applies the preprocessing and spot division to a single drive-test log
+    held in memory, and tags its samples with the log name.
+
+    Parameters:
+        columns (list): Columns of the campaign, added empty when the log does not have them.
+        empty_columns (list): Columns to drop (default: the columns with no value in this log).
+
+    Returns:
+        pd.DataFrame: Preprocessed samples of the log with their 'Spot_Area_Num' (1, 2, ... per log).
+    """
+    data = load_drive_test(csv_path)
+    if columns is not None:
+        data = data.reindex(columns=columns + [col for col in data.columns if col not in columns])
+    if empty_columns is None:
+        empty_columns = list(data.columns[data.isnull().all()])
+
+    state = DriveTestStreamState()
+    data = preprocess_stream_chunk(data, empty_columns, target_throughput, state)
+
+    # Unlike a streamed file, a whole log can be sorted by time before the spot division
+    data = data.sort_values(by=TIMESTAMP_COLUMN, kind='stable')
+    data = segment_stream_chunk(data, min_num_samples, max_num_samples, state, final=True)
+
+    data[SOURCE_LOG_COLUMN] = os.path.basename(csv_path)
+    return data.reset_index(drop=True)
+
+# Function to preprocess one campaign log in a worker process and save it for the parent process
+def _run_campaign_worker(csv_path, output_path, target_throughput, min_num_samples, max_num_samples, columns, empty_columns):
+    preprocess_drive_test_log(csv_path, target_throughput, min_num_samples, max_num_samples,
+                              columns, empty_columns).to_pickle(output_path)
+    return output_path
+
+# Function to preprocess the logs of a multi-file campaign in parallel
+def campaign_drive_test(log_paths, target_throughput, min_num_samples, max_num_samples, max_workers=None):
+    """
+    Preprocesses and divides the logs of a campaign concurrently, one worker
+    process per log (up to one per core), and yields them one log at a time.
+    Spots are divided per log so a spot never spans two files, and spot
+    numbers continue from one log to the next.
+
+    Workers are forked: the pipeline scripts are plain scripts, which a
+    spawned worker would run again when importing them. Where fork is not
+    available (Windows), the logs are preprocessed one after the other in
+    this process. Each run saves the logs of its workers in its own
+    temporary folder, so concurrent runs do not share files.
+
+    Parameters:
+        log_paths (list): Paths of the drive-test logs of the campaign.
+        target_throughput (float): Throughput below which a sample has bad throughput.
+        min_num_samples (int): Minimum number of samples of a valid spot.
+        max_num_samples (int): Maximum number of samples of a spot.
+        max_workers (int): Number of logs processed at the same time (default: number of cores).
+
+    Yields:
+        pd.DataFrame: Preprocessed samples of each log, tagged with SOURCE_LOG_COLUMN.
+    """
+    target_throughput, min_num_samples, max_num_samples = float(target_throughput), int(min_num_samples), int(max_num_samples)
+
+    # Every log gets the same columns, so that the logs are written one after the other under one header
+    columns, empty_columns = find_campaign_columns(log_paths)
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        frames = _run_campaign_workers(log_paths, target_throughput, min_num_samples, max_num_samples, columns, empty_columns,
+                                       max_workers or os.cpu_count() or 1)
+    else:
+        frames = (preprocess_drive_test_log(path, target_throughput, min_num_samples, max_num_samples, columns, empty_columns)
+                  for path in log_paths)
+
+    spot_offset = 0
+    for data in frames:
+        data.loc[data['Spot_Area_Num'] > 0, 'Spot_Area_Num'] += spot_offset
+        spot_offset = max(spot_offset, int(data['Spot_Area_Num'].max()) if len(data) else 0)
+        yield data
+
+# Function to preprocess the logs of a campaign in forked worker processes and yield them in order
+def _run_campaign_workers(log_paths, target_throughput, min_num_samples, max_num_samples, columns, empty_columns, max_workers):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    output_dir = tempfile.mkdtemp(prefix="Campaign_", dir=CACHE_DIR)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            futures = [
+                executor.submit(_run_campaign_worker, path, os.path.join(output_dir, f"{index:03d}.pkl"), target_throughput,
+                                min_num_samples, max_num_samples, columns, empty_columns)
+                for index, path in enumerate(log_paths)
+            ]
+            for future in futures:
+                output_path = future.result()
+                data = pd.read_pickle(output_path)
+                os.remove(output_path)
+                yield data
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+# Function to get the drive test as a sequence of frames when it is not analyzed in memory at once
+def get_drive_test_chunks(csv_path, target_throughput, min_num_samples, max_num_samples):
+    """
+    Returns the preprocessed drive test as an iterator of frames with their
+    'Spot_Area_Num': one frame per log for a multi-file campaign, one frame
+    per chunk for a file too large for memory.
+
+    Returns:
+        iterator: The preprocessed frames, or None if the drive test is analyzed in memory.
+    """
+    campaign_logs = get_campaign_logs()
+    if campaign_logs:
+        return campaign_drive_test(campaign_logs, target_throughput, min_num_samples, max_num_samples)
+    if should_stream(csv_path):
+        return stream_drive_test(csv_path, target_throughput, min_num_samples, max_num_samples)
+    return None
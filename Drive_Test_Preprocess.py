@@ -0,0 +1,177 @@
+import hashlib
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+from Cell_Cache import load_cell_file
+from Cell_Index import CellIndex
+from Site_Index import get_site_index, haversine_distance, initial_bearing
+from Drive_Test_Ingest import (CACHE_DIR, NEIGHBOR_COLUMNS, SPOT_MAX_GAP, compute_file_hash, find_spot_starts,
+                               get_campaign_logs, get_drive_test_chunks, load_drive_test, number_valid_spots,
+                               project_dir)
+from Drive_Test_Schema import TIMESTAMP_COLUMN, split_timestamp
+from Drive_Test_Utils import filter_http_intervals
+
+# Preprocessed drive tests, one folder of parts per (drive test, cell file, thresholds) key
+PREPROCESS_CACHE_DIR = os.path.join(CACHE_DIR, "Preprocessed")
+
+# Modules whose code changes the preprocessed output
+PREPROCESS_MODULES = ["Drive_Test_Preprocess.py", "Cell_Index.py", "Cell_Cache.py", "Site_Index.py", "Drive_Test_Ingest.py", "Drive_Test_Schema.py", "Drive_Test_Utils.py"]
+
+# Serving-beam geometry of each sample, added after 'Distance_Power_Check'
+SITE_GEOMETRY_COLUMNS = ['Bearing_From_Site', 'Azimuth_Offset', 'Normalized_Distance']
+
+# Function to assign Spot_Area_Num
+def assign_spots_area_num(df, min_num_samples, max_num_samples, max_gap=SPOT_MAX_GAP):
+    bad = df['Bad Throughput'].to_numpy() == 1
+
+    # First pass: Assign groups based on Coverage and Time rules
+    starts, _ = find_spot_starts(df[TIMESTAMP_COLUMN].to_numpy()[bad], max_num_samples, max_gap)
+    raw_spots = np.zeros(len(df), dtype=np.int64)
+    raw_spots[bad] = 1 + np.cumsum(starts)
+
+    # Invalidate groups with fewer than min_num_samples rows and renumber the valid ones by 1
+    df['Spot_Area_Num'] = number_valid_spots(raw_spots, min_num_samples)[0]
+
+    return df
+
+# Function to preprocess and divide a whole drive test held in memory
+def preprocess_in_memory(data_path, target_throughput, min_num_samples, max_num_samples):
+    data = load_drive_test(data_path)
+
+    # Drop the initial column if it contains only null values
+    data = data.dropna(axis=1, how='all')
+
+    # Fill forward missing values in 'Cell Identity (eNB Part)' and 'Cell Identity (Cell Part)' columns, as they dont appear except in rows that conatin null throughput
+    data['Cell Identity (eNB Part)'] = data['Cell Identity (eNB Part)'].ffill()
+    data['Cell Identity (Cell Part)'] = data['Cell Identity (Cell Part)'].ffill()
+
+    # Convert HTTP Start & HTTP End to binary (1 if not NaN, 0 otherwise)
+    data['HTTP Start'] = data['HTTP Start'].notna().astype(int)
+    data['HTTP End'] = data['HTTP End'].notna().astype(int)
+    data['HTTP IP Service Access Failure'] = data['HTTP IP Service Access Failure'].notna().astype(int)
+
+    # Apply function to remove rows between HTTP End & HTTP Start
+    data = filter_http_intervals(data)
+
+    # Drop the HTTP columns
+    data = data.drop(columns=['HTTP Start', 'HTTP End', 'HTTP IP Service Access Failure'])
+
+    # Drop rows where 'PDSCH Phy Throughput (kbps)' is null, then rows with null serving values
+    data = data.dropna(subset=['PDSCH Phy Throughput (kbps)'])
+    data = data.dropna(subset=[col for col in data.columns if col not in NEIGHBOR_COLUMNS])
+
+    # Add the "Bad Throughput" column
+    data['Bad Throughput'] = (data['PDSCH Phy Throughput (kbps)'] < target_throughput).astype(int)
+
+    # Sort once by the timestamp parsed at ingest (Date + Time)
+    data = data.sort_values(by=TIMESTAMP_COLUMN, kind='stable').reset_index(drop=True)
+
+    # Rebuild 'Date' and 'Time' from the timestamp
+    data = split_timestamp(data)
+
+    # Apply Spot_Area_Num logic
+    data = assign_spots_area_num(data, min_num_samples, max_num_samples)
+
+    # Remove the timestamp column as it is no longer needed
+    return data.drop(columns=[TIMESTAMP_COLUMN])
+
+# Function to add the serving site position, the distance/power check and the serving-beam geometry to divided samples
+def add_site_columns(data, cell_index, target_throughput, max_distance, max_ue_transmit_power, median_site_distance=np.nan):
+    # Look up latitude and longitude of the serving site, placed before 'Bad Throughput'
+    site_latitudes, site_longitudes = cell_index.get_site_coordinates(data['Cell Identity (eNB Part)'])
+    data.insert(data.columns.get_loc('Bad Throughput'), 'Latitude_EnodeB', site_latitudes)
+    data.insert(data.columns.get_loc('Bad Throughput'), 'Longitude_EnodeB', site_longitudes)
+
+    # Compute Distance_To_Site using haversine formula
+    data['Distance_To_Site'] = haversine_distance(data['Latitude'], data['Longitude'], data['Latitude_EnodeB'], data['Longitude_EnodeB'])
+
+    # Check if the distance to the site is greater than max_distance and UE Transmit Power is greater than max_ue_transmit_power
+    data['Distance_Power_Check'] = (
+        (data['PDSCH Phy Throughput (kbps)'] < target_throughput) &
+        (data['Distance_To_Site'] > max_distance) &
+        (data['UE TX Power - PUSCH (dBm) Carrier 1'] > max_ue_transmit_power)
+    ).astype(int)
+
+    # Bearing of the sample seen from the serving site, and its angle off the azimuth of the serving cell (0 to 180 degrees)
+    data['Bearing_From_Site'] = initial_bearing(data['Latitude_EnodeB'], data['Longitude_EnodeB'], data['Latitude'], data['Longitude'])
+    azimuths = cell_index.get_cell_azimuths(data['Serving Cell Identity'], data['Serving Cell DL EARFCN'], data['Cell Identity (eNB Part)'])
+    data['Azimuth_Offset'] = np.abs((data['Bearing_From_Site'].to_numpy() - azimuths + 180) % 360 - 180)
+
+    # Distance to the site in units of the median distance between neighboring sites
+    data['Normalized_Distance'] = data['Distance_To_Site'] / median_site_distance
+    return data
+
+# Function to build the key of a preprocessed drive test
+def get_preprocess_key(data_path, enodeb_path, thresholds):
+    """
+    Hashes everything the preprocessed output depends on: the drive test
+    (or the logs of the uploaded campaign), the cell file, the thresholds
+    and the code of the preprocessing modules.
+    """
+    digest = hashlib.sha256(repr(list(thresholds)).encode())
+    campaign_logs = get_campaign_logs()
+    for path in (campaign_logs or [data_path]):
+        digest.update(os.path.basename(path).encode())
+        digest.update(compute_file_hash(path).encode())
+    digest.update(compute_file_hash(enodeb_path).encode())
+    for module in PREPROCESS_MODULES:
+        digest.update(compute_file_hash(os.path.join(project_dir, module)).encode())
+    return digest.hexdigest()
+
+# Function to get the preprocessed drive test, computed once per key and shared by the pipeline scripts
+def preprocess_drive_test(data_path, enodeb_path, target_throughput, min_num_samples, max_num_samples,
+                          max_distance, max_ue_transmit_power):
+    """
+    Yields the drive test preprocessed and divided into spot areas, with the
+    serving site position, 'Distance_To_Site', 'Distance_Power_Check' and
+    the serving-beam geometry (SITE_GEOMETRY_COLUMNS).
+
+    The first script that needs it (the graphs at upload time) runs the
+    preprocessing and saves the frames under a key of the drive test, cell
+    file and thresholds; the analysis scripts then read the saved frames and
+    start directly at problem detection.
+
+    Parameters:
+        data_path (str): Path of the uploaded drive-test file.
+        enodeb_path (str): Path of the uploaded cell file.
+        target_throughput (float): Throughput below which a sample has bad throughput.
+        min_num_samples (int): Minimum number of samples of a valid spot.
+        max_num_samples (int): Maximum number of samples of a spot.
+        max_distance (float): Distance to the site above which a sample is far from it (m).
+        max_ue_transmit_power (float): UE transmit power above which a sample is power limited (dBm).
+
+    Yields:
+        pd.DataFrame: One frame for a drive test analyzed in memory, one per log or chunk otherwise.
+    """
+    thresholds = (target_throughput, min_num_samples, max_num_samples, max_distance, max_ue_transmit_power)
+    cache_dir = os.path.join(PREPROCESS_CACHE_DIR, get_preprocess_key(data_path, enodeb_path, thresholds))
+
+    if os.path.isdir(cache_dir):
+        for name in sorted(os.listdir(cache_dir)):
+            yield pd.read_pickle(os.path.join(cache_dir, name))
+        return
+
+    cell_index = CellIndex(load_cell_file(enodeb_path))
+    median_site_distance = get_site_index(enodeb_path).median_site_distance()
+
+    # Multi-file campaigns are divided log by log and drive tests too large for memory chunk by chunk
+    frames = get_drive_test_chunks(data_path, target_throughput, min_num_samples, max_num_samples)
+    if frames is None:
+        frames = [preprocess_in_memory(data_path, target_throughput, min_num_samples, max_num_samples)]
+
+    # Frames are pickled to keep their dtypes; the folder is renamed only once complete, and removed
+    # if the caller stops early or fails (the generator is then closed before the last frame)
+    tmp_dir = cache_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        for index, data in enumerate(frames):
+            data = add_site_columns(data, cell_index, target_throughput, max_distance, max_ue_transmit_power, median_site_distance)
+            data.to_pickle(os.path.join(tmp_dir, f"part_{index:05d}.pkl"))
+            yield data
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(tmp_dir, cache_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,110 @@
+import pandas as pd
+
+# Radio KPIs, compared by the problem rules at exact thresholds (e.g. the 5 dB overlap range): in float32
+# a logged -124.3 is no longer -124.3, which moves samples across the thresholds, so they stay float64
+RADIO_KPI_COLUMNS = [
+    'Serving Cell RSRP (dBm)', 'Serving Cell RSRQ (dB)', 'Serving Cell RS SINR (dB)',
+    'UE TX Power - PUSCH (dBm) Carrier 1', 'Number of PDSCH Resource Blocks',
+    'Neighbor Cell RSRP (dBm): N1', 'Neighbor Cell RSRP (dBm): N2',
+    'Neighbor Cell RSRP (dBm): N3', 'Neighbor Cell RSRP (dBm): N4'
+]
+
+# Cell identities (eNodeB id and cell id), always integers
+IDENTITY_COLUMNS = ['Cell Identity (eNB Part)', 'Cell Identity (Cell Part)']
+
+# PCIs and EARFCNs are integers that only take a handful of distinct values in a drive test
+CATEGORICAL_COLUMNS = [
+    'Serving Cell Identity', 'Serving Cell DL EARFCN',
+    'Neighbor Cell Identity: N1', 'Neighbor Cell DL EARFCN: N1',
+    'Neighbor Cell Identity: N2', 'Neighbor Cell DL EARFCN: N2',
+    'Neighbor Cell Identity: N3', 'Neighbor Cell DL EARFCN: N3',
+    'Neighbor Cell Identity: N4', 'Neighbor Cell DL EARFCN: N4'
+]
+
+# HTTP markers are only checked for presence
+MARKER_COLUMNS = ['HTTP Start', 'HTTP End', 'HTTP IP Service Access Failure']
+
+# A drive test only spans a few dates
+DATE_COLUMNS = ['Date']
+
+# Throughput and coordinates need the full float64 precision
+PRECISE_COLUMNS = ['PDSCH Phy Throughput (kbps)', 'Latitude', 'Longitude']
+
+# Central schema of the known drive-test columns, used by every loader
+DRIVE_TEST_SCHEMA = {
+    **{col: 'float64' for col in RADIO_KPI_COLUMNS},
+    **{col: 'UInt32' for col in IDENTITY_COLUMNS},
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+    **{col: 'category' for col in MARKER_COLUMNS},
+    **{col: 'category' for col in DATE_COLUMNS},
+    **{col: 'float64' for col in PRECISE_COLUMNS}
+}
+
+# Function to convert the known drive-test columns to their compact dtypes
+def apply_drive_test_schema(df, categorical=True):
+    """
+    Converts the drive-test columns listed in DRIVE_TEST_SCHEMA to their
+    compact dtypes. Unknown columns keep the dtype they were read with, and a
+    column whose values do not fit its schema dtype is left unchanged.
+    The drive-test Parquet cache stores this output: increase
+    DRIVE_TEST_CACHE_VERSION (Drive_Test_Ingest) when the dtypes change.
+
+    Parameters:
+        df (pd.DataFrame): Drive-test data as read from the file.
+        categorical (bool): Whether to convert PCIs and EARFCNs to categoricals. Chunks of a
+            streamed file keep them as UInt32, since each chunk would get its own categories.
+
+    Returns:
+        pd.DataFrame: The same data with compact dtypes.
+    """
+    dtypes = {}
+    for col, dtype in DRIVE_TEST_SCHEMA.items():
+        if col not in df.columns:
+            continue
+        # PCIs and EARFCNs are made integers first, so that both modes write 46 and not 46.0,
+        # whether or not the column has missing values
+        if col in CATEGORICAL_COLUMNS:
+            dtypes[col] = ['UInt32', 'category'] if categorical else ['UInt32']
+        else:
+            dtypes[col] = [dtype]
+
+    for col, steps in dtypes.items():
+        for dtype in steps:
+            if df[col].dtype == dtype:
+                continue
+            try:
+                df[col] = df[col].astype(dtype)
+            except (ValueError, TypeError):
+                pass
+    return df
+
+# Column holding the sample time parsed from 'Date' and 'Time'
+TIMESTAMP_COLUMN = 'Timestamp'
+
+# Function to parse 'Date' and 'Time' once into a single datetime column
+def add_timestamp(df):
+    """
+    Adds the TIMESTAMP_COLUMN column, the 'Date' and 'Time' of each sample
+    parsed into a single datetime64 value. Unlike the seconds of the day, it
+    keeps increasing across midnight and across the days of a campaign.
+
+    Parameters:
+        df (pd.DataFrame): Drive-test data with 'Date' and 'Time' ('HH:MM:SS') columns.
+
+    Returns:
+        pd.DataFrame: The same data with the timestamp column added.
+    """
+    if TIMESTAMP_COLUMN in df.columns or 'Date' not in df.columns or 'Time' not in df.columns:
+        return df
+
+    # Dates are parsed once per distinct value, times are parsed as durations since midnight
+    dates = df['Date'].astype('category')
+    dates = dates.cat.rename_categories(pd.to_datetime(dates.cat.categories)).astype('datetime64[ns]')
+    df[TIMESTAMP_COLUMN] = dates + pd.to_timedelta(df['Time'])
+    return df
+
+# Function to rebuild 'Date' and 'Time' from the parsed timestamp
+def split_timestamp(df):
+    df['Date'] = df[TIMESTAMP_COLUMN].dt.normalize()
+    df['Time'] = df[TIMESTAMP_COLUMN].dt.time
+    return df
@@ -0,0 +1,49 @@
+import numpy as np
+
+# Function to build the keep-mask of the HTTP interval filter
+def http_interval_mask(http_start, http_end, initial_flag=False):
+    """
+    Builds the boolean mask of rows kept by the HTTP interval filter.
+
+    After each row the flag is 0 if the row has 'HTTP Start', 1 if it has
+    'HTTP End', and otherwise carries the state of the last marker row.
+
+    Parameters:
+        http_start (np.ndarray): Boolean 'HTTP Start' marker per row.
+        http_end (np.ndarray): Boolean 'HTTP End' marker per row.
+        initial_flag (bool): Flag value before the first row (used when data is processed in chunks).
+
+    Returns:
+        tuple: (keep mask, flag value after the last row).
+    """
+    initial_flag = bool(initial_flag)
+
+    # Position of the last row (up to and including each row) carrying a marker
+    positions = np.arange(len(http_start))
+    last_marker = np.maximum.accumulate(np.where(http_start | http_end, positions, -1))
+
+    # Flag value after each row: HTTP Start resets it, HTTP End sets it, otherwise the initial flag holds
+    flag_after = np.where(last_marker >= 0, http_end[last_marker] & ~http_start[last_marker], initial_flag)
+
+    # Flag value when each row is reached
+    flag_before = np.concatenate(([initial_flag], flag_after[:-1]))
+
+    # Keep a row only if the flag is 0 after HTTP End is applied to it
+    keep = ~flag_before & ~http_end
+    final_flag = bool(flag_after[-1]) if len(flag_after) else bool(initial_flag)
+    return keep, final_flag
+
+# Function to remove rows between HTTP End and HTTP Start
+def filter_http_intervals(df):
+    """
+    Removes the drive-test rows logged between an 'HTTP End' and the next
+    'HTTP Start' marker (the idle gap between two HTTP sessions).
+
+    Parameters:
+        df (pd.DataFrame): Drive-test data with binary 'HTTP Start' / 'HTTP End' columns.
+
+    Returns:
+        pd.DataFrame: The rows kept by the filter, with their original index.
+    """
+    keep, _ = http_interval_mask(df['HTTP Start'].to_numpy() == 1, df['HTTP End'].to_numpy() == 1)
+    return df[keep]
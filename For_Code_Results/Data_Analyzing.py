@@ -1,313 +1,29 @@
 import pandas as pd
-import math
 import os
-from openpyxl.styles import PatternFill
-import pandas as pd
-import os
-from math import radians, cos, sin, asin, sqrt
+import sys
 import numpy as np
-from scipy.spatial import cKDTree
-
-# Function to remove rows between HTTP End and HTTP Start
-def filter_http_intervals(df):
-    http_flag = 0  # Initialize flag
-    filtered_data = []  # Store valid rows
-
-    for _, row in df.iterrows():
-        if row['HTTP End'] == 1:
-            http_flag = 1  # Start flag when HTTP End is found
-
-        if http_flag == 0:
-            filtered_data.append(row)  # Keep row only if flag is 0
-
-        if row['HTTP Start'] == 1:
-            http_flag = 0  # Reset flag when HTTP Start is found
-
-    return pd.DataFrame(filtered_data)
-# Function to extract Latitude and Longitude for a given Cell Identity
-def get_lat_lon(cell_id):
-    match = data_Enode[data_Enode['eNodeB id'] == cell_id].head(1)
-    if not match.empty:
-        return match['Latitude'].values[0], match['Longitude'].values[0]
-    return np.nan, np.nan
-# Function to extract Cell Name based on PCI, DLARFCN, and eNodeB id
-def get_cell_name(row):
-    match = data_Enode[
-        (data_Enode['PCI'] == row['Serving Cell Identity']) &
-        (data_Enode['DLARFCN'] == row['Serving Cell DL EARFCN']) &
-        (data_Enode['eNodeB id'] == row['Cell Identity (eNB Part)'])
-    ]
-    if not match.empty:
-        return match['CellNAME'].values[0]  # Replace 'Cell Name' with exact column name if different
-    return ""
-# Function to get DL_PRB UTILIZATION from data_utilization based on Serving_Cell_Name
-def get_PRB_Utilization(row):
-    match = data_utilization[data_utilization['Cell Name'] == row['Serving_Cell_Name']]
-    if not match.empty:
-        return round(float(match['DL_PRB UTILIZATION'].values[0]), 2)
-    return ""
-
-
-# Function to assign Spot_Area_Num
-def assign_spots_area_num(df):
-    spot_area_num = 1
-    count = 0
-    prev_Time = None
-    spot_area_nums = []
-
-    # First pass: Assign groups based on Coverage and Time rules
-    for index, row in df.iterrows():
-        if row['Bad Throughput'] == 1:
-            if prev_Time is None or count >= MAX_NUM_SAMPLES or (row['Time2'] - prev_Time > 4):
-                spot_area_num += 1
-                count = 0
-            spot_area_nums.append(spot_area_num)
-            prev_Time = row['Time2']
-            count += 1
-        else:
-            spot_area_nums.append(0)
-
-    # Second pass: Adjust rows with Coverage == 0 to belong to adjacent groups
-    for i in range(1, len(spot_area_nums) - 1):
-        if spot_area_nums[i] == 0:
-            if spot_area_nums[i - 1] > 0 and spot_area_nums[i + 1] > 0 and spot_area_nums[i - 1] == spot_area_nums[i + 1]:
-                count += 1
-
-    df['Spot_Area_Num'] = spot_area_nums
-
-    # Third pass: Invalidate groups with fewer than 7 rows
-    group_sizes = df['Spot_Area_Num'].value_counts()
-    invalid_groups = group_sizes[group_sizes < MIN_NUM_SAMPLES].index
-    df['Spot_Area_Num'] = df['Spot_Area_Num'].apply(lambda x: 0 if x in invalid_groups else x)
-
-    # Adjust Spot_Area_Num to ensure increments are by 1 only for valid groups
-    unique_spots = df.loc[df['Spot_Area_Num'] > 0, 'Spot_Area_Num'].unique()
-    spot_mapping = {old: new for new, old in enumerate(unique_spots, start=1)}
-    df['Spot_Area_Num'] = df['Spot_Area_Num'].map(lambda x: spot_mapping.get(x, 0))
-
-    return df
-# Function to calculate the distance between sample and site
-def Sample_Site_Distance(lat1, lon1, lat2, lon2):
-    """
-    Calculate the great-circle distance between two points 
-    on the Earth specified by their latitude and longitude.
-    
-    Parameters:
-    lat1, lon1 - Latitude and Longitude of point 1 in decimal degrees
-    lat2, lon2 - Latitude and Longitude of point 2 in decimal degrees
-    
-    Returns:
-    Distance between the two points in meters.
-    """
-    # Convert latitude and longitude from degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    # Earth's radius in meters (mean radius)
-    R = 6371000  
-    distance = R * c  # Distance in meters
-    
-    return abs(distance)
-# Function to check if the distance to the site is greater than MAX_DISTANCE and UE Transmit Power is greater than MAX_UE_TRANSMIT_POWER
-def Distance_Power_Check(row):
-    return 1 if row['PDSCH Phy Throughput (kbps)'] < TARGET_THROUGHPUT and row['Distance_To_Site'] > MAX_DISTANCE and row['UE TX Power - PUSCH (dBm) Carrier 1'] > MAX_UE_TRANSMIT_POWER else 0
-# Haversine formula to compute distance between two lat/lon coordinates
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371.0  # Earth's radius in km
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1 
-    dlon = lon2 - lon1 
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    return 2 * R * asin(sqrt(a)) * 1000  # Convert to meters
-# Calculate median distance between sites
-def calculate_median_distance(df_input):
-   
-
-    # Filter and deduplicate dataframe
-    selected_columns = ['Physical_Site_Code', 'Latitude', 'Longitude']
-    df_selected = df_input[selected_columns]
-    df_unique = df_selected.drop_duplicates(subset='Physical_Site_Code', keep='first').copy()
-
-    # Prepare coordinates in radians
-    coords_rad = np.radians(df_unique[['Latitude', 'Longitude']].values)
-    tree = cKDTree(coords_rad)
-    _, idx = tree.query(coords_rad, k=2)  # k=2 to skip self (first match)
-
-    # Get closest site info
-    closest_indices = idx[:, 1]
-    closest_sites = df_unique.iloc[closest_indices]['Physical_Site_Code'].values
-    distances = [
-        haversine(lat1, lon1, lat2, lon2)
-        for (lat1, lon1), (lat2, lon2) in zip(
-            df_unique[['Latitude', 'Longitude']].values,
-            df_unique.iloc[closest_indices][['Latitude', 'Longitude']].values
-        )
-    ]
-
-    # Assign results safely
-    df_unique.loc[:, 'Closest_Site_Code'] = closest_sites
-    df_unique.loc[:, 'Distance_m'] = distances
-
-    # Calculate median distance
-    unique_distances = df_unique['Distance_m'].unique()
-    median_distance = np.median(unique_distances)
-
-    return median_distance
-# Function to check if all neighbor RSRP values are below TARGET_RSRP
-def bad_coverage(row):
-    bad_throughput_condition = row['PDSCH Phy Throughput (kbps)'] < TARGET_THROUGHPUT
-    neighbors = [
-        row['Neighbor Cell RSRP (dBm): N1'], 
-        row['Neighbor Cell RSRP (dBm): N2'], 
-        row['Neighbor Cell RSRP (dBm): N3'],
-        row['Neighbor Cell RSRP (dBm): N4']
-    ]
-    bad_serving_rsrp_condtion= row['Serving Cell RSRP (dBm)'] < TARGET_RSRP
-    bad_neighbor_rsrp_condtion= all(val<TARGET_RSRP for val in neighbors)
-
-    # Check if Serving Cell RSRP and all neighbors are below TARGET_RSRP
-    if bad_throughput_condition and bad_serving_rsrp_condtion and (( bad_neighbor_rsrp_condtion) or ( bad_neighbor_rsrp_condtion==0 and row['Intra-Frequency Handover'] == 0 and row['Inter-Frequency Handover'] == 0)) :
-        return 1
-    return 0
-# Function for intra-frequency handover
-def intra_frequency_handover(row):
-    bad_throughput_condition = row['PDSCH Phy Throughput (kbps)'] < TARGET_THROUGHPUT
-    neighbors = [
-        row['Neighbor Cell RSRP (dBm): N1'], 
-        row['Neighbor Cell RSRP (dBm): N2'], 
-        row['Neighbor Cell RSRP (dBm): N3'],
-        row['Neighbor Cell RSRP (dBm): N4']
-    ]
-    bad_serving_rsrp_condtion= row['Serving Cell RSRP (dBm)'] < TARGET_RSRP
-    bad_neighbor_rsrp_condtion= all(val<TARGET_RSRP for val in neighbors)
-
-    serving_rsrp = row['Serving Cell RSRP (dBm)']
-    distance_condition = row['Distance_Power_Check']
-
-
-    intra_frequency_handover_condition = any([
-        row['Neighbor Cell RSRP (dBm): N1'] > serving_rsrp + RSRP_NEIGHBOUR_DIFFERENCE and 
-        row['Neighbor Cell DL EARFCN: N1'] == row['Serving Cell DL EARFCN'],
-        
-        row['Neighbor Cell RSRP (dBm): N2'] > serving_rsrp + RSRP_NEIGHBOUR_DIFFERENCE and 
-        row['Neighbor Cell DL EARFCN: N2'] == row['Serving Cell DL EARFCN'],
-        
-        row['Neighbor Cell RSRP (dBm): N3'] > serving_rsrp + RSRP_NEIGHBOUR_DIFFERENCE and 
-        row['Neighbor Cell DL EARFCN: N3'] == row['Serving Cell DL EARFCN'],
+import atexit
+import shutil
+import tempfile
+
+# Make the shared modules in the project root importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Cell_Cache import load_cell_file
+from Cell_Index import CellIndex
+from Site_Index import SiteIndex
+from Drive_Test_Ingest import STREAM_CHUNK_SIZE, get_campaign_logs, find_drive_test_file
+from Drive_Test_Incremental import IncrementalDriveTest, get_config_key, incremental_mode_enabled
+from Drive_Test_Preprocess import SITE_GEOMETRY_COLUMNS, add_site_columns, preprocess_drive_test
+from Problem_Detection import detect_problems
+from Problem_Rules import PROBLEM_RULES_PATH, load_problem_rules
+from Analysis_Thresholds import load_analysis_thresholds
+from Grid_Bins import GridBinAggregator, get_grid_samples
+from Spot_Clusters import get_run_key, get_spot_centroids, update_persistent_areas
+from Utilization_Store import find_utilization_file, load_utilization_store
 
-        row['Neighbor Cell RSRP (dBm): N4'] > serving_rsrp + RSRP_NEIGHBOUR_DIFFERENCE and 
-        row['Neighbor Cell DL EARFCN: N4'] == row['Serving Cell DL EARFCN']
-    ])
-    
-    return 1 if bad_throughput_condition and ((bad_serving_rsrp_condtion and bad_neighbor_rsrp_condtion==0 and  intra_frequency_handover_condition)or(bad_serving_rsrp_condtion==0 and distance_condition and intra_frequency_handover_condition)) else 0
-# Function for inter-frequency handover
-def inter_frequency_handover(row):
-    bad_throughput_condition = row['PDSCH Phy Throughput (kbps)'] < TARGET_THROUGHPUT
-    neighbors = [
-        row['Neighbor Cell RSRP (dBm): N1'], 
-        row['Neighbor Cell RSRP (dBm): N2'], 
-        row['Neighbor Cell RSRP (dBm): N3'],
-        row['Neighbor Cell RSRP (dBm): N4']
-    ]
-    bad_serving_rsrp_condtion= row['Serving Cell RSRP (dBm)'] < TARGET_RSRP
-    bad_neighbor_rsrp_condtion= all(val<TARGET_RSRP for val in neighbors)
-    intra_frequency_handover_condition = row['Intra-Frequency Handover']
-
-    serving_rsrp = row['Serving Cell RSRP (dBm)']
-    distance_condition = row['Distance_Power_Check']
-    serving_rsrp_min= serving_rsrp<MIN_SERVING_RSRP
-    inter_frequency_handover_condition = any([
-        row['Neighbor Cell RSRP (dBm): N1'] > serving_rsrp + RSRP_NEIGHBOUR_DIFFERENCE and row['Neighbor Cell DL EARFCN: N1'] != row['Serving Cell DL EARFCN'],
-        row['Neighbor Cell RSRP (dBm): N2'] > serving_rsrp + RSRP_NEIGHBOUR_DIFFERENCE and row['Neighbor Cell DL EARFCN: N2'] != row['Serving Cell DL EARFCN'],
-        row['Neighbor Cell RSRP (dBm): N3'] > serving_rsrp + RSRP_NEIGHBOUR_DIFFERENCE and row['Neighbor Cell DL EARFCN: N3'] != row['Serving Cell DL EARFCN'],
-        row['Neighbor Cell RSRP (dBm): N4'] > serving_rsrp + RSRP_NEIGHBOUR_DIFFERENCE and row['Neighbor Cell DL EARFCN: N4'] != row['Serving Cell DL EARFCN']
-    ])
-    return 1 if bad_throughput_condition and((bad_serving_rsrp_condtion and bad_neighbor_rsrp_condtion==0 and intra_frequency_handover_condition==0 and inter_frequency_handover_condition and serving_rsrp_min ) or (bad_serving_rsrp_condtion==0 and distance_condition and intra_frequency_handover_condition==0 and inter_frequency_handover_condition and serving_rsrp_min))  else 0
-# Function for overshooting detection
-def overshooting(row):
-    bad_throughput_condition = row['PDSCH Phy Throughput (kbps)'] < TARGET_THROUGHPUT
-    serving_rsrp_condtion= row['Serving Cell RSRP (dBm)'] > TARGET_RSRP
-
-    return 1 if bad_throughput_condition and serving_rsrp_condtion and row['Distance_Power_Check'] == 1 and row['Intra-Frequency Handover'] == 0 and row['Inter-Frequency Handover'] == 0  else 0
-# Function for overlapping detection
-def overlapping(row):
-    serving_rsrp = row['Serving Cell RSRP (dBm)']
-    serving_earfcn = row['Serving Cell DL EARFCN']
-    
-    try:
-        serving_cell_id = int(row['Serving Cell Identity'])  # Convert to int safely
-    except (ValueError, TypeError):
-        serving_cell_id = None  # Handle missing cell identity
-
-    # Define neighbors while ignoring null values
-    neighbors = []
-    for i in range(1, 5):  # Iterate over N1 to N4
-        rsrp = row.get(f'Neighbor Cell RSRP (dBm): N{i}')
-        earfcn = row.get(f'Neighbor Cell DL EARFCN: N{i}')
-        try:
-            cell_id = int(row.get(f'Neighbor Cell Identity: N{i}'))
-        except (ValueError, TypeError):
-            cell_id = None  # Handle missing identity safely
-        
-        if pd.notna(rsrp) and pd.notna(earfcn) and cell_id is not None:
-            neighbors.append((rsrp, earfcn, cell_id))
-
-    overlapping_cells = set()  # Store overlapping cell identities
-    overlap_count = 0  # Counter for overlapping cells
-
-    for neighbor_rsrp, neighbor_earfcn, neighbor_id in neighbors:
-        if abs(serving_rsrp - neighbor_rsrp) <= MAX_RSRP_OVERLAP_RANGE and neighbor_earfcn == serving_earfcn and neighbor_id != serving_cell_id :
-            overlap_count += 1
-            overlapping_cells.add(str(neighbor_id))  # Store cell identity as a string
-
-    # Determine overlap condition
-    overlapping_condition = overlap_count > 0
-    rsrp_condition = any(neighbor_rsrp > TARGET_RSRP for neighbor_rsrp, _, _ in neighbors)
-    serving_rsrp_condition = serving_rsrp > TARGET_RSRP
-
-    # Overlapping detection logic
-    overlap_detected = 1 if (
-        row['PDSCH Phy Throughput (kbps)'] < TARGET_THROUGHPUT and 
-        rsrp_condition and overlapping_condition and 
-        row['Serving Cell RS SINR (dB)'] < MIN_SINR and 
-        serving_rsrp_condition
-    ) else 0
-
-    # If overlap is detected, add the serving cell to the overlapping cells set
-    if overlap_detected and serving_cell_id is not None:
-        overlapping_cells.add(str(serving_cell_id))
-
-    # Convert set of overlapping cell identities into a comma-separated string
-    overlapping_cells_str = ", ".join(sorted(overlapping_cells)) if overlapping_cells else "None"
-
-    return pd.Series([overlap_detected, overlap_count + 1, overlapping_cells_str])
-# Function for highload detection
-def highload(row):
-    try:
-        prb_util = float(row['PRB Utilization'])
-    except (ValueError, TypeError):
-        return 0  # If PRB is missing or not a number, we can't flag High Load
-
-    return 1 if (
-        row['PDSCH Phy Throughput (kbps)'] < TARGET_THROUGHPUT and
-        row['Bad Coverage'] == 0 and
-        row['Overlapping'] == 0 and
-        row['Overshooting'] == 0 and
-        row['Intra-Frequency Handover'] == 0 and
-        row['Inter-Frequency Handover'] == 0 and
-        row['Number of PDSCH Resource Blocks'] < MIN_PRB and
-        prb_util > PRB_Utilization_Threshold
-    ) else 0
 # Function to get the top 3 problems in each Spot_Area_Num with percentage and determine the dominant problem
 def get_top_problems(group):
-    problem_columns = ['Bad Coverage', 'Intra-Frequency Handover', 'Inter-Frequency Handover', 
-                       'Overshooting', 'Overlapping', 'High Load']
+    problem_columns = problem_rules.problem_columns
     
     # Count the occurrences of each issue
     issue_counts = group[problem_columns].sum()
@@ -559,8 +275,16 @@ def analyze_overlapping_highload(group):
 
     group['Dominant Problem'] = dominant
     return group
+# Function to get the quintile limits of the RSRP or SINR ranks from the values of all the spot areas
+def get_rank_quantiles(values):
+    values = pd.Series(np.concatenate(values) if values else [], dtype='float64')
+    if values.empty:
+        return None
+    return [values.quantile(q/5) for q in range(1, 6)]
+
 # Ranking Addition Function with Check Conditions
-def add_ranks(df, dist, MIN_SINR, TARGET_RSRP):
+# (the RSRP and SINR quintiles come from get_rank_quantiles, over the spot areas of all the frames)
+def add_ranks(df, dist, rsrp_quantiles, sinr_quantiles):
     df['rsrp_rank'] = None
     df['sinr_rank'] = None
     df['prbs_rank'] = None
@@ -571,9 +295,7 @@ def add_ranks(df, dist, MIN_SINR, TARGET_RSRP):
         top_3_probs = [p.split(':')[0] for p in top_probs[:3]]
 
         if 'Bad Coverage' in top_3_probs:
-            rsrp_filtered = df[df['Serving Cell RSRP (dBm)'] < TARGET_RSRP]['Serving Cell RSRP (dBm)']
-            rsrp_quantiles = [rsrp_filtered.quantile(q/5) for q in range(1, 6)]
-            if not rsrp_filtered.empty:
+            if rsrp_quantiles is not None:
                 def rank_rsrp(x):
                     if x < rsrp_quantiles[0]:
                         return 5
@@ -592,9 +314,7 @@ def add_ranks(df, dist, MIN_SINR, TARGET_RSRP):
                 df.loc[group.index[mask], 'rsrp_rank'] = group.loc[mask, 'Serving Cell RSRP (dBm)'].apply(rank_rsrp)
 
         if 'Overlapping' in top_3_probs:
-            sinr_filtered = df[df['Serving Cell RS SINR (dB)'] < MIN_SINR]['Serving Cell RS SINR (dB)']
-            sinr_quantiles = [sinr_filtered.quantile(q/5) for q in range(1, 6)]
-            if not sinr_filtered.empty:
+            if sinr_quantiles is not None:
                 def rank_sinr(x):
                     if x < sinr_quantiles[0]:
                         return 5
@@ -625,164 +345,192 @@ def add_ranks(df, dist, MIN_SINR, TARGET_RSRP):
     return df
 
 
+# Problem types of the analysis (Problem_Rules.json) and thresholds saved from the Set KPI Thresholds page
+problem_rules = load_problem_rules()
+analysis_thresholds = load_analysis_thresholds(problem_rules)
 # Define the minimum and maximum number of samples for a valid group
-MIN_NUM_SAMPLES = 7
-MAX_NUM_SAMPLES = 15
+MIN_NUM_SAMPLES = analysis_thresholds['MIN_NUM_SAMPLES']
+MAX_NUM_SAMPLES = analysis_thresholds['MAX_NUM_SAMPLES']
 # Define the target values and thresholds
-TARGET_THROUGHPUT = 10000
-MAX_DISTANCE = 500
-MAX_UE_TRANSMIT_POWER = 20
-TARGET_RSRP = -100
-RSRP_NEIGHBOUR_DIFFERENCE = 6
-MIN_SERVING_RSRP = -116
-MIN_RSRQ = -18
-MIN_SINR = 10
-MIN_PRB = 30
-MAX_RSRP_OVERLAP_RANGE = 5
-PRB_Utilization_Threshold= 80
+TARGET_THROUGHPUT = analysis_thresholds['TARGET_THROUGHPUT']
+MAX_DISTANCE = analysis_thresholds['MAX_DISTANCE']
+MAX_UE_TRANSMIT_POWER = analysis_thresholds['MAX_UE_TRANSMIT_POWER']
+TARGET_RSRP = analysis_thresholds['TARGET_RSRP']
+RSRP_NEIGHBOUR_DIFFERENCE = analysis_thresholds['RSRP_NEIGHBOUR_DIFFERENCE']
+MIN_SERVING_RSRP = analysis_thresholds['MIN_SERVING_RSRP']
+MIN_RSRQ = analysis_thresholds['MIN_RSRQ']
+MIN_SINR = analysis_thresholds['MIN_SINR']
+MIN_PRB = analysis_thresholds['MIN_PRB']
+MAX_RSRP_OVERLAP_RANGE = analysis_thresholds['MAX_RSRP_OVERLAP_RANGE']
+PRB_Utilization_Threshold = analysis_thresholds['PRB_Utilization_Threshold']
 
 # Define relative paths based on current script location
 current_dir = os.path.dirname(os.path.abspath(__file__))  # This gets the path to the current .py file
 base_path = current_dir  # Since your data files are in the same folder as the script
 
 # Load datasets using relative paths
-data_path = os.path.join(base_path, "..", "Uploaded_Test.csv")
+data_path = find_drive_test_file(os.path.join(base_path, ".."))
 enodeb_path = os.path.join(base_path, "..", "Uploaded_Cell.xlsx")
-uploaded_utilization_path = os.path.join(base_path, "..", "Uploaded_Utilization.xlsx")
-default_utilization_path = os.path.join(base_path,"..", "Nasr_City_PRB_Utilization.xlsx")
+utilization_path = find_utilization_file(os.path.join(base_path, ".."))
 
 # Load the datasets
-data = pd.read_csv(data_path, low_memory=False)
-data_Enode = pd.read_excel(enodeb_path)
-if os.path.exists(uploaded_utilization_path):
-    data_utilization = pd.read_excel(uploaded_utilization_path)
-    print(f"Using uploaded RB Utilization file: {uploaded_utilization_path}")
-elif os.path.exists(default_utilization_path):
-    data_utilization = pd.read_excel(default_utilization_path)
-    print(f"Using default RB Utilization file: {default_utilization_path}")
+data_Enode = load_cell_file(enodeb_path)
+utilization_store = load_utilization_store(utilization_path)
+if utilization_store is not None:
+    print(f"Using RB Utilization file: {utilization_path}")
 else:
-    data_utilization = pd.DataFrame() # Create empty DataFrame if neither file exists
     print("Warning: Neither uploaded nor default RB Utilization file found.")
 
-# Drop the initial column if it contains only null values
-data = data.dropna(axis=1, how='all') 
-
-# Fill forward missing values in 'Cell Identity (eNB Part)' and 'Cell Identity (Cell Part)' columns, as they dont appear except in rows that conatin null throughput
-data['Cell Identity (eNB Part)'] = data['Cell Identity (eNB Part)'].ffill()
-data['Cell Identity (Cell Part)'] = data['Cell Identity (Cell Part)'].ffill()
-
-# Convert HTTP Start & HTTP End to binary (1 if not NaN, 0 otherwise)
-data['HTTP Start'] = data['HTTP Start'].notna().astype(int)
-data['HTTP End'] = data['HTTP End'].notna().astype(int)
-data['HTTP IP Service Access Failure'] = data['HTTP IP Service Access Failure'].notna().astype(int)
-
-# Apply function to remove rows between HTTP End & HTTP Start
-data = filter_http_intervals(data)
-
-# Drop 'HTTP IP Service Access Failure' column
-data = data.drop(columns=['HTTP Start'])
-data = data.drop(columns=['HTTP End'])
-data = data.drop(columns=['HTTP IP Service Access Failure'])
-
-# Drop rows where 'PDSCH Phy Throughput (kbps)' is null
-data = data.dropna(subset=['PDSCH Phy Throughput (kbps)'])
-
-excluded_columns = [
-    'Neighbor Cell RSRP (dBm): N1', 'Neighbor Cell Identity: N1', 'Neighbor Cell DL EARFCN: N1',
-    'Neighbor Cell RSRP (dBm): N2', 'Neighbor Cell Identity: N2', 'Neighbor Cell DL EARFCN: N2',
-    'Neighbor Cell RSRP (dBm): N3', 'Neighbor Cell Identity: N3', 'Neighbor Cell DL EARFCN: N3',
-    'Neighbor Cell RSRP (dBm): N4', 'Neighbor Cell Identity: N4', 'Neighbor Cell DL EARFCN: N4'
-]
-data = data.dropna(subset=[col for col in data.columns if col not in excluded_columns])
-
-
- # Apply function to extract latitude and longitude for each row
-data[['Latitude_EnodeB', 'Longitude_EnodeB']] = data['Cell Identity (eNB Part)'].apply(lambda x: pd.Series(get_lat_lon(x)))
-data['Serving_Cell_Name'] = data.apply(get_cell_name, axis=1)
-data['PRB Utilization'] = data.apply(get_PRB_Utilization, axis=1)
-
-
-# Add the "Bad Throughput" column
-data['Bad Throughput'] = (data['PDSCH Phy Throughput (kbps)'] < TARGET_THROUGHPUT).astype(int)
-
-# Convert Time column to numeric format for processing
-data['Time2'] = data['Time'].apply(lambda x: sum(int(float(t)) * 60 ** i for i, t in enumerate(reversed(x.split(':')))))
-data = data.sort_values(by='Time2').reset_index(drop=True)
-
-# Convert 'Date' and 'Time' to DateTime for proper sorting
-data['Date'] = pd.to_datetime(data['Date'])
-data['Time'] = pd.to_datetime(data['Time'], format='%H:%M:%S').dt.time
-
-# Sort by Date then by Time
-data = data.sort_values(by=['Date', 'Time'])
-
-# Apply Spot_Area_Num logic
-data = assign_spots_area_num(data)
-
-# Remove the Time2 column as it is no longer needed
-data = data.drop(columns=['Time2'])
-# Compute Distance_To_Site using haversine formula
-
-data['Distance_To_Site'] = data.apply(lambda row: Sample_Site_Distance(row['Latitude'], row['Longitude'], row['Latitude_EnodeB'], row['Longitude_EnodeB']), axis=1)
-# Check if the distance to the site is greater than MAX_DISTANCE and UE Transmit Power is greater than MAX_UE_TRANSMIT_POWER
-data['Distance_Power_Check'] = data.apply(Distance_Power_Check, axis=1).astype(int)
-
-
-# Reorder columns to place 'Spot_Area_Num' before 'Bad Throughput'
-columns = list(data.columns)
-columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Latitude_EnodeB')))
-columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Longitude_EnodeB')))
-columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Distance_To_Site')))
-columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Distance_Power_Check')))
-columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Spot_Area_Num')))
-data = data[columns]
-
-# Add the "Bad Coverage" column (1 if it's bad coverage, else 0)
-data['Bad Coverage'] = ""
-
-# Apply Intra-Frequency handover calculations
-data['Intra-Frequency Handover'] = data.apply(intra_frequency_handover, axis=1).astype(int)
-
-# Apply Inter-Frequency handover calculations
-data['Inter-Frequency Handover'] = data.apply(inter_frequency_handover, axis=1).astype(int)
-
-data['Bad Coverage'] = data.apply(bad_coverage, axis=1).astype(int)
-
-# Apply overshooting calculation
-data['Overshooting'] = data.apply(overshooting, axis=1).astype(int)
-    
-# Apply overlapping detection and count
-data[['Overlapping', 'overlap_count', 'overlapping_cell_ids']] = data.apply(overlapping, axis=1)
-
-# Apply HighLoad detection
-data['High Load'] = data.apply(highload, axis=1).astype(int)
-
-# Add a new column that sums the specified issue columns
-data['Total Issues'] = data[['Bad Coverage', 'Intra-Frequency Handover', 'Inter-Frequency Handover', 'Overshooting', 'Overlapping', 'High Load']].sum(axis=1)
-
-# Ensure 'Area_Problems' column exists and is of string type
-data['Area_Problems'] = ""
-
-data = data.drop(columns=['Serving_Cell_Name', 'PRB Utilization'])
-
-# Apply the function to each Spot_Area_Num group
-data = data.groupby('Spot_Area_Num', group_keys=False, as_index=False).apply(lambda g: get_top_problems(g), include_groups=True)
-
-
-# Filter rows for Spots.csv where Spot_Area_Num > 0
-data_problem = data[data['Spot_Area_Num'] > 0].reset_index(drop=True)
-median_site_to_site_distance=calculate_median_distance(data_Enode)
-data_problem = add_ranks(data_problem,median_site_to_site_distance,MIN_SINR,TARGET_RSRP)
-data_problem = Dominant_Problem(data_problem)
-
-# Filter rows for Spots.csv where Spot_Area_Num = 0
-data_problem_free = data[data['Spot_Area_Num'] == 0].reset_index(drop=True)
-
-
-
-# Save the updated file
-data_problem.to_csv(os.path.join(current_dir, 'Problem_Areas_Code_Output.csv'), index=False)
-
-# Save the updated file
-data_problem_free = data_problem_free[data_problem_free['PDSCH Phy Throughput (kbps)'] >= TARGET_THROUGHPUT]
-data_problem_free.to_csv(os.path.join(current_dir, 'Problem_Free_Areas_Code_Output.csv'), index=False)
\ No newline at end of file
+# Hash index of the cell file, built once for all the samples
+cell_index = CellIndex(data_Enode)
+median_site_to_site_distance = SiteIndex(data_Enode).median_site_distance()
+
+# Function to get the PRB utilization of the serving cell of each sample, at the hour of the sample
+def get_prb_utilization(data, cell_names):
+    if utilization_store is None:
+        return np.full(len(data), "", dtype=object)
+    return utilization_store.lookup_samples(data, cell_names)
+
+# Function to add the per-sample problem columns to the preprocessed data
+def detect_sample_problems(data):
+    # Add the serving cell name and its PRB utilization before 'Bad Throughput'
+    cell_names = cell_index.get_cell_names(data['Serving Cell Identity'], data['Serving Cell DL EARFCN'], data['Cell Identity (eNB Part)'])
+    data.insert(data.columns.get_loc('Bad Throughput'), 'Serving_Cell_Name', cell_names)
+    data.insert(data.columns.get_loc('Bad Throughput'), 'PRB Utilization', get_prb_utilization(data, cell_names))
+
+    # Reorder columns to place 'Spot_Area_Num' before 'Bad Throughput'
+    columns = list(data.columns)
+    columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Latitude_EnodeB')))
+    columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Longitude_EnodeB')))
+    columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Distance_To_Site')))
+    columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Distance_Power_Check')))
+    for col in SITE_GEOMETRY_COLUMNS:
+        columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index(col)))
+    columns.insert(columns.index('Bad Throughput'), columns.pop(columns.index('Spot_Area_Num')))
+    data = data[columns].copy()
+
+    # Detect the per-sample problems of all the samples at once (High Load last, it needs the other flags)
+    problems = detect_problems(data, problem_rules, analysis_thresholds)
+    for col in problem_rules.output_columns:
+        data[col] = problems[col]
+
+    # Add a new column that sums the specified issue columns
+    data['Total Issues'] = data[problem_rules.problem_columns].sum(axis=1)
+
+    # Ensure 'Area_Problems' column exists and is of string type
+    data['Area_Problems'] = ""
+
+    data = data.drop(columns=['Serving_Cell_Name', 'PRB Utilization'])
+    return data
+
+problem_free_output_path = os.path.join(current_dir, 'Problem_Free_Areas_Code_Output.csv')
+grid_bins_output_path = os.path.join(current_dir, 'Grid_Bins_Code_Output.csv')
+problem_areas_output_path = os.path.join(current_dir, 'Problem_Areas_Code_Output.csv')
+
+# The samples of the spot areas are kept on disk, one file per frame, and analyzed below one frame at a time
+# (a spot area never spans two frames), so only one frame is held in memory even for drive tests larger than it
+spot_dir = tempfile.mkdtemp(prefix='Spot_Areas_')
+atexit.register(shutil.rmtree, spot_dir, True)
+spot_frame_paths = []
+
+# Function to keep the samples of the spot areas of a frame on disk
+def save_spot_frame(frame):
+    path = os.path.join(spot_dir, f"frame_{len(spot_frame_paths):06d}.pkl")
+    frame.to_pickle(path)
+    spot_frame_paths.append(path)
+
+# A live drive test (plain CSV growing between runs) is processed incrementally when requested
+incremental = incremental_mode_enabled() and data_path.lower().endswith('.csv') and not get_campaign_logs()
+
+if incremental:
+    # Incremental mode: only the rows appended since the last run are analyzed, the samples of the
+    # closed spot areas are kept between runs and the still-open spot area is analyzed provisionally
+    thresholds = [MIN_NUM_SAMPLES, MAX_NUM_SAMPLES, TARGET_THROUGHPUT, MAX_DISTANCE, MAX_UE_TRANSMIT_POWER, TARGET_RSRP,
+                  RSRP_NEIGHBOUR_DIFFERENCE, MIN_SERVING_RSRP, MIN_RSRQ, MIN_SINR, MIN_PRB, MAX_RSRP_OVERLAP_RANGE,
+                  PRB_Utilization_Threshold]
+    config_key = get_config_key(thresholds, [enodeb_path, utilization_path or '', PROBLEM_RULES_PATH, os.path.abspath(__file__)])
+    incremental_run = IncrementalDriveTest('Data_Analyzing', data_path, TARGET_THROUGHPUT, MIN_NUM_SAMPLES, MAX_NUM_SAMPLES, config_key)
+    grid_samples_path = os.path.join(incremental_run.run_dir, 'grid_samples.csv')
+    for chunk in incremental_run.chunks():
+        chunk = detect_sample_problems(add_site_columns(chunk, cell_index, TARGET_THROUGHPUT, MAX_DISTANCE, MAX_UE_TRANSMIT_POWER, median_site_to_site_distance))
+        incremental_run.save_frame(chunk[chunk['Spot_Area_Num'] > 0])
+        incremental_run.write_output(grid_samples_path, get_grid_samples(chunk))
+        incremental_run.write_output(problem_free_output_path, chunk[(chunk['Spot_Area_Num'] == 0) & (chunk['PDSCH Phy Throughput (kbps)'] >= TARGET_THROUGHPUT)])
+    spot_frame_paths.extend(incremental_run.get_frame_paths())
+
+    open_spot = incremental_run.flush()
+    if open_spot is not None:
+        open_spot = detect_sample_problems(add_site_columns(open_spot, cell_index, TARGET_THROUGHPUT, MAX_DISTANCE, MAX_UE_TRANSMIT_POWER, median_site_to_site_distance))
+        save_spot_frame(open_spot[open_spot['Spot_Area_Num'] > 0])
+        incremental_run.write_output(grid_samples_path, get_grid_samples(open_spot), provisional=True)
+        incremental_run.write_output(problem_free_output_path, open_spot[(open_spot['Spot_Area_Num'] == 0) & (open_spot['PDSCH Phy Throughput (kbps)'] >= TARGET_THROUGHPUT)], provisional=True)
+    incremental_run.commit()
+
+    # The grid samples of all the runs are read back part by part
+    grid_bins = GridBinAggregator()
+    if os.path.exists(grid_samples_path):
+        for grid_samples in pd.read_csv(grid_samples_path, chunksize=STREAM_CHUNK_SIZE):
+            grid_bins.add_samples(grid_samples)
+else:
+    # Preprocessed drive test, reused from the upload when the drive test, cell file and thresholds did not change:
+    # the problem-free samples are written out frame by frame and the samples of the spot areas are kept on disk
+    grid_bins = GridBinAggregator()
+    first_chunk = True
+    for chunk in preprocess_drive_test(data_path, enodeb_path, TARGET_THROUGHPUT, MIN_NUM_SAMPLES, MAX_NUM_SAMPLES, MAX_DISTANCE, MAX_UE_TRANSMIT_POWER):
+        chunk = detect_sample_problems(chunk)
+        save_spot_frame(chunk[chunk['Spot_Area_Num'] > 0])
+        grid_bins.add_samples(get_grid_samples(chunk))
+        chunk_problem_free = chunk[(chunk['Spot_Area_Num'] == 0) & (chunk['PDSCH Phy Throughput (kbps)'] >= TARGET_THROUGHPUT)]
+        chunk_problem_free.to_csv(problem_free_output_path, index=False, mode='w' if first_chunk else 'a', header=first_chunk)
+        first_chunk = False
+
+# Aggregate all the analyzed samples per fixed-size grid bin (same bins for every drive test)
+grid_bins_output = grid_bins.summarize()
+if grid_bins_output is not None:
+    grid_bins_output.to_csv(grid_bins_output_path, index=False)
+
+# The RSRP and SINR ranks compare each sample with the samples of all the spot areas: only these two columns are read first
+rsrp_values, sinr_values = [], []
+for path in spot_frame_paths:
+    data = pd.read_pickle(path)
+    rsrp_values.append(data.loc[data['Serving Cell RSRP (dBm)'] < TARGET_RSRP, 'Serving Cell RSRP (dBm)'].to_numpy(dtype='float64'))
+    sinr_values.append(data.loc[data['Serving Cell RS SINR (dB)'] < MIN_SINR, 'Serving Cell RS SINR (dB)'].to_numpy(dtype='float64'))
+rsrp_quantiles, sinr_quantiles = get_rank_quantiles(rsrp_values), get_rank_quantiles(sinr_values)
+del rsrp_values, sinr_values
+
+# Analyze the spot areas frame by frame and append them to the output
+spot_centroids = []
+data_problem = None
+for path in spot_frame_paths:
+    data = pd.read_pickle(path)
+
+    # Apply the function to each Spot_Area_Num group
+    data = data.groupby('Spot_Area_Num', group_keys=False, as_index=False).apply(lambda g: get_top_problems(g), include_groups=True)
+
+    # Filter rows for Spots.csv where Spot_Area_Num > 0
+    frame_problem = data[data['Spot_Area_Num'] > 0].reset_index(drop=True)
+    if not len(frame_problem) and data_problem is not None:
+        continue
+    frame_problem = add_ranks(frame_problem, median_site_to_site_distance, rsrp_quantiles, sinr_quantiles)
+    frame_problem = Dominant_Problem(frame_problem)
+
+    # Save the spot areas of the frame (a frame without spot area only writes the header, if no other frame has one)
+    if data_problem is None or not len(data_problem):
+        frame_problem.to_csv(problem_areas_output_path, index=False)
+        spot_centroids = []
+    else:
+        frame_problem.to_csv(problem_areas_output_path, index=False, mode='a', header=False)
+    spot_centroids.append(get_spot_centroids(frame_problem))
+    data_problem = frame_problem
+
+# A drive test left without any sample after the preprocessing has no frame
+if data_problem is None:
+    data_problem = pd.DataFrame(columns=['Latitude', 'Longitude', 'Spot_Area_Num', 'Area_Problems'])
+    data_problem = Dominant_Problem(add_ranks(data_problem, median_site_to_site_distance, rsrp_quantiles, sinr_quantiles))
+    data_problem.to_csv(problem_areas_output_path, index=False)
+    spot_centroids.append(get_spot_centroids(data_problem))
+
+# Assign the spot areas to persistent areas shared with the previously analyzed drive tests
+# (a live drive test keeps one key while it grows)
+run_key = f"live_{os.path.basename(data_path)}" if incremental else get_run_key(data_path)
+update_persistent_areas('Code', run_key, pd.concat(spot_centroids, ignore_index=True), os.path.join(current_dir, 'Persistent_Areas_Code_Output.csv'))
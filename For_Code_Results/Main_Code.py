@@ -1,5 +1,9 @@
-import subprocess
 import os
+import sys
+
+# Make the shared modules in the project root importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Pipeline_Stages import PIPELINE_STAGES, run_stage
 
 # Change working directory to the folder containing the scripts
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
@@ -13,7 +17,9 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 # Run the script using subprocess
 # subprocess.run(["python", script_path], check=True)
 
-subprocess.run(["python", "Input_filtering_Area_Division.py"], check=True)
-subprocess.run(["python", "Data_Analyzing.py"], check=True)
+# Each script runs only if a threshold, file or module it depends on changed since its last run:
+# after a change of a detection threshold only Data_Analyzing.py runs, on the cached preprocessed drive test
+for script in PIPELINE_STAGES:
+    run_stage(script, current_dir)
 
 print("All scripts executed successfully. Final output saved in 'Analyzed_Areas_Code_Output.csv'.")
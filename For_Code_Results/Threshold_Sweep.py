@@ -0,0 +1,58 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Make the shared modules in the project root importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Cell_Cache import load_cell_file
+from Cell_Index import CellIndex
+from Drive_Test_Ingest import find_drive_test_file
+from Drive_Test_Preprocess import preprocess_drive_test
+from Problem_Rules import load_problem_rules
+from Analysis_Thresholds import load_analysis_thresholds
+from Problem_Sweep import ThresholdSweep, load_threshold_sets
+from Utilization_Store import find_utilization_file, load_utilization_store
+
+# Thresholds saved from the Set KPI Thresholds page; the problem thresholds in threshold_sweep.json are swept
+problem_rules = load_problem_rules()
+analysis_thresholds = load_analysis_thresholds(problem_rules)
+# Define the minimum and maximum number of samples for a valid group
+MIN_NUM_SAMPLES = analysis_thresholds['MIN_NUM_SAMPLES']
+MAX_NUM_SAMPLES = analysis_thresholds['MAX_NUM_SAMPLES']
+# Define the target values and thresholds
+MAX_DISTANCE = analysis_thresholds['MAX_DISTANCE']
+MAX_UE_TRANSMIT_POWER = analysis_thresholds['MAX_UE_TRANSMIT_POWER']
+
+# Define relative paths based on current script location
+current_dir = os.path.dirname(os.path.abspath(__file__))
+data_path = find_drive_test_file(os.path.join(current_dir, ".."))
+enodeb_path = os.path.join(current_dir, "..", "Uploaded_Cell.xlsx")
+utilization_path = find_utilization_file(os.path.join(current_dir, ".."))
+
+threshold_sets = load_threshold_sets(problem_rules, analysis_thresholds)
+cell_index = CellIndex(load_cell_file(enodeb_path))
+utilization_store = load_utilization_store(utilization_path)
+
+# The spot areas depend on the throughput target: the sets are evaluated together per target,
+# each target reading its preprocessed drive test (computed once, then reused from the cache)
+summaries = []
+for target_throughput in dict.fromkeys(threshold_set['TARGET_THROUGHPUT'] for threshold_set in threshold_sets):
+    positions = [position for position, threshold_set in enumerate(threshold_sets) if threshold_set['TARGET_THROUGHPUT'] == target_throughput]
+    sweep = ThresholdSweep(problem_rules, [threshold_sets[position] for position in positions])
+    for data in preprocess_drive_test(data_path, enodeb_path, target_throughput, MIN_NUM_SAMPLES, MAX_NUM_SAMPLES, MAX_DISTANCE, MAX_UE_TRANSMIT_POWER):
+        data = data[data['Spot_Area_Num'] > 0].copy()
+        if utilization_store is None:
+            data['PRB Utilization'] = np.full(len(data), "", dtype=object)
+        else:
+            cell_names = cell_index.get_cell_names(data['Serving Cell Identity'], data['Serving Cell DL EARFCN'], data['Cell Identity (eNB Part)'])
+            data['PRB Utilization'] = utilization_store.lookup_samples(data, cell_names)
+        sweep.add_samples(data)
+    summary = sweep.summarize()
+    summary.insert(0, 'Set', [position + 1 for position in positions])
+    summaries.append(summary)
+
+# One row per threshold set, in the order of the grid
+summary = pd.concat(summaries, ignore_index=True).sort_values('Set').reset_index(drop=True)
+summary.to_csv(os.path.join(current_dir, 'Threshold_Sweep_Code_Output.csv'), index=False)
+print(f"Threshold sweep complete: {len(summary)} threshold sets evaluated.")
@@ -1,7 +1,13 @@
 import os
+import sys
 import pandas as pd
 import numpy as np
 
+# Make the shared modules in the project root importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from Cell_Cache import add_sector_keys, load_cell_file
+from Utilization_Store import CELL_NAME_COLUMN, UTILIZATION_COLUMN, find_utilization_file, load_utilization_store
+
 # Get the current script's directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -45,38 +51,9 @@ result_df.to_csv(result_output_path, index=False)
 
 print(f"Analysis results saved to: {result_output_path}")
 
-# Read the Uploaded_Cell.xlsx file
-uploaded_cell_df = pd.read_excel(uploaded_cell_path)
-
-# Create a modified_CellName column based on the specified rules
-def modify_cell_name(cell_name):
-    if not isinstance(cell_name, str):
-        return cell_name
-    
-    # Check if the cell name starts with L26_ and ends with _11, _12, _13, or _14
-    if cell_name.startswith('L26_'):
-        if cell_name.endswith('_11'):
-            return cell_name[:-3] + '_01'
-        elif cell_name.endswith('_12'):
-            return cell_name[:-3] + '_02'
-        elif cell_name.endswith('_13'):
-            return cell_name[:-3] + '_03'
-        elif cell_name.endswith('_14'):
-            return cell_name[:-3] + '_04'
-    
-    # Return original name if no modifications needed
-    return cell_name
-
-# Apply the function to create the new column
-uploaded_cell_df['modified_CellName'] = uploaded_cell_df['CellNAME'].apply(modify_cell_name)
-
-# Save the modified DataFrame to a new Excel file
-modified_cell_path = os.path.abspath(
-    os.path.join(script_dir, '..', '..', 'Uploaded_Cell_modified.xlsx')
-)
-uploaded_cell_df.to_excel(modified_cell_path, index=False)
-
-print(f"Modified cell file saved to: {modified_cell_path}")
+# Read the Uploaded_Cell.xlsx file (through its Parquet copy, with the sector keys
+# 'modified_CellName' and 'CellNAME_Lookup' computed once when the cell file was ingested)
+uploaded_cell_df = load_cell_file(uploaded_cell_path)
 
 # Rename columns in result_df to match with uploaded_cell_df
 result_df = result_df.rename(columns={
@@ -140,34 +117,13 @@ sector_merged_df = pd.merge(
 cell_details_path = os.path.join(script_dir, 'Highload_Problem_Cells_Detailed_2.csv')
 cell_details_df = pd.read_csv(cell_details_path)
 
-# Extract the right part of CellNAME (e.g., L1214_03 from L21_L1214_03) 
-# by removing first 4 characters
-cell_details_df['CellNAME_Lookup'] = cell_details_df['CellNAME'].apply(
-    lambda x: x[x.find('_')+1:] if isinstance(x, str) and '_' in x else x
-)
-
-# Create a modified_CellName column for cell_details_df using the same rules
-cell_details_df['modified_CellName'] = cell_details_df['CellNAME'].apply(modify_cell_name)
-
-# Extract the right part of CellNAME
-# Option 1: Extract from original CellNAME
-# cell_details_df['CellNAME_Lookup'] = cell_details_df['CellNAME'].apply(
-#     lambda x: x[x.find('_')+1:] if isinstance(x, str) and '_' in x else x
-# )
-
-# Option 2: Extract from modified_CellName instead
-cell_details_df['CellNAME_Lookup'] = cell_details_df['modified_CellName'].apply(
-    lambda x: x[x.find('_')+1:] if isinstance(x, str) and '_' in x else x
-)
+# Add the sector keys of the dominant cells: the L2600 sector suffixes renamed ('modified_CellName')
+# and the name without its band prefix, e.g. L1214_03 from L21_L1214_03 ('CellNAME_Lookup')
+cell_details_df = add_sector_keys(cell_details_df)
 
 # Create a new dataframe with the lookup values including modified names
 sector_result_df = cell_details_df[['Spot_Area_Num', 'CellNAME', 'modified_CellName', 'CellNAME_Lookup']].copy()
 
-# Add the same transformation to the uploaded_cell_df
-uploaded_cell_df['CellNAME_Lookup'] = uploaded_cell_df['modified_CellName'].apply(
-    lambda x: x[x.find('_')+1:] if isinstance(x, str) and '_' in x else x
-)
-
 # Merge with uploaded_cell_df based on the CellNAME_Lookup
 sector_merged_df = pd.merge(
     sector_result_df,
@@ -193,9 +149,15 @@ sector_merged_df['serving_band_flag'] = sector_merged_df['match_key'].isin(merge
 # Drop the temporary match_key column
 sector_merged_df = sector_merged_df.drop('match_key', axis=1)
 
-# Read PRB Utilization file and merge DL_PRB UTILIZATION
-prb_util_path = r'C:\Users\OMAR\Desktop\gui_full_3\gui_full\Nasr City PRB Utilization.xlsx'
-prb_util_df = pd.read_excel(prb_util_path)
+# Read the PRB utilization store and merge the busy-hour DL_PRB UTILIZATION of each cell
+utilization_path = find_utilization_file(os.path.abspath(os.path.join(script_dir, '..', '..')))
+utilization_store = load_utilization_store(utilization_path)
+if utilization_store is not None:
+    prb_util_df = utilization_store.busy_hour()
+    print(f"Using RB Utilization file: {utilization_path}")
+else:
+    prb_util_df = pd.DataFrame(columns=[CELL_NAME_COLUMN, UTILIZATION_COLUMN]) # Create empty DataFrame if neither file exists
+    print("Warning: Neither uploaded nor default RB Utilization file found for Highload Recommendation.")
 
 # Merge DL_PRB UTILIZATION into sector_merged_df based on Cell Name/CellNAME
 sector_merged_df = sector_merged_df.merge(
@@ -0,0 +1,281 @@
+import numpy as np
+import pandas as pd
+
+from Site_Index import EARTH_RADIUS_M
+
+# Side of a grid bin in meters
+GRID_BIN_SIZE_M = 50
+
+# Length of one degree of latitude in meters
+METERS_PER_DEGREE = EARTH_RADIUS_M * np.pi / 180
+
+# Sample measurements summarized per bin, with the name of their median column
+GRID_METRIC_COLUMNS = {
+    'Serving Cell RSRP (dBm)': 'Median RSRP (dBm)',
+    'Serving Cell RS SINR (dB)': 'Median SINR (dB)',
+    'PDSCH Phy Throughput (kbps)': 'Median Throughput (kbps)'
+}
+
+# Histogram buckets of each measurement, from which the median of a bin is interpolated:
+# 1 dB for RSRP and SINR, 32 log-spaced buckets per decade (about 7 %) for the throughput
+GRID_METRIC_BUCKETS = {
+    'Serving Cell RSRP (dBm)': np.arange(-160.0, -19.0, 1.0),
+    'Serving Cell RS SINR (dB)': np.arange(-40.0, 61.0, 1.0),
+    'PDSCH Phy Throughput (kbps)': np.concatenate([[0.0], np.logspace(0, 7, 7 * 32 + 1)])
+}
+
+# Per-sample problem flags counted per bin
+GRID_PROBLEM_COLUMNS = ['Bad Throughput', 'Bad Coverage', 'Intra-Frequency Handover', 'Inter-Frequency Handover',
+                        'Overshooting', 'Overlapping', 'High Load']
+
+# Factor combining the row and column of a bin into one key (columns are below 2**32)
+GRID_KEY_FACTOR = 2 ** 32
+
+# Function to get the latitude step of the grid and the longitude step of each grid row
+def _get_steps(rows, bin_size_m):
+    lat_step = bin_size_m / METERS_PER_DEGREE
+    center_lat = np.radians(-90 + (rows + 0.5) * lat_step)
+    return lat_step, lat_step / np.maximum(np.cos(center_lat), 1e-6)
+
+# Function to assign each sample to a fixed-size grid bin
+def assign_grid_bins(lat, lon, bin_size_m=GRID_BIN_SIZE_M):
+    """
+    The grid is fixed on the Earth (rows of equal latitude height, each row
+    divided into bins of about the same width in meters), so the same street
+    falls in the same bins in every drive test and campaign.
+
+    Parameters:
+        lat, lon (array-like): Coordinates of the samples in decimal degrees (without NaN).
+        bin_size_m (float): Side of a bin in meters.
+
+    Returns:
+        tuple: (rows, columns) int64 arrays identifying the bin of each sample.
+    """
+    lat, lon = np.asarray(lat, dtype='float64'), np.asarray(lon, dtype='float64')
+    lat_step = bin_size_m / METERS_PER_DEGREE
+    rows = np.floor((lat + 90) / lat_step).astype(np.int64)
+    _, lon_steps = _get_steps(rows, bin_size_m)
+    cols = np.floor((lon + 180) / lon_steps).astype(np.int64)
+    return rows, cols
+
+# Function to get the center of grid bins
+def get_grid_bin_centers(rows, cols, bin_size_m=GRID_BIN_SIZE_M):
+    rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+    lat_step, lon_steps = _get_steps(rows, bin_size_m)
+    return -90 + (rows + 0.5) * lat_step, -180 + (cols + 0.5) * lon_steps
+
+# Function to keep only the bin, measurements and problem flags of analyzed samples
+def get_grid_samples(data, bin_size_m=GRID_BIN_SIZE_M):
+    """
+    Parameters:
+        data (pd.DataFrame): Analyzed samples with 'Latitude', 'Longitude' and the problem columns.
+
+    Returns:
+        pd.DataFrame: 'Grid_Row', 'Grid_Col' and the measurement and problem columns present,
+            for the samples with a position.
+    """
+    data = data.dropna(subset=['Latitude', 'Longitude'])
+    rows, cols = assign_grid_bins(data['Latitude'], data['Longitude'], bin_size_m)
+    columns = [col for col in list(GRID_METRIC_COLUMNS) + GRID_PROBLEM_COLUMNS if col in data.columns]
+    samples = data[columns].apply(pd.to_numeric, errors='coerce').astype('float64')
+    samples.insert(0, 'Grid_Row', rows)
+    samples.insert(1, 'Grid_Col', cols)
+    return samples.reset_index(drop=True)
+
+# Function to merge histogram entries, adding the counts of the entries with the same code
+def _merge_entries(parts):
+    codes = np.concatenate([part[0] for part in parts])
+    counts = np.concatenate([part[1] for part in parts])
+    codes, inverse = np.unique(codes, return_inverse=True)
+    return codes, np.bincount(inverse.reshape(-1), weights=counts, minlength=len(codes)).astype(np.int64)
+
+# Function to get the median of each bin from its histogram
+def _get_medians(codes, counts, edges, minimums, maximums):
+    """
+    Each sample is taken at the middle of its share of its bucket (samples
+    spread evenly over the bucket), so the median is off by less than one
+    bucket width. It is kept within the smallest and largest value of the
+    bin, which makes it exact for a bin whose samples share one value.
+
+    Parameters:
+        codes (np.ndarray): Sorted histogram entries, coded as bin position * number of buckets + bucket.
+        counts (np.ndarray): Number of samples of each entry.
+        edges (np.ndarray): Bucket edges; values beyond them are counted in the first or last bucket.
+        minimums, maximums (np.ndarray): Smallest and largest value of each bin position.
+
+    Returns:
+        np.ndarray: Median of each bin position (NaN for a bin without values).
+    """
+    medians = np.full(len(minimums), np.nan)
+    if len(codes) == 0:
+        return medians
+    positions, buckets = np.divmod(codes, len(edges) - 1)
+    totals = np.bincount(positions, weights=counts, minlength=len(minimums)).astype(np.int64)
+    ends = np.cumsum(counts)
+    bin_starts = np.cumsum(totals) - totals
+
+    # The median is the mean of the two middle samples of the bin (the same one for an odd count)
+    middle_values = []
+    for middle in ((totals - 1) // 2, totals // 2):
+        rank = bin_starts + middle
+        entries = np.minimum(np.searchsorted(ends, rank, side='right'), len(ends) - 1)
+        share = (rank - (ends[entries] - counts[entries]) + 0.5) / counts[entries]
+        lower, upper = edges[buckets[entries]], edges[buckets[entries] + 1]
+        middle_values.append(lower + share * (upper - lower))
+    has_values = totals > 0
+    medians[has_values] = np.clip((middle_values[0][has_values] + middle_values[1][has_values]) / 2,
+                                  minimums[has_values], maximums[has_values])
+    return medians
+
+class GridBinAggregator:
+    """
+    Per-bin partial aggregates of the analyzed samples, added frame by frame:
+    the number of samples and of samples with each problem, and for each
+    measurement a histogram on the fixed buckets of GRID_METRIC_BUCKETS with
+    its smallest and largest value, from which the median is interpolated.
+
+    Histograms only keep their non-empty (bin, bucket) entries, so their size
+    is bounded by both the number of samples and the number of bins times
+    the number of buckets. The entries of new frames are merged in once they
+    outnumber the merged ones, so adding samples costs O(n log n) overall.
+    """
+    def __init__(self, bin_size_m=GRID_BIN_SIZE_M):
+        self.bin_size_m = bin_size_m
+
+        # Position of each (Grid_Row, Grid_Col) bin in the aggregate arrays, in order of appearance
+        self.bin_positions = {}
+        self.bin_count = 0
+
+        # Number of samples (first column) and of samples with each problem, per bin position
+        self.counts = np.zeros((0, 1 + len(GRID_PROBLEM_COLUMNS)))
+        self.problem_columns = set()
+
+        # Merged histogram entries (codes, counts), entries of the frames added since, smallest and largest value
+        self.histograms = {}
+        self.pending = {}
+        self.minimums = {}
+        self.maximums = {}
+
+    # Function to get the position of the bin of each sample, adding the bins seen for the first time
+    def _get_positions(self, rows, cols):
+        keys, inverse = np.unique(rows.astype(np.int64) * GRID_KEY_FACTOR + cols.astype(np.int64), return_inverse=True)
+        positions = np.empty(len(keys), dtype=np.int64)
+        for index, key in enumerate(keys.tolist()):
+            if key not in self.bin_positions:
+                self.bin_positions[key] = self.bin_count
+                self.bin_count += 1
+            positions[index] = self.bin_positions[key]
+
+        # Per-bin arrays grow by doubling, so adding bins costs a constant time per bin on average
+        capacity = len(self.counts)
+        if self.bin_count > capacity:
+            capacity = max(self.bin_count, 2 * capacity)
+            self.counts = self._grow(self.counts, capacity, 0)
+            for col in self.minimums:
+                self.minimums[col] = self._grow(self.minimums[col], capacity, np.inf)
+                self.maximums[col] = self._grow(self.maximums[col], capacity, -np.inf)
+        return positions[inverse.reshape(-1)]
+
+    # Function to extend a per-bin array to a number of bins
+    @staticmethod
+    def _grow(values, capacity, fill_value):
+        grown = np.full((capacity,) + values.shape[1:], fill_value, dtype=values.dtype)
+        grown[:len(values)] = values
+        return grown
+
+    # Function to merge the pending histogram entries of a measurement into its merged entries
+    def _merge_pending(self, col):
+        if self.pending[col]:
+            self.histograms[col] = _merge_entries([self.histograms[col]] + self.pending[col])
+            self.pending[col] = []
+
+    # Function to add the samples of a frame to the aggregates
+    def add_samples(self, samples):
+        """
+        Parameters:
+            samples (pd.DataFrame): Output of get_grid_samples.
+        """
+        if samples.empty:
+            return
+        positions = self._get_positions(samples['Grid_Row'].to_numpy(), samples['Grid_Col'].to_numpy())
+        capacity = len(self.counts)
+
+        self.counts[:, 0] += np.bincount(positions, minlength=capacity)
+        for index, col in enumerate(GRID_PROBLEM_COLUMNS, start=1):
+            if col in samples.columns:
+                self.problem_columns.add(col)
+                flags = np.nan_to_num(samples[col].to_numpy(dtype='float64'))
+                self.counts[:, index] += np.bincount(positions, weights=flags, minlength=capacity)
+
+        for col, edges in GRID_METRIC_BUCKETS.items():
+            if col not in samples.columns:
+                continue
+            if col not in self.histograms:
+                self.histograms[col] = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+                self.pending[col] = []
+                self.minimums[col] = np.full(capacity, np.inf)
+                self.maximums[col] = np.full(capacity, -np.inf)
+            values = samples[col].to_numpy(dtype='float64')
+            has_value = ~np.isnan(values)
+            values, bins = values[has_value], positions[has_value]
+            buckets = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+            self.pending[col].append(np.unique(bins * (len(edges) - 1) + buckets, return_counts=True))
+            np.minimum.at(self.minimums[col], bins, values)
+            np.maximum.at(self.maximums[col], bins, values)
+            if sum(len(codes) for codes, _ in self.pending[col]) >= len(self.histograms[col][0]):
+                self._merge_pending(col)
+
+    # Function to get the size of the aggregates in bytes
+    def nbytes(self):
+        arrays = [self.counts] + list(self.minimums.values()) + list(self.maximums.values())
+        for col in self.histograms:
+            arrays += list(self.histograms[col]) + [values for entries in self.pending[col] for values in entries]
+        return sum(values.nbytes for values in arrays)
+
+    # Function to get the aggregates of each bin
+    def summarize(self):
+        """
+        Returns:
+            pd.DataFrame: One row per bin with its center, the number of samples, the median
+                measurements and the number of samples with each problem (None if no sample was added).
+        """
+        if self.bin_count == 0:
+            return None
+
+        # Bins are listed by grid row, then grid column
+        keys = np.fromiter(self.bin_positions.keys(), dtype=np.int64, count=self.bin_count)
+        positions = np.fromiter(self.bin_positions.values(), dtype=np.int64, count=self.bin_count)
+        order = np.argsort(keys)
+        keys, positions = keys[order], positions[order]
+
+        bins = pd.DataFrame({'Grid_Row': keys // GRID_KEY_FACTOR, 'Grid_Col': keys % GRID_KEY_FACTOR})
+        latitudes, longitudes = get_grid_bin_centers(bins['Grid_Row'], bins['Grid_Col'], self.bin_size_m)
+        bins['Latitude'] = latitudes
+        bins['Longitude'] = longitudes
+        bins['Samples'] = self.counts[positions, 0].astype('int64')
+        for col, name in GRID_METRIC_COLUMNS.items():
+            if col in self.histograms:
+                self._merge_pending(col)
+                medians = _get_medians(*self.histograms[col], GRID_METRIC_BUCKETS[col], self.minimums[col], self.maximums[col])
+                bins[name] = medians[positions]
+
+        # Problem counts are whole numbers of samples
+        for index, col in enumerate(GRID_PROBLEM_COLUMNS, start=1):
+            if col in self.problem_columns:
+                bins[col] = self.counts[positions, index].astype('int64')
+        return bins
+
+# Function to aggregate the samples of each grid bin in one pass
+def aggregate_grid_bins(samples, bin_size_m=GRID_BIN_SIZE_M):
+    """
+    Parameters:
+        samples (pd.DataFrame): Output of get_grid_samples (possibly concatenated over chunks or drives).
+        bin_size_m (float): Side of a bin in meters, as used to build the samples.
+
+    Returns:
+        pd.DataFrame: One row per bin with its center, the number of samples, the median
+            measurements and the number of samples with each problem.
+    """
+    grid_bins = GridBinAggregator(bin_size_m)
+    grid_bins.add_samples(samples)
+    return grid_bins.summarize()
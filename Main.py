@@ -7,6 +7,16 @@ import os
 import json
 import time
 import sys
+import shutil
+import hashlib
+from werkzeug.utils import secure_filename
+from Drive_Test_Ingest import (CACHE_DIR, CAMPAIGN_DIR, DRIVE_TEST_SUFFIXES, compute_file_hash, get_file_suffix,
+                               open_decompressed, save_stream_with_hash)
+from Cell_Cache import ingest_cell_file
+from Sector_Geometry import ingest_sector_geometry
+from Utilization_Store import UTILIZATION_FILE_NAMES, ingest_utilization_file
+from Problem_Sweep import SWEEP_GRID_PATH
+from Analysis_Thresholds import PREPROCESS_THRESHOLDS, load_analysis_thresholds
 sys.stdout.reconfigure(encoding='utf-8')
 
 app = Flask(__name__)
@@ -24,6 +34,66 @@ model = None
 X_train = None
 label_encoder = None
 
+# ========== UPLOAD CACHE ========== #
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Outputs of Graphs_filtering_Area_Division.py, kept per uploaded content
+GRAPHS_CACHE_DIR = os.path.join(CACHE_DIR, "Graphs")
+GRAPHS_CURRENT_KEY_PATH = os.path.join(GRAPHS_CACHE_DIR, "current_key.txt")
+GRAPHS_OUTPUT_PATH = os.path.join(project_dir, "Graphs_Divided_input.csv")
+
+# Files that change Graphs_Divided_input.csv besides the drive test itself
+GRAPHS_DEPENDENCIES = ["Uploaded_Cell.xlsx", "Graphs_filtering_Area_Division.py", "Drive_Test_Preprocess.py", "Cell_Index.py", "Cell_Cache.py",
+                       "Drive_Test_Ingest.py", "Drive_Test_Schema.py", "Drive_Test_Utils.py", "Analysis_Thresholds.py"]
+
+# Function to compute the cache key of the Graphs output for the uploaded drive test(s)
+def get_graphs_cache_key(test_hashes):
+    digest = hashlib.sha256()
+    for test_hash in test_hashes:
+        digest.update(test_hash.encode())
+    for name in GRAPHS_DEPENDENCIES:
+        path = os.path.join(project_dir, name)
+        digest.update(compute_file_hash(path).encode() if os.path.exists(path) else b"-")
+
+    # Only the preprocessing thresholds change the divided samples
+    thresholds = load_analysis_thresholds()
+    digest.update(repr([thresholds[name] for name in PREPROCESS_THRESHOLDS]).encode())
+    return digest.hexdigest()
+
+# Function to reuse the Graphs output already computed for the same upload
+def restore_graphs_output(cache_key):
+    """
+    Restores Graphs_Divided_input.csv for an upload that was already processed.
+
+    Returns:
+        bool: True if the output is up to date and the filtering script can be skipped.
+    """
+    current_key = None
+    if os.path.exists(GRAPHS_CURRENT_KEY_PATH):
+        with open(GRAPHS_CURRENT_KEY_PATH) as f:
+            current_key = f.read().strip()
+    if current_key == cache_key and os.path.exists(GRAPHS_OUTPUT_PATH):
+        return True
+
+    cached_path = os.path.join(GRAPHS_CACHE_DIR, f"{cache_key}.csv")
+    if not os.path.exists(cached_path):
+        # The output is about to be rewritten, it no longer matches the previous key
+        if current_key is not None:
+            os.remove(GRAPHS_CURRENT_KEY_PATH)
+        return False
+    shutil.copyfile(cached_path, GRAPHS_OUTPUT_PATH)
+    with open(GRAPHS_CURRENT_KEY_PATH, "w") as f:
+        f.write(cache_key)
+    return True
+
+# Function to keep the Graphs output of a processed upload
+def store_graphs_output(cache_key):
+    os.makedirs(GRAPHS_CACHE_DIR, exist_ok=True)
+    shutil.copyfile(GRAPHS_OUTPUT_PATH, os.path.join(GRAPHS_CACHE_DIR, f"{cache_key}.csv"))
+    with open(GRAPHS_CURRENT_KEY_PATH, "w") as f:
+        f.write(cache_key)
+
 # ========== ROUTES ========== #
 
 @app.route('/')
@@ -34,14 +104,39 @@ def home():
 @app.route('/upload-test', methods=['POST'])
 def upload_test_file():
     try:
-        test_file = request.files.get('file')
-        if not test_file:
+        test_files = [f for f in request.files.getlist('file') if f]
+        if not test_files:
             return jsonify({"error": "No test file uploaded"}), 400
-        # Save file in the current directory
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        test_file_path = os.path.join(current_dir, "Uploaded_Test.csv")
-        test_file.save(test_file_path)
-        print(f"✅ Test file saved as {test_file_path}")
+        # Remove the logs of a previous campaign so they are not analyzed with the new upload
+        shutil.rmtree(CAMPAIGN_DIR, ignore_errors=True)
+        if len(test_files) == 1:
+            # Remove the previous upload, which may have been saved with another compression
+            for suffix in DRIVE_TEST_SUFFIXES:
+                if os.path.exists(os.path.join(current_dir, "Uploaded_Test" + suffix)):
+                    os.remove(os.path.join(current_dir, "Uploaded_Test" + suffix))
+            # Save file in the current directory, compressed files (.csv.gz, .csv.zst, .zip) as uploaded
+            suffix = get_file_suffix(test_files[0].filename or "") or ".csv"
+            test_file_path = os.path.join(current_dir, "Uploaded_Test" + suffix)
+            test_hashes = [save_stream_with_hash(test_files[0].stream, test_file_path)]
+            print(f"✅ Test file saved as {test_file_path}")
+        else:
+            # Several files form a multi-file campaign, analyzed together and divided per log
+            os.makedirs(CAMPAIGN_DIR)
+            test_hashes = []
+            for index, test_file in enumerate(test_files):
+                file_name = secure_filename(test_file.filename) or "log.csv"
+                if get_file_suffix(file_name) is None:
+                    file_name += ".csv"
+                test_hashes.append(save_stream_with_hash(test_file.stream, os.path.join(CAMPAIGN_DIR, f"{index:03d}_{file_name}")))
+            print(f"✅ {len(test_files)} campaign logs saved in {CAMPAIGN_DIR}")
+
+        # The same content was already processed: reuse its output instead of running the filtering again
+        graphs_cache_key = get_graphs_cache_key(test_hashes)
+        if restore_graphs_output(graphs_cache_key):
+            print("♻️ Same drive test already processed, reusing Graphs_Divided_input.csv")
+            return jsonify({"message": "Test file uploaded successfully (already processed)"})
+
         # Run the filtering script and capture output to a log file
         log_file_path = os.path.join(current_dir, "Graphs_filtering_Area_Division.log")
         with open(log_file_path, "w") as log_file:
@@ -56,7 +151,10 @@ def upload_test_file():
                 # Clean up the log file after reading
                 # os.remove(log_file_path) # Commenting out for now to allow manual inspection
                 raise Exception(f"Graphs_filtering_Area_Division.py failed. See {log_file_path} for details.\nLog content:\n{log_content}")
+        store_graphs_output(graphs_cache_key)
 
+        if len(test_files) > 1:
+            return jsonify({"message": f"{len(test_files)} test files uploaded successfully"})
         return jsonify({"message": "Test file uploaded successfully"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -71,7 +169,22 @@ def upload_cell_file():
         # Save file in the current directory
         current_dir = os.path.dirname(os.path.abspath(__file__))
         cell_file_path = os.path.join(current_dir, "Uploaded_Cell.xlsx")
-        cell_file.save(cell_file_path)
+        if get_file_suffix(cell_file.filename or "", ('.gz', '.zst', '.zip')):
+            # Decompress the upload while saving it, a compressed CSV is converted to the workbook read by the scripts
+            stream, inner_name = open_decompressed(cell_file.stream, cell_file.filename)
+            with stream:
+                if inner_name.lower().endswith('.csv'):
+                    pd.read_csv(stream).to_excel(cell_file_path, index=False)
+                else:
+                    with open(cell_file_path, "wb") as f:
+                        shutil.copyfileobj(stream, f)
+            cell_hash = None
+        else:
+            cell_hash = save_stream_with_hash(cell_file.stream, cell_file_path)
+        # Convert the workbook once to the Parquet copy read by the scripts and the map pages
+        ingest_cell_file(cell_file_path, cell_hash)
+        # Compute the sector wedges of the map pages once for the whole cell file
+        ingest_sector_geometry(cell_file_path, cell_hash)
         print(f"📁 Cell file saved as {cell_file_path}")
         return jsonify({"message": "Cell file uploaded successfully"})
     except Exception as e:
@@ -86,8 +199,15 @@ def upload_rb_file():
             return jsonify({"error": "No RB Utilization file uploaded"}), 400
         # Save file in the current directory
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        rb_file_path = os.path.join(current_dir, "Uploaded_Utilization.xlsx")
-        rb_file.save(rb_file_path)
+        # Hourly OSS exports are usually CSV (too many rows for a workbook), the previous upload is replaced either way
+        is_csv = (rb_file.filename or "").lower().endswith('.csv')
+        rb_file_path = os.path.join(current_dir, UTILIZATION_FILE_NAMES[0 if is_csv else 1])
+        other_path = os.path.join(current_dir, UTILIZATION_FILE_NAMES[1 if is_csv else 0])
+        if os.path.exists(other_path):
+            os.remove(other_path)
+        rb_hash = save_stream_with_hash(rb_file.stream, rb_file_path)
+        # Build the (cell, hour) utilization table once, read by the analysis and the recommendations
+        ingest_utilization_file(rb_file_path, rb_hash)
         print(f"📊 RB Utilization file saved as {rb_file_path}")
         return jsonify({"message": "RB Utilization file uploaded successfully"})
     except Exception as e:
@@ -106,7 +226,7 @@ def upload_train_file():
         train_dir = os.path.join(current_dir, "For_ML_Results")
         os.makedirs(train_dir, exist_ok=True) # Ensure directory exists
         train_file_path = os.path.join(train_dir, "Uploaded_Train.csv") # Save as Uploaded_Train.csv
-        train_file.save(train_file_path)
+        save_stream_with_hash(train_file.stream, train_file_path)
         print(f"📚 Training file saved as {train_file_path}")
         return jsonify({"message": "Training file uploaded successfully"})
     except Exception as e:
@@ -115,7 +235,7 @@ def upload_train_file():
 # === Run analysis ===
 @app.route('/run-analysis', methods=['POST'])
 def run_analysis():
-    analysis_type = request.form.get('type')  # "thresholds" or "predefined"
+    analysis_type = request.form.get('type')  # "thresholds", "predefined" or "sweep"
     print(f"🔍 Requested analysis type: {analysis_type}")
 
     try:
@@ -132,7 +252,9 @@ def run_analysis():
                 'distance': float(request.form.get('distance', 2)),
                 'overlap': float(request.form.get('overlap', 3)),
                 'prb': float(request.form.get('prb', 70)),
-                'rsrp_neighbor_difference': float(request.form.get('rsrp_neighbor_difference', 6))
+                'rsrp_neighbor_difference': float(request.form.get('rsrp_neighbor_difference', 6)),
+                # Live drive: only process the rows appended to the drive test since the last analysis
+                'incremental': request.form.get('incremental', 'false').lower() == 'true'
             }
 
             with open('thresholds.json', 'w') as f:
@@ -241,6 +363,22 @@ def run_analysis():
 
             return jsonify(response_data)
 
+        elif analysis_type == "sweep":
+            # Threshold sweep: the grid ({threshold: [values]} or a list of threshold sets) is evaluated
+            # over the preprocessed drive test, without running the rest of the analysis
+            grid = json.loads(request.form.get('grid', '{}'))
+            with open(SWEEP_GRID_PATH, 'w') as f:
+                json.dump(grid, f)
+
+            subprocess.run(["python", "For_Code_Results/Threshold_Sweep.py"], check=True)
+
+            output_file_abs = os.path.abspath(os.path.join("For_Code_Results", "Threshold_Sweep_Code_Output.csv"))
+            if os.path.exists(output_file_abs):
+                summary = pd.read_csv(output_file_abs)
+                return jsonify({"message": "Threshold sweep complete", "output_file": output_file_abs,
+                                "results": summary.to_dict(orient='records')})
+            return jsonify({"error": "Threshold sweep output file not found"}), 500
+
         else:
             return jsonify({"error": "Invalid analysis type provided."}), 400
 
@@ -0,0 +1,99 @@
+import os
+import subprocess
+
+from Analysis_Thresholds import PREPROCESS_THRESHOLDS, load_analysis_thresholds
+from Drive_Test_Incremental import get_config_key, incremental_mode_enabled
+from Drive_Test_Ingest import CACHE_DIR, find_drive_test_file, get_campaign_logs, project_dir
+from Drive_Test_Preprocess import PREPROCESS_MODULES
+from Utilization_Store import find_utilization_file
+
+# Key of the last successful run of each stage
+PIPELINE_STATE_DIR = os.path.join(CACHE_DIR, "Pipeline")
+
+# Scripts of the threshold-based analysis (For_Code_Results), in order, with what their outputs depend on
+# besides the drive test and the cell file: the thresholds (None for all of them), the shared modules
+# and the other input files of the project
+PIPELINE_STAGES = {
+    'Input_filtering_Area_Division.py': {
+        'thresholds': PREPROCESS_THRESHOLDS,
+        'modules': PREPROCESS_MODULES + ['Analysis_Thresholds.py'],
+        'inputs': [],
+        'utilization': False,
+        'outputs': ['Divided_input.csv', 'Divided_input_problem_areas.csv']
+    },
+    'Data_Analyzing.py': {
+        'thresholds': None,
+        'modules': PREPROCESS_MODULES + ['Analysis_Thresholds.py', 'Problem_Rules.py', 'Problem_Detection.py',
+                                         'Utilization_Store.py', 'Grid_Bins.py', 'Spot_Clusters.py'],
+        'inputs': ['Problem_Rules.json'],
+        'utilization': True,
+        'outputs': ['Problem_Areas_Code_Output.csv', 'Problem_Free_Areas_Code_Output.csv', 'Grid_Bins_Code_Output.csv',
+                    'Persistent_Areas_Code_Output.csv']
+    }
+}
+
+# Function to build the key of everything the outputs of a stage depend on
+def get_stage_key(script, script_dir):
+    """
+    Returns:
+        str: Hash of the thresholds, input files and code of the stage, or None when the stage
+            must always run (a live drive test analyzed incrementally).
+    """
+    stage = PIPELINE_STAGES[script]
+    if script == 'Data_Analyzing.py' and incremental_mode_enabled():
+        return None
+
+    thresholds = load_analysis_thresholds()
+    names = stage['thresholds'] if stage['thresholds'] is not None else sorted(thresholds)
+    file_paths = (get_campaign_logs() or [find_drive_test_file(project_dir)]) + [os.path.join(project_dir, 'Uploaded_Cell.xlsx')]
+    file_paths += [os.path.join(project_dir, name) for name in stage['inputs'] + stage['modules']]
+    if stage['utilization']:
+        file_paths.append(find_utilization_file() or '')
+    file_paths.append(os.path.join(script_dir, script))
+    return get_config_key([(name, thresholds[name]) for name in names], file_paths)
+
+# Function to get the state file of a stage
+def _get_state_path(script):
+    return os.path.join(PIPELINE_STATE_DIR, f"{script}.key")
+
+# Function to check whether a stage already ran with the same key and its outputs are still there
+def stage_is_current(script, script_dir, key):
+    if key is None or not os.path.exists(_get_state_path(script)):
+        return False
+    with open(_get_state_path(script)) as f:
+        if f.read().strip() != key:
+            return False
+    return all(os.path.exists(os.path.join(script_dir, name)) for name in PIPELINE_STAGES[script]['outputs'])
+
+# Function to record the key of a successful run of a stage
+def mark_stage_done(script, key):
+    if key is None:
+        return
+    os.makedirs(PIPELINE_STATE_DIR, exist_ok=True)
+    tmp_path = _get_state_path(script) + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(key)
+    os.replace(tmp_path, _get_state_path(script))
+
+# Function to run a stage of the analysis unless its outputs are up to date
+def run_stage(script, script_dir):
+    """
+    Runs a stage script only if a threshold, input file or module it depends
+    on changed since its last successful run. A change of a detection
+    threshold thus skips the preprocessing stage, and the analysis reads
+    the preprocessed drive test from the cache.
+
+    Returns:
+        bool: True if the script was run, False if it was skipped.
+    """
+    key = get_stage_key(script, script_dir)
+    if stage_is_current(script, script_dir, key):
+        print(f"{script}: outputs up to date, skipped.")
+        return False
+
+    # Forget the previous key first, so that a failed run is never taken as up to date
+    if os.path.exists(_get_state_path(script)):
+        os.remove(_get_state_path(script))
+    subprocess.run(["python", script], cwd=script_dir, check=True)
+    mark_stage_done(script, key)
+    return True
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from Problem_Rules import NEIGHBOR_COUNT, NEIGHBOR_PLACEHOLDER, load_problem_rules
+
+# Function to convert a column (numeric, categorical or text) to a float64 array, NaN where it is not a number
+def _to_float(values):
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+# Function to load the KPIs used by the problem rules as arrays
+def load_kpi_arrays(data, rules):
+    """
+    Parameters:
+        data (pd.DataFrame): Preprocessed samples.
+        rules (ProblemRules): Rules giving the column of each KPI.
+
+    Returns:
+        dict: float64 array of each KPI used by the rules (NaN where missing), of shape (samples, 1)
+            for a serving KPI and (samples, NEIGHBOR_COUNT) for a neighbor KPI.
+    """
+    arrays = {}
+    for name in rules.get_used_kpis():
+        column = rules.kpis[name]
+        if NEIGHBOR_PLACEHOLDER in column:
+            columns = [column.replace(NEIGHBOR_PLACEHOLDER, str(n)) for n in range(1, NEIGHBOR_COUNT + 1)]
+            arrays[name] = np.column_stack([_to_float(data[col]) if col in data.columns else np.full(len(data), np.nan)
+                                            for col in columns])
+        else:
+            arrays[name] = _to_float(data[column])[:, None]
+    return arrays
+
+# Function to get the per-sample values of a problem rule, checking that its neighbors are reduced
+def _get_sample_values(values, rows, name, width=1):
+    values = np.asarray(values)
+    if values.ndim == 2 and values.shape[1] not in (1, width):
+        raise ValueError(f"Rule '{name}' must reduce the neighbors with any_neighbor, all_neighbors or count_neighbors")
+    return np.broadcast_to(values if values.ndim == 2 else np.reshape(values, (-1, 1)), (rows, width))
+
+# Function to build the sorted, comma-separated identities of the cells involved in a problem
+def _get_cell_ids(cells, neighbor_identity, serving_identity, flags):
+    """
+    Returns:
+        np.ndarray: Identities of the involved neighbors of each sample, with the serving cell
+            when the sample is flagged ("None" for a sample without involved neighbors).
+    """
+    cell_ids = np.full(len(cells), "None", dtype=object)
+    cells = cells & ~np.isnan(neighbor_identity)
+    for position in np.flatnonzero(cells.any(axis=1)).tolist():
+        involved = {str(int(cell_id)) for cell_id in neighbor_identity[position, cells[position]].tolist()}
+        if flags[position] and not np.isnan(serving_identity[position]):
+            involved.add(str(int(serving_identity[position])))
+        cell_ids[position] = ", ".join(sorted(involved))
+    return cell_ids
+
+# Function to detect the per-sample problems of all the samples at once
+def detect_problems(data, rules=None, thresholds=None):
+    """
+    Evaluates the problem rules (Problem_Rules.json by default) as array
+    expressions over all the samples, in the order of their dependencies.
+    A missing measurement fails every comparison except "!=", and a cell
+    identity is compared as an integer through trunc().
+
+    Parameters:
+        data (pd.DataFrame): Preprocessed samples with the KPI columns of the rules.
+        rules (ProblemRules): Rules to evaluate (default: load_problem_rules()).
+        thresholds (dict): Values replacing some of the thresholds of the rules.
+
+    Returns:
+        pd.DataFrame: The output columns of the rules (a 0/1 flag per problem, with the count and
+            the identities of the cells involved where configured), on the index of data.
+    """
+    rules = rules or load_problem_rules()
+    rows = len(data)
+    values = rules.evaluate(load_kpi_arrays(data, rules), thresholds)
+
+    problems = {}
+    for problem in rules.problems:
+        flags = _get_sample_values(values[problem['name']], rows, problem['name'])[:, 0] != 0
+        problems[problem['column']] = flags.astype(np.int64)
+        if 'compiled_cells' not in problem:
+            continue
+
+        # Neighbors involved in the problem: counted with the serving cell, identities of the flagged samples
+        cells = _get_sample_values(problem['compiled_cells'][0](values), rows, problem['name'], NEIGHBOR_COUNT) != 0
+        if 'count_column' in problem:
+            problems[problem['count_column']] = (cells.sum(axis=1) + 1).astype(np.int64)
+        if 'cell_ids_column' in problem:
+            problems[problem['cell_ids_column']] = _get_cell_ids(
+                cells, np.trunc(values['neighbor_identity']), np.trunc(values['serving_identity'][:, 0]), flags)
+
+    return pd.DataFrame(problems, index=data.index)
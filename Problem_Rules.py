@@ -0,0 +1,197 @@
+import ast
+import functools
+import json
+import os
+import numpy as np
+
+from Drive_Test_Ingest import project_dir
+
+# Problem rules of the analysis: thresholds, KPI columns, named conditions and problem types
+PROBLEM_RULES_PATH = os.path.join(project_dir, "Problem_Rules.json")
+
+# Number of neighbor cells reported per sample (N1 to N4)
+NEIGHBOR_COUNT = 4
+
+# Placeholder of the neighbor number in the column of a neighbor KPI
+NEIGHBOR_PLACEHOLDER = "{n}"
+
+# Function to get the truth value of rule values (a number is true when it is not 0, NaN included)
+def _truth(values):
+    values = np.asarray(values)
+    return values if values.dtype == bool else values != 0
+
+# Functions available in the rule expressions
+RULE_FUNCTIONS = {
+    'any_neighbor': lambda values: np.any(_truth(values), axis=-1, keepdims=True),
+    'all_neighbors': lambda values: np.all(_truth(values), axis=-1, keepdims=True),
+    'count_neighbors': lambda values: np.sum(_truth(values), axis=-1, keepdims=True),
+    'abs': np.abs,
+    'known': lambda values: ~np.isnan(values),
+    'trunc': np.trunc
+}
+
+_COMPARISONS = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+                ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_OPERATORS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide}
+
+# Function to compile a rule expression into a NumPy evaluation
+def compile_expression(text, rule_name):
+    """
+    Compiles an expression written with Python syntax: names (KPIs,
+    thresholds, conditions and problems), numbers, + - * /, comparisons,
+    and / or / not and the RULE_FUNCTIONS.
+
+    Returns:
+        tuple: (function evaluating the expression from a dict of named values, set of the names used).
+
+    Raises:
+        ValueError: If the expression is not valid or uses anything else.
+    """
+    try:
+        tree = ast.parse(str(text), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression in rule '{rule_name}': {e.msg}")
+    names = set()
+
+    def build(node):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+            return lambda values: values[node.id]
+        if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+            return lambda values: node.value
+        if isinstance(node, ast.BoolOp):
+            operands = [build(value) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda values: functools.reduce(combine, [_truth(operand(values)) for operand in operands])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub, ast.UAdd)):
+            operand = build(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda values: np.logical_not(_truth(operand(values)))
+            sign = -1 if isinstance(node.op, ast.USub) else 1
+            return lambda values: sign * operand(values)
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            left, right, operator = build(node.left), build(node.right), _OPERATORS[type(node.op)]
+            return lambda values: operator(left(values), right(values))
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+            # a < b < c is evaluated as (a < b) and (b < c)
+            operands = [build(node.left)] + [build(comparator) for comparator in node.comparators]
+            comparisons = [_COMPARISONS[type(op)] for op in node.ops]
+
+            def compare(values):
+                results = [values_of(values) for values_of in operands]
+                return functools.reduce(np.logical_and, [comparison(results[i], results[i + 1]) for i, comparison in enumerate(comparisons)])
+            return compare
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in RULE_FUNCTIONS
+                and len(node.args) == 1 and not node.keywords):
+            function, argument = RULE_FUNCTIONS[node.func.id], build(node.args[0])
+            return lambda values: function(argument(values))
+        raise ValueError(f"Unsupported expression in rule '{rule_name}': {ast.unparse(node)}")
+
+    return build(tree.body), names
+
+class ProblemRules:
+    """
+    Problem types defined as expressions over named KPI columns, compiled
+    once and evaluated over all the samples at once.
+
+    A serving KPI holds one value per sample and a neighbor KPI (column
+    with NEIGHBOR_PLACEHOLDER) one value per sample and neighbor, so that
+    any_neighbor / all_neighbors / count_neighbors reduce the N1-N4 values
+    of each sample. Conditions name intermediate expressions; problems may
+    use other problems, and are evaluated after the problems they use.
+    """
+    def __init__(self, config):
+        self.thresholds = dict(config.get('thresholds', {}))
+        self.kpis = dict(config['kpis'])
+        self.conditions = {name: compile_expression(text, name) for name, text in config.get('conditions', {}).items()}
+        self.problems = []
+        for problem in config['problems']:
+            problem = dict(problem)
+            problem['compiled'] = compile_expression(problem['expression'], problem['name'])
+            if 'cells' in problem:
+                problem['compiled_cells'] = compile_expression(problem['cells'], problem['name'])
+            self.problems.append(problem)
+
+        # Thresholds, KPIs, conditions and problems share one namespace
+        defined = list(self.thresholds) + list(self.kpis) + list(self.conditions) + [problem['name'] for problem in self.problems]
+        duplicates = sorted({name for name in defined if defined.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Names defined more than once in the problem rules: {', '.join(duplicates)}")
+        if any('cell_ids_column' in problem for problem in self.problems) and not {'serving_identity', 'neighbor_identity'} <= set(self.kpis):
+            raise ValueError("Problem rules with 'cell_ids_column' need the 'serving_identity' and 'neighbor_identity' KPIs")
+
+        self.order = self._get_evaluation_order()
+
+    # Function to get the names used by a rule, its cells expression included
+    def _get_dependencies(self, name):
+        if name in self.conditions:
+            return self.conditions[name][1]
+        problem = next(problem for problem in self.problems if problem['name'] == name)
+        return problem['compiled'][1] | problem.get('compiled_cells', (None, set()))[1]
+
+    # Function to order the conditions and problems so that each one comes after the rules it uses
+    def _get_evaluation_order(self):
+        rules = list(self.conditions) + [problem['name'] for problem in self.problems]
+        known = set(self.thresholds) | set(self.kpis) | set(rules)
+        order, visiting = [], set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Circular reference in the problem rules at '{name}'")
+            visiting.add(name)
+            dependencies = self._get_dependencies(name)
+            unknown = sorted(dependencies - known)
+            if unknown:
+                raise ValueError(f"Unknown names in rule '{name}': {', '.join(unknown)}")
+            for dependency in sorted(dependencies & set(rules), key=rules.index):
+                visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in rules:
+            visit(name)
+        return order
+
+    @property
+    def problem_columns(self):
+        return [problem['column'] for problem in self.problems]
+
+    @property
+    def output_columns(self):
+        columns = []
+        for problem in self.problems:
+            columns += [problem['column']] + [problem[key] for key in ('count_column', 'cell_ids_column') if key in problem]
+        return columns
+
+    # Function to get the KPIs used by the rules
+    def get_used_kpis(self):
+        used = set()
+        for name in self.order:
+            used |= self._get_dependencies(name)
+        if any('cell_ids_column' in problem for problem in self.problems):
+            used |= {'serving_identity', 'neighbor_identity'}
+        return [name for name in self.kpis if name in used]
+
+    # Function to evaluate the conditions and problems over the KPI arrays
+    def evaluate(self, kpi_values, thresholds=None):
+        """
+        Parameters:
+            kpi_values (dict): Array of each used KPI, of shape (samples, 1) or (samples, NEIGHBOR_COUNT).
+            thresholds (dict): Values replacing some of the configured thresholds.
+
+        Returns:
+            dict: The values of the thresholds, KPIs, conditions and problems, by name.
+        """
+        values = {**self.thresholds, **(thresholds or {}), **kpi_values}
+        problems = {problem['name']: problem for problem in self.problems}
+        for name in self.order:
+            compiled = self.conditions[name] if name in self.conditions else problems[name]['compiled']
+            values[name] = compiled[0](values)
+        return values
+
+# Function to load the problem rules of a config file
+def load_problem_rules(rules_path=PROBLEM_RULES_PATH):
+    with open(rules_path, encoding="utf-8") as f:
+        return ProblemRules(json.load(f))
@@ -0,0 +1,140 @@
+import itertools
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from Drive_Test_Ingest import project_dir
+from Problem_Detection import load_kpi_arrays
+from Problem_Rules import NEIGHBOR_COUNT
+
+# Threshold grid of a sweep: {threshold: [values]} (every combination) or [{threshold: value}, ...]
+SWEEP_GRID_PATH = os.path.join(project_dir, "threshold_sweep.json")
+
+# Samples x threshold sets x neighbors evaluated at once (bounds the memory of a sweep)
+SWEEP_CHUNK_ELEMENTS = 2 ** 24
+
+# Share of the samples of a spot above which a problem is one of its problems (%), as in the analysis
+SPOT_PROBLEM_MIN_PERCENT = 20
+
+# Function to expand a threshold grid into the list of threshold sets
+def get_threshold_sets(grid, rules, defaults=None):
+    """
+    Parameters:
+        grid (dict or list): {threshold: [values]} for every combination of the values, or a list
+            of {threshold: value} sets.
+        rules (ProblemRules): Rules whose thresholds are swept.
+        defaults (dict): Values of the thresholds left out of the grid (default: those of the rules).
+
+    Returns:
+        list: One complete {threshold: value} dict per set.
+
+    Raises:
+        ValueError: If the grid names a threshold the rules do not have.
+    """
+    if isinstance(grid, dict):
+        names = list(grid)
+        grid = [dict(zip(names, values)) for values in itertools.product(*[np.atleast_1d(grid[name]).tolist() for name in names])]
+    unknown = sorted({name for threshold_set in grid for name in threshold_set} - set(rules.thresholds))
+    if unknown:
+        raise ValueError(f"Unknown thresholds in the sweep grid: {', '.join(unknown)}")
+    defaults = {name: (defaults or {}).get(name, value) for name, value in rules.thresholds.items()}
+    return [{**defaults, **threshold_set} for threshold_set in grid]
+
+# Function to load the threshold sets of the sweep grid file
+def load_threshold_sets(rules, defaults=None, grid_path=SWEEP_GRID_PATH):
+    with open(grid_path, encoding="utf-8") as f:
+        return get_threshold_sets(json.load(f), rules, defaults)
+
+class ThresholdSweep:
+    """
+    Evaluates the problem rules for many threshold sets over the same
+    samples. Each threshold becomes an array with one value per set, so a
+    single evaluation of the rules broadcasts over all the sets; the
+    samples are processed in chunks to bound the memory. Only the number
+    of flagged samples per set, spot and problem is kept.
+    """
+    def __init__(self, rules, threshold_sets):
+        self.rules = rules
+        self.threshold_sets = threshold_sets
+        names = [name for name in rules.thresholds if len({threshold_set[name] for threshold_set in threshold_sets}) > 1]
+        self.thresholds = {name: np.array([threshold_set[name] for threshold_set in threshold_sets]).reshape(-1, 1, 1)
+                           for name in names}
+        self.spots, self.sizes = [], []
+        self.counts = {column: [] for column in rules.problem_columns}
+
+    # Function to count the flagged samples of each spot for all the threshold sets
+    def add_samples(self, data):
+        """
+        Parameters:
+            data (pd.DataFrame): Samples with 'Spot_Area_Num' and the KPI columns of the rules
+                (only the samples of spot areas are counted).
+        """
+        data = data[data['Spot_Area_Num'] > 0]
+        spots, codes = np.unique(data['Spot_Area_Num'].to_numpy(), return_inverse=True)
+        sets = len(self.threshold_sets)
+        counts = {column: np.zeros((sets, len(spots)), dtype=np.int64) for column in self.rules.problem_columns}
+
+        chunk_size = max(1, SWEEP_CHUNK_ELEMENTS // (sets * NEIGHBOR_COUNT))
+        for start in range(0, len(data), chunk_size):
+            chunk_codes = codes[start:start + chunk_size]
+            values = self.rules.evaluate(load_kpi_arrays(data.iloc[start:start + chunk_size], self.rules), self.thresholds)
+            positions = np.arange(sets)[:, None] * len(spots) + chunk_codes[None, :]
+            for problem in self.rules.problems:
+                flags = np.asarray(values[problem['name']])
+                if flags.shape[-1] != 1:
+                    raise ValueError(f"Rule '{problem['name']}' must reduce the neighbors with any_neighbor, all_neighbors or count_neighbors")
+                flags = np.broadcast_to(flags, (sets, len(chunk_codes), 1))[..., 0] != 0
+                counts[problem['column']] += np.bincount(positions[flags], minlength=sets * len(spots)).reshape(sets, len(spots))
+
+        self.spots.append(spots)
+        self.sizes.append(np.bincount(codes, minlength=len(spots)))
+        for column in counts:
+            self.counts[column].append(counts[column])
+
+    # Function to get the number of samples and flagged samples of each spot (spots split over frames are merged)
+    def get_spot_counts(self):
+        """
+        Returns:
+            tuple: (spot numbers, samples per spot, {problem column: (sets, spots) flagged samples}).
+        """
+        if not self.spots:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), {column: np.zeros((len(self.threshold_sets), 0), dtype=np.int64) for column in self.counts}
+        spots, codes = np.unique(np.concatenate(self.spots), return_inverse=True)
+        sizes = np.bincount(codes, weights=np.concatenate(self.sizes), minlength=len(spots)).astype(np.int64)
+        counts = {}
+        for column, frame_counts in self.counts.items():
+            merged = np.zeros((len(spots), len(self.threshold_sets)), dtype=np.int64)
+            np.add.at(merged, codes, np.concatenate(frame_counts, axis=1).T)
+            counts[column] = merged.T
+        return spots, sizes, counts
+
+    # Function to summarize the spots and their top problem for each threshold set
+    def summarize(self):
+        """
+        The top problem of a spot is the first problem of its 'Area_Problems' in the analysis: the
+        problem with the highest share of the samples above SPOT_PROBLEM_MIN_PERCENT (the first one
+        in rule order on a tie), "Other Issues" when there is none.
+
+        Returns:
+            pd.DataFrame: One row per threshold set with its thresholds, the number of spots and of
+                spot samples, the flagged samples of each problem and the number of spots whose top
+                problem it is.
+        """
+        spots, sizes, counts = self.get_spot_counts()
+        columns = self.rules.problem_columns
+        summary = pd.DataFrame(self.threshold_sets)
+        summary['Spots'] = len(spots)
+        summary['Spot Samples'] = int(sizes.sum())
+        for column in columns:
+            summary[f'{column} Samples'] = counts[column].sum(axis=1)
+
+        # (sets, problems, spots) shares, the top problem is the first maximum above the minimum share
+        percentages = np.stack([(counts[column] / sizes) * 100 if len(spots) else counts[column].astype('float64')
+                                for column in columns], axis=1)
+        top = np.argmax(percentages, axis=1)
+        has_problem = (percentages > SPOT_PROBLEM_MIN_PERCENT).any(axis=1)
+        for index, column in enumerate(columns):
+            summary[f'{column} Spots'] = ((top == index) & has_problem).sum(axis=1)
+        summary['Other Issues Spots'] = (~has_problem).sum(axis=1)
+        return summary
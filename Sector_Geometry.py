@@ -0,0 +1,178 @@
+import json
+import os
+import numpy as np
+
+from Cell_Cache import CELL_FILE_PATH, get_cell_file_hash, load_cell_file
+from Cell_Index import CellIndex
+from Drive_Test_Ingest import CACHE_DIR
+from Site_Index import get_site_index
+
+# Sector wedges of the uploaded cell files, stored as GeoJSON under their content hash
+SECTOR_CACHE_DIR = os.path.join(CACHE_DIR, "Sectors")
+
+# Version of the cached wedges, increased when their geometry or properties change
+SECTOR_CACHE_VERSION = 1
+
+# Wedge drawn for each cell: opening angle and number of arc steps (degrees)
+SECTOR_BEAMWIDTH = 60
+SECTOR_STEPS = 10
+
+# Wedge radii of the maps: spot maps, recommendation maps (km)
+SECTOR_RADII_KM = (0.3, 0.1)
+
+# Color of each frequency band on the maps
+BAND_COLORS = {1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"}
+
+# Sector layers already loaded by this process, per (cell file hash, radius)
+_sector_layers = {}
+
+# Function to get the map color of a frequency band
+def get_band_color(band):
+    try:
+        band = int(band)
+    except (TypeError, ValueError):
+        return "gray"
+    return BAND_COLORS.get(band, "gray")
+
+# Function to compute the wedge outline of every sector at once
+def compute_sector_wedges(lat, lon, azimuth, radius_km, beamwidth=SECTOR_BEAMWIDTH, steps=SECTOR_STEPS):
+    """
+    Same outline as the map pages drew cell by cell: the site, then the arc
+    from azimuth - beamwidth/2 to azimuth + beamwidth/2 in whole-degree steps
+    of beamwidth/steps (start and end truncated to whole degrees).
+
+    Parameters:
+        lat, lon, azimuth (array-like): Site position (decimal degrees) and azimuth (degrees) of each cell.
+        radius_km (float): Wedge radius in km.
+
+    Returns:
+        list: One list of [lat, lon] points per cell.
+    """
+    lat, lon, azimuth = (np.asarray(v, dtype='float64') for v in (lat, lon, azimuth))
+    step = int(beamwidth / steps)
+    start = np.trunc(azimuth - beamwidth / 2)
+    end = np.trunc(azimuth + beamwidth / 2)
+    counts = ((end - start) // step).astype(np.int64) + 1
+    if not len(counts):
+        return []
+
+    angles = np.radians(start[:, None] + step * np.arange(counts.max()))
+    arc_lat = lat[:, None] + radius_km * np.cos(angles) / 111
+    arc_lon = lon[:, None] + radius_km * np.sin(angles) / (111 * np.cos(np.radians(lat))[:, None])
+    return [[[la, lo]] + np.column_stack([arc_lat[i, :count], arc_lon[i, :count]]).tolist()
+            for i, (la, lo, count) in enumerate(zip(lat.tolist(), lon.tolist(), counts.tolist()))]
+
+# Function to build the GeoJSON wedges of all the cells of a site index
+def build_sector_geojson(site_index, radius_km):
+    """
+    Returns:
+        dict: FeatureCollection with one wedge per cell with an azimuth; the 'position' property
+            is the position of the cell in site_index.cells.
+    """
+    cells = site_index.cells
+    if 'AZIMUTH' not in cells.columns:
+        return {'type': 'FeatureCollection', 'features': []}
+    positions = np.flatnonzero(cells['AZIMUTH'].notna().to_numpy())
+    cells = cells.iloc[positions]
+    wedges = compute_sector_wedges(cells['Latitude'], cells['Longitude'], cells['AZIMUTH'], radius_km)
+    names = cells['CellNAME'].tolist() if 'CellNAME' in cells.columns else [""] * len(cells)
+    bands = cells['Freq Band'].tolist() if 'Freq Band' in cells.columns else ["Unknown"] * len(cells)
+
+    features = []
+    for position, wedge, name, band, azimuth in zip(positions.tolist(), wedges, names, bands, cells['AZIMUTH'].tolist()):
+        ring = [[point_lon, point_lat] for point_lat, point_lon in wedge]
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': [ring + [ring[0]]]},
+            'properties': {
+                'position': position,
+                'name': str(name),
+                'color': get_band_color(band),
+                'popup': f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
+            }
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+# Function to get the cached GeoJSON path of the wedges of a cell file
+def get_sector_cache_path(file_hash, radius_km):
+    return os.path.join(SECTOR_CACHE_DIR, f"{file_hash}.v{SECTOR_CACHE_VERSION}_{int(round(radius_km * 1000))}m.geojson")
+
+# Function to compute the wedges of a cell file once per content
+def ingest_sector_geometry(cell_path=CELL_FILE_PATH, file_hash=None, radius_km=None):
+    """
+    Computes the sector wedges of an uploaded cell file and saves them as
+    GeoJSON under its content hash, for each map radius (or only radius_km).
+
+    Returns:
+        list: Paths of the GeoJSON files.
+    """
+    file_hash = file_hash or get_cell_file_hash(cell_path)
+    paths = []
+    for radius in ([radius_km] if radius_km is not None else SECTOR_RADII_KM):
+        path = get_sector_cache_path(file_hash, radius)
+        if not os.path.exists(path):
+            geojson = build_sector_geojson(get_site_index(cell_path), radius)
+
+            # Write to a temporary file first so an interrupted run never leaves a partial cache entry
+            os.makedirs(SECTOR_CACHE_DIR, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(geojson, f)
+            os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+class SectorLayer:
+    """
+    Precomputed sector wedges of a cell file, looked up through the site
+    index so that a map only draws the wedges near the points it shows,
+    plus those of the cells serving the shown samples (found through the
+    cell index), however far those cells are.
+    """
+    def __init__(self, site_index, geojson, cell_index=None):
+        self.site_index = site_index
+        self.cell_index = cell_index
+        self.features = {feature['properties']['position']: feature for feature in geojson['features']}
+
+    # Function to get the positions in site_index.cells of the cells serving the samples
+    def serving_positions(self, samples):
+        """
+        Parameters:
+            samples (pd.DataFrame): Drive-test samples with their 'Serving Cell Identity' (PCI),
+                'Serving Cell DL EARFCN' and 'Cell Identity (eNB Part)'.
+
+        Returns:
+            np.ndarray: Sorted positions of the serving cells that have coordinates.
+        """
+        columns = ['Serving Cell Identity', 'Serving Cell DL EARFCN', 'Cell Identity (eNB Part)']
+        if self.cell_index is None or samples is None or not set(columns).issubset(samples.columns):
+            return np.zeros(0, dtype=np.int64)
+        rows = self.cell_index.get_cell_rows(*(samples[col] for col in columns))
+        positions = self.site_index.cells.index.get_indexer(rows)
+        return np.unique(positions[positions >= 0])
+
+    # Function to get the wedges of the cells within a radius of any of the points, and of the serving cells of the samples
+    def features_near(self, lat, lon, radius_m, samples=None):
+        positions = np.union1d(self.site_index.positions_near(lat, lon, radius_m), self.serving_positions(samples))
+        return [self.features[position] for position in positions.tolist() if position in self.features]
+
+    # Function to draw the wedges and site markers near the points (and of the serving cells of the samples) on a folium map
+    def draw(self, map_obj, lat, lon, radius_m, marker_radius=3, samples=None):
+        import folium
+
+        for feature in self.features_near(lat, lon, radius_m, samples):
+            ring = feature['geometry']['coordinates'][0][:-1]
+            properties = feature['properties']
+            folium.Polygon(locations=[[point_lat, point_lon] for point_lon, point_lat in ring], color=properties['color'],
+                           fill=True, fill_opacity=0.3, popup=folium.Popup(properties['popup'], max_width=300)).add_to(map_obj)
+            folium.CircleMarker(location=[ring[0][1], ring[0][0]], radius=marker_radius, color=properties['color'], fill=True,
+                                fill_opacity=1, popup=f"{properties['name']} (site center)").add_to(map_obj)
+
+# Function to get the sector layer of a cell file, loaded once per file content
+def get_sector_layer(cell_path=CELL_FILE_PATH, radius_km=SECTOR_RADII_KM[0]):
+    key = (get_cell_file_hash(cell_path), radius_km)
+    if key not in _sector_layers:
+        path = ingest_sector_geometry(cell_path, key[0], radius_km)[0]
+        with open(path, encoding="utf-8") as f:
+            _sector_layers[key] = SectorLayer(get_site_index(cell_path), json.load(f), CellIndex(load_cell_file(cell_path)))
+    return _sector_layers[key]
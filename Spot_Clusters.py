@@ -0,0 +1,169 @@
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from Drive_Test_Ingest import CACHE_DIR, compute_file_hash, get_campaign_logs
+from Site_Index import to_chord, to_unit_vectors
+
+# Spot centroids of the stored runs with their persistent area, one store per analysis (Code, ML)
+SPOT_CLUSTER_DIR = os.path.join(CACHE_DIR, "Spot_Clusters")
+
+# Spots whose centroids are closer than this belong to the same persistent area (m)
+SPOT_CLUSTER_RADIUS_M = 100
+
+SPOT_COLUMNS = ['Run_Key', 'Spot_Area_Num', 'Latitude', 'Longitude', 'Samples', 'Dominant Problem', 'Persistent_Area_ID']
+
+# Function to get the key of the drive test (or campaign) of a run
+def get_run_key(data_path):
+    campaign_logs = get_campaign_logs()
+    if campaign_logs:
+        return "_".join(compute_file_hash(path)[:16] for path in campaign_logs)
+    return compute_file_hash(data_path)
+
+# Function to get the centroid of each spot area of a problem areas output
+def get_spot_centroids(problem_areas):
+    """
+    Parameters:
+        problem_areas (pd.DataFrame): Samples of a Problem_Areas_*_Output.csv.
+
+    Returns:
+        pd.DataFrame: One row per Spot_Area_Num with its mean position, number of samples and
+            dominant problem (empty when the output has none).
+    """
+    problem_areas = problem_areas[problem_areas['Spot_Area_Num'] > 0].dropna(subset=['Latitude', 'Longitude'])
+    if 'Dominant Problem' not in problem_areas.columns:
+        problem_areas = problem_areas.assign(**{'Dominant Problem': ""})
+    spots = problem_areas.groupby('Spot_Area_Num', sort=True).agg(
+        Latitude=('Latitude', 'mean'),
+        Longitude=('Longitude', 'mean'),
+        Samples=('Latitude', 'size'),
+        **{'Dominant Problem': ('Dominant Problem', 'first')}
+    ).reset_index()
+    spots['Dominant Problem'] = spots['Dominant Problem'].fillna("")
+    return spots
+
+# Function to cluster points whose chains of neighbors are within a radius (DBSCAN with one sample per core point)
+def cluster_spots(lat, lon, radius_m=SPOT_CLUSTER_RADIUS_M):
+    """
+    Returns:
+        np.ndarray: Cluster label of each point (0 .. clusters - 1).
+    """
+    points = to_unit_vectors(lat, lon)
+    if not len(points):
+        return np.zeros(0, dtype=np.int64)
+    pairs = cKDTree(points).query_pairs(to_chord(radius_m), output_type='ndarray')
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(points), len(points)))
+    return connected_components(graph, directed=False)[1]
+
+class SpotClusterStore:
+    """
+    Persistent areas over the spots of all the stored runs. Spot_Area_Num
+    restarts at 1 for every run; the persistent area ID stays the same for
+    the spots of the same place across runs.
+
+    A new run only queries the stored spots near its own spots: a spot
+    takes the area of the stored spots within SPOT_CLUSTER_RADIUS_M, spots
+    near no stored spot start new areas, and areas bridged by a new spot
+    are merged (under the smallest ID).
+    """
+    def __init__(self, name):
+        self.path = os.path.join(SPOT_CLUSTER_DIR, f"{name}.pkl")
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                saved = pickle.load(f)
+            self.spots, self.next_id = saved['spots'], saved['next_id']
+        else:
+            self.spots, self.next_id = pd.DataFrame(columns=SPOT_COLUMNS), 1
+
+    # Function to assign the spots of a run to the persistent areas
+    def add_run(self, run_key, spots, radius_m=SPOT_CLUSTER_RADIUS_M):
+        """
+        Parameters:
+            run_key (str): Key of the run (a run added again replaces its spots).
+            spots (pd.DataFrame): Output of get_spot_centroids.
+
+        Returns:
+            pd.DataFrame: The spots with their 'Persistent_Area_ID'.
+        """
+        spots = spots.reset_index(drop=True)
+        if not len(spots):
+            self.spots = self.spots[self.spots['Run_Key'] != run_key]
+            return spots.assign(Persistent_Area_ID=pd.Series(dtype=np.int64))
+
+        components = cluster_spots(spots['Latitude'], spots['Longitude'], radius_m)
+        count = int(components.max()) + 1
+
+        # Stored areas near each new spot (the previous spots of the same run included, to keep its IDs)
+        stored_ids = self.spots['Persistent_Area_ID'].to_numpy(dtype=np.int64)
+        matched_components, matched_ids = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        if len(stored_ids):
+            new_tree = cKDTree(to_unit_vectors(spots['Latitude'], spots['Longitude']))
+            stored_tree = cKDTree(to_unit_vectors(self.spots['Latitude'], self.spots['Longitude']))
+            pairs = new_tree.sparse_distance_matrix(stored_tree, to_chord(radius_m), output_type='ndarray')
+            matched_components = components[pairs['i']]
+            matched_ids = stored_ids[pairs['j']]
+
+        # Group the new components with the stored areas they touch
+        area_ids = np.unique(matched_ids)
+        nodes = count + len(area_ids)
+        graph = coo_matrix((np.ones(len(matched_ids)), (matched_components, count + np.searchsorted(area_ids, matched_ids))),
+                           shape=(nodes, nodes))
+        groups = connected_components(graph, directed=False)[1]
+
+        # Each group keeps its smallest stored ID (area_ids are sorted), groups without a stored area get new IDs in order
+        group_targets = np.full(nodes, -1, dtype=np.int64)
+        area_groups = groups[count:]
+        first_area = np.unique(area_groups, return_index=True)[1]
+        group_targets[area_groups[first_area]] = area_ids[first_area]
+        component_groups = groups[:count]
+        new_groups = pd.unique(component_groups[group_targets[component_groups] < 0])
+        group_targets[new_groups] = self.next_id + np.arange(len(new_groups))
+        self.next_id += len(new_groups)
+
+        # Merge the stored areas bridged by the new spots
+        area_targets = group_targets[area_groups]
+        if (area_targets != area_ids).any():
+            positions = np.searchsorted(area_ids, stored_ids)
+            touched = (positions < len(area_ids)) & (area_ids[np.minimum(positions, len(area_ids) - 1)] == stored_ids)
+            stored_ids[touched] = area_targets[positions[touched]]
+            self.spots['Persistent_Area_ID'] = stored_ids
+
+        spots['Persistent_Area_ID'] = group_targets[component_groups[components]]
+        spots.insert(0, 'Run_Key', run_key)
+        others = self.spots[self.spots['Run_Key'] != run_key]
+        self.spots = pd.concat([others, spots[SPOT_COLUMNS]], ignore_index=True) if len(others) else spots[SPOT_COLUMNS].copy()
+        return spots.drop(columns=['Run_Key'])
+
+    # Function to summarize the persistent areas of the spots of a run
+    def get_area_summary(self, spots):
+        """
+        Returns:
+            pd.DataFrame: The spots with the number of runs and spots of their persistent area.
+        """
+        areas = self.spots.groupby('Persistent_Area_ID').agg(Area_Runs=('Run_Key', 'nunique'), Area_Spots=('Run_Key', 'size'))
+        return spots.join(areas, on='Persistent_Area_ID')
+
+    # Function to save the store
+    def save(self):
+        os.makedirs(SPOT_CLUSTER_DIR, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({'spots': self.spots, 'next_id': self.next_id}, f)
+        os.replace(tmp_path, self.path)
+
+# Function to assign the spot areas of a run to persistent areas and save the store
+def update_persistent_areas(name, run_key, spots, output_path):
+    """
+    Parameters:
+        spots (pd.DataFrame): Output of get_spot_centroids, concatenated over the frames of the
+            problem areas output when it is written frame by frame (a spot area never spans two frames).
+    """
+    store = SpotClusterStore(name)
+    spots = store.add_run(run_key, spots)
+    store.save()
+    store.get_area_summary(spots).to_csv(output_path, index=False)
+    return spots
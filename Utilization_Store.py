@@ -0,0 +1,231 @@
+import os
+import numpy as np
+import pandas as pd
+
+from Drive_Test_Ingest import CACHE_DIR, PARQUET_AVAILABLE, compute_file_hash, project_dir
+from Drive_Test_Schema import TIMESTAMP_COLUMN, add_timestamp
+
+# Utilization tables built from the uploaded files, stored under their content hash
+UTILIZATION_CACHE_DIR = os.path.join(CACHE_DIR, "Utilization")
+
+# Utilization files, in order of preference: the uploaded export (CSV or workbook), then the default sheet
+UTILIZATION_FILE_NAMES = ["Uploaded_Utilization.csv", "Uploaded_Utilization.xlsx", "Nasr_City_PRB_Utilization.xlsx"]
+
+CELL_NAME_COLUMN = 'Cell Name'
+UTILIZATION_COLUMN = 'DL_PRB UTILIZATION'
+
+# Hour of each utilization value (NaT for a flat sheet without time)
+HOUR_COLUMN = 'Hour'
+
+# Time columns recognized in an OSS export, the first one present is used ('Date' + 'Time' are combined)
+UTILIZATION_TIME_COLUMNS = ['Start Time', 'Period Start Time', 'Timestamp', 'Hour', 'Time', 'Date']
+
+# A sample takes the utilization of its serving cell up to the end of the reported hour
+# (merge_asof tolerances are inclusive, so the next hour itself is excluded by 1 ns)
+UTILIZATION_MAX_AGE = pd.Timedelta(hours=1) - pd.Timedelta(1, unit='ns')
+
+# Function to find the utilization file used by the analysis
+def find_utilization_file(directory=project_dir):
+    for name in UTILIZATION_FILE_NAMES:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+# Function to read a utilization export (CSV or workbook)
+def read_utilization_file(utilization_path):
+    if utilization_path.lower().endswith('.csv'):
+        return pd.read_csv(utilization_path, low_memory=False)
+    return pd.read_excel(utilization_path)
+
+# Function to get the hour of each row of a utilization export
+def _get_hours(raw):
+    if 'Date' in raw.columns and 'Time' in raw.columns:
+        times = pd.to_datetime(raw['Date'].astype(str) + ' ' + raw['Time'].astype(str), errors='coerce')
+    else:
+        time_column = next((col for col in UTILIZATION_TIME_COLUMNS if col in raw.columns), None)
+        if time_column is None:
+            return pd.Series(pd.NaT, index=raw.index, dtype='datetime64[ns]')
+        times = pd.to_datetime(raw[time_column].astype(str), errors='coerce')
+    return times.dt.floor('h')
+
+# Function to build the (cell, hour) utilization table from a raw export
+def build_utilization_table(raw):
+    """
+    Reduces a utilization export to one row per cell and hour, sorted by
+    hour. A flat sheet (no time column) keeps the first value of each cell.
+
+    Returns:
+        pd.DataFrame: CELL_NAME_COLUMN, HOUR_COLUMN and UTILIZATION_COLUMN columns.
+    """
+    table = pd.DataFrame({
+        CELL_NAME_COLUMN: raw[CELL_NAME_COLUMN],
+        HOUR_COLUMN: _get_hours(raw),
+        UTILIZATION_COLUMN: pd.to_numeric(raw[UTILIZATION_COLUMN], errors='coerce')
+    })
+    if table[HOUR_COLUMN].isna().all():
+        return table.drop_duplicates(subset=CELL_NAME_COLUMN, keep='first').reset_index(drop=True)
+
+    # Finer-grained reports (e.g. 15 minutes) are averaged over the hour
+    table = table.dropna(subset=[HOUR_COLUMN])
+    table = table.groupby([CELL_NAME_COLUMN, HOUR_COLUMN], as_index=False, sort=False)[UTILIZATION_COLUMN].mean()
+    return table.sort_values(HOUR_COLUMN, kind='stable').reset_index(drop=True)
+
+# Function to get the cached Parquet path of a utilization file
+def get_utilization_cache_path(file_hash):
+    return os.path.join(UTILIZATION_CACHE_DIR, f"{file_hash}.parquet")
+
+# Function to convert an uploaded utilization export into the (cell, hour) table (parsed only once per content)
+def ingest_utilization_file(utilization_path, file_hash=None):
+    """
+    Builds the (cell, hour) utilization table of an export and saves it as
+    Parquet under the content hash of the file.
+
+    Returns:
+        str: Path of the cached Parquet file, or None if it cannot be written.
+    """
+    if not PARQUET_AVAILABLE:
+        return None
+
+    parquet_path = get_utilization_cache_path(file_hash or compute_file_hash(utilization_path))
+    if os.path.exists(parquet_path):
+        return parquet_path
+
+    table = build_utilization_table(read_utilization_file(utilization_path))
+
+    # Write to a temporary file first so an interrupted run never leaves a partial cache entry
+    os.makedirs(UTILIZATION_CACHE_DIR, exist_ok=True)
+    tmp_path = parquet_path + ".tmp"
+    try:
+        table.to_parquet(tmp_path, index=False)
+    except (ValueError, TypeError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+class UtilizationStore:
+    """
+    DL PRB utilization per cell and hour, looked up with an as-of join on
+    the time of each drive-test sample. A flat sheet without time holds a
+    single value per cell, used for every sample of the cell.
+    """
+    def __init__(self, table):
+        self.table = table
+        self.timed = bool(table[HOUR_COLUMN].notna().any())
+
+        # Table of the as-of join, with the cell names as plain objects like those of the samples
+        self._join_table = table.astype({CELL_NAME_COLUMN: object})
+        self._hours = table[HOUR_COLUMN].to_numpy()
+
+        # Busy hour of each cell, computed on first use (the lookups of every chunk share it)
+        self._busy_hour = None
+
+    # Function to get the utilization of the serving cell of each sample at the time of the sample
+    def lookup(self, cell_names, timestamps=None, busy_hour_fallback=False):
+        """
+        Parameters:
+            cell_names (array-like): Serving cell name of each sample.
+            timestamps (array-like): Time of each sample (ignored for a flat sheet).
+            busy_hour_fallback (bool): Whether a sample with no reported hour (outside the reported
+                hours, or without time) takes the busy-hour utilization of its cell instead of NaN.
+                This overstates the load of off-peak samples, so it is off by default.
+
+        Returns:
+            np.ndarray: Utilization of each sample (float64), NaN for an unknown cell or hour.
+        """
+        samples = pd.DataFrame({CELL_NAME_COLUMN: pd.Series(cell_names, dtype=object).to_numpy()})
+        if not self.timed or busy_hour_fallback:
+            # A flat sheet holds a single value per cell, the busy-hour table of a timed one its peak value
+            busy_hour = self._get_busy_hour().drop_duplicates(subset=CELL_NAME_COLUMN)
+            fallback = samples.merge(busy_hour, on=CELL_NAME_COLUMN, how='left')[UTILIZATION_COLUMN].to_numpy(dtype='float64')
+        else:
+            fallback = np.full(len(samples), np.nan)
+        if not self.timed or timestamps is None:
+            return fallback
+
+        samples[HOUR_COLUMN] = pd.to_datetime(pd.Series(timestamps).to_numpy())
+        samples['position'] = np.arange(len(samples))
+        samples = samples.dropna(subset=[HOUR_COLUMN]).sort_values(HOUR_COLUMN, kind='stable')
+        if samples.empty:
+            return fallback
+
+        # Only the hours that a sample can match take part in the join (the table is sorted by hour)
+        first = np.searchsorted(self._hours, (samples[HOUR_COLUMN].iloc[0] - UTILIZATION_MAX_AGE).to_datetime64(), side='left')
+        last = np.searchsorted(self._hours, samples[HOUR_COLUMN].iloc[-1].to_datetime64(), side='right')
+        matched = pd.merge_asof(samples, self._join_table.iloc[first:last], on=HOUR_COLUMN, by=CELL_NAME_COLUMN,
+                                direction='backward', tolerance=UTILIZATION_MAX_AGE)
+
+        utilization = fallback.copy()
+        values = matched[UTILIZATION_COLUMN].to_numpy(dtype='float64')
+        found = ~np.isnan(values)
+        utilization[matched['position'].to_numpy()[found]] = values[found]
+        return utilization
+
+    # Function to get the utilization of the serving cell of drive-test samples, at the hour of each sample
+    def lookup_samples(self, data, cell_names, busy_hour_fallback=False):
+        """
+        Parameters:
+            data (pd.DataFrame): Samples with 'Date' and 'Time'.
+            cell_names (array-like): Serving cell name of each sample.
+            busy_hour_fallback (bool): See lookup.
+
+        Returns:
+            np.ndarray: Utilization of each sample rounded to 2 decimals (object array, "" for an unknown
+                cell or a sample outside the reported hours).
+        """
+        timestamps = None
+        if self.timed:
+            timestamps = add_timestamp(data[['Date', 'Time']].astype(str))[TIMESTAMP_COLUMN]
+        values = self.lookup(cell_names, timestamps, busy_hour_fallback)
+        utilization = np.full(len(data), "", dtype=object)
+        found = ~np.isnan(values)
+        utilization[found] = [round(value, 2) for value in values[found]]
+        return utilization
+
+    # Function to get the busy hour of each cell and its utilization
+    def busy_hour(self):
+        """
+        Returns:
+            pd.DataFrame: One row per cell with CELL_NAME_COLUMN, 'Busy Hour' (hour of the day with
+                the highest average utilization, NaN for a flat sheet) and UTILIZATION_COLUMN (the
+                average utilization at that hour).
+        """
+        return self._get_busy_hour().copy()
+
+    # Function to get the busy-hour table, computed once per store
+    def _get_busy_hour(self):
+        if self._busy_hour is None:
+            self._busy_hour = self._compute_busy_hour()
+        return self._busy_hour
+
+    # Function to compute the busy hour of each cell over the whole table
+    def _compute_busy_hour(self):
+        if not self.timed:
+            busy_hour = self.table[[CELL_NAME_COLUMN, UTILIZATION_COLUMN]].copy()
+            busy_hour.insert(1, 'Busy Hour', np.nan)
+            return busy_hour
+
+        hourly = self.table.assign(**{'Busy Hour': self.table[HOUR_COLUMN].dt.hour})
+        hourly = hourly.groupby([CELL_NAME_COLUMN, 'Busy Hour'], as_index=False, sort=False)[UTILIZATION_COLUMN].mean()
+        busiest = hourly.sort_values(UTILIZATION_COLUMN, ascending=False, kind='stable').drop_duplicates(subset=CELL_NAME_COLUMN)
+        return busiest.sort_index().reset_index(drop=True)
+
+# Function to load the utilization store of the analysis, through the Parquet cache
+def load_utilization_store(utilization_path=None):
+    """
+    Parameters:
+        utilization_path (str): Utilization export to load (default: find_utilization_file()).
+
+    Returns:
+        UtilizationStore: The store, or None if no utilization file exists.
+    """
+    utilization_path = utilization_path or find_utilization_file()
+    if utilization_path is None or not os.path.exists(utilization_path):
+        return None
+
+    parquet_path = ingest_utilization_file(utilization_path)
+    if parquet_path is None:
+        return UtilizationStore(build_utilization_table(read_utilization_file(utilization_path)))
+    return UtilizationStore(pd.read_parquet(parquet_path))
@@ -12,9 +12,13 @@ import matplotlib.patches as mpatches
 import folium
 import os
 import webbrowser
-import math
 import shutil
 
+from Sector_Geometry import SECTOR_RADII_KM, get_sector_layer
+
+# Cells farther than this from the samples shown on a map are not drawn, except their serving cells (m)
+MAP_CELL_RADIUS_M = 5000
+
 # --- Reusable Button Animation Logic ---
 button_animation_data = {}
 
@@ -509,7 +513,7 @@ class MainWindow(QMainWindow):
     def Browse1_Function(self):
 
         global file_uploaded
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Drive Test File", "", "Excel Files (*.csv *.xlsx);;All Files (*)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Drive Test File", "", "Excel Files (*.csv *.xlsx);;Compressed Files (*.csv.gz *.csv.zst *.zip);;All Files (*)")
         if file_path:
             self.upload_drivetest_line.setText(file_path)
             
@@ -555,7 +559,7 @@ class MainWindow(QMainWindow):
                     self.loading_overlay = None # Remove reference
 
     def Browse2_Function(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Cell File", "", "Excel Files (*.xlsx *.xls);;All Files (*)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Cell File", "", "Excel Files (*.xlsx *.xls);;Compressed Files (*.gz *.zst *.zip);;All Files (*)")
         if file_path:
             self.upload_cellfile_line.setText(file_path)
             try:
@@ -576,7 +580,7 @@ class MainWindow(QMainWindow):
 
     # New function to browse and upload RB Utilization file
     def Browse3_Function(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select RB Utilization File", "", "Excel Files (*.xlsx *.xls);;All Files (*)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select RB Utilization File", "", "Excel Files (*.xlsx *.xls *.csv);;All Files (*)")
         if file_path:
             self.upload_RBs_line.setText(file_path)
             try:
@@ -1476,32 +1480,6 @@ class BadCoveragePage(QMainWindow):
             if filtered_df.empty:
                 QMessageBox.information(self, "No Data", "No data found for this spot.")
                 return
-            cell_df = pd.read_excel("Uploaded_Cell.xlsx")
-            cell_df["AZIMUTH"] = pd.to_numeric(cell_df["AZIMUTH"], errors="coerce")
-            cell_df = cell_df.dropna(subset=["Latitude", "Longitude", "AZIMUTH"])
-
-            def get_band_color(band):
-                try:
-                    band = int(band)
-                except:
-                    return "gray"
-                return {1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"}.get(band, "gray")
-
-            def draw_sector(map_obj, lat, lon, azimuth, popup_text, beamwidth=60, radius_km=0.3, color='blue'):
-                import math
-                points = []
-                steps = 10
-                start_angle = azimuth - beamwidth / 2
-                end_angle = azimuth + beamwidth / 2
-                for angle in range(int(start_angle), int(end_angle) + 1, int(beamwidth / steps)):
-                    rad = math.radians(angle)
-                    dlat = radius_km * math.cos(rad) / 111
-                    dlon = radius_km * math.sin(rad) / (111 * math.cos(math.radians(lat)))
-                    points.append([lat + dlat, lon + dlon])
-                points.insert(0, [lat, lon])
-                folium.Polygon(locations=points, color=color, fill=True, fill_opacity=0.3,
-                               popup=folium.Popup(popup_text, max_width=300)).add_to(map_obj)
-
             latitudes = filtered_df["Latitude"].values
             longitudes = filtered_df["Longitude"].values
             m = folium.Map(location=[latitudes[0], longitudes[0]], zoom_start=14)
@@ -1509,15 +1487,8 @@ class BadCoveragePage(QMainWindow):
             for lat, lon in zip(latitudes, longitudes):
                 folium.Marker(location=[lat, lon], popup=f"Spot: {spot}").add_to(m)
 
-            for _, row in cell_df.iterrows():
-                lat, lon, azimuth = row["Latitude"], row["Longitude"], row["AZIMUTH"]
-                name = row["CellNAME"]
-                band = row.get("Freq Band", "Unknown")
-                color = get_band_color(band)
-                popup_html = f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
-                draw_sector(m, lat, lon, azimuth, popup_html, color=color)
-                folium.CircleMarker(location=[lat, lon], radius=3, color=color, fill=True,
-                                    fill_opacity=1, popup=f"{name} (site center)").add_to(m)
+            # Precomputed wedges of the cells around the spot samples
+            get_sector_layer("Uploaded_Cell.xlsx", SECTOR_RADII_KM[0]).draw(m, filtered_df["Latitude"], filtered_df["Longitude"], MAP_CELL_RADIUS_M, samples=filtered_df)
 
             # Create Maps directory if it doesn't exist
             maps_dir = os.path.join(base_dir, "Maps")
@@ -1741,32 +1712,6 @@ class OverlappingPage(QMainWindow):
             if filtered_df.empty:
                 QMessageBox.information(self, "No Data", "No data found for this spot.")
                 return
-            cell_df = pd.read_excel("Uploaded_Cell.xlsx")
-            cell_df["AZIMUTH"] = pd.to_numeric(cell_df["AZIMUTH"], errors="coerce")
-            cell_df = cell_df.dropna(subset=["Latitude", "Longitude", "AZIMUTH"])
-
-            def get_band_color(band):
-                try:
-                    band = int(band)
-                except:
-                    return "gray"
-                return {1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"}.get(band, "gray")
-
-            def draw_sector(map_obj, lat, lon, azimuth, popup_text, beamwidth=60, radius_km=0.3, color='blue'):
-                import math
-                points = []
-                steps = 10
-                start_angle = azimuth - beamwidth / 2
-                end_angle = azimuth + beamwidth / 2
-                for angle in range(int(start_angle), int(end_angle) + 1, int(beamwidth / steps)):
-                    rad = math.radians(angle)
-                    dlat = radius_km * math.cos(rad) / 111
-                    dlon = radius_km * math.sin(rad) / (111 * math.cos(math.radians(lat)))
-                    points.append([lat + dlat, lon + dlon])
-                points.insert(0, [lat, lon])
-                folium.Polygon(locations=points, color=color, fill=True, fill_opacity=0.3,
-                               popup=folium.Popup(popup_text, max_width=300)).add_to(map_obj)
-
             latitudes = filtered_df["Latitude"].values
             longitudes = filtered_df["Longitude"].values
             m = folium.Map(location=[latitudes[0], longitudes[0]], zoom_start=14)
@@ -1774,15 +1719,8 @@ class OverlappingPage(QMainWindow):
             for lat, lon in zip(latitudes, longitudes):
                 folium.Marker(location=[lat, lon], popup=f"Spot: {spot_area_num}").add_to(m)
 
-            for _, row in cell_df.iterrows():
-                lat, lon, azimuth = row["Latitude"], row["Longitude"], row["AZIMUTH"]
-                name = row["CellNAME"]
-                band = row.get("Freq Band", "Unknown")
-                color = get_band_color(band)
-                popup_html = f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
-                draw_sector(m, lat, lon, azimuth, popup_html, color=color)
-                folium.CircleMarker(location=[lat, lon], radius=3, color=color, fill=True,
-                                    fill_opacity=1, popup=f"{name} (site center)").add_to(m)
+            # Precomputed wedges of the cells around the spot samples
+            get_sector_layer("Uploaded_Cell.xlsx", SECTOR_RADII_KM[0]).draw(m, filtered_df["Latitude"], filtered_df["Longitude"], MAP_CELL_RADIUS_M, samples=filtered_df)
 
             # Create Maps directory if it doesn't exist
             maps_dir = os.path.join(base_dir, "Maps")
@@ -2006,32 +1944,6 @@ class HighLoadPage(QMainWindow):
             if filtered_df.empty:
                 QMessageBox.information(self, "No Data", "No data found for this spot.")
                 return
-            cell_df = pd.read_excel("Uploaded_Cell.xlsx")
-            cell_df["AZIMUTH"] = pd.to_numeric(cell_df["AZIMUTH"], errors="coerce")
-            cell_df = cell_df.dropna(subset=["Latitude", "Longitude", "AZIMUTH"])
-
-            def get_band_color(band):
-                try:
-                    band = int(band)
-                except:
-                    return "gray"
-                return {1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"}.get(band, "gray")
-
-            def draw_sector(map_obj, lat, lon, azimuth, popup_text, beamwidth=60, radius_km=0.3, color='blue'):
-                import math
-                points = []
-                steps = 10
-                start_angle = azimuth - beamwidth / 2
-                end_angle = azimuth + beamwidth / 2
-                for angle in range(int(start_angle), int(end_angle) + 1, int(beamwidth / steps)):
-                    rad = math.radians(angle)
-                    dlat = radius_km * math.cos(rad) / 111
-                    dlon = radius_km * math.sin(rad) / (111 * math.cos(math.radians(lat)))
-                    points.append([lat + dlat, lon + dlon])
-                points.insert(0, [lat, lon])
-                folium.Polygon(locations=points, color=color, fill=True, fill_opacity=0.3,
-                               popup=folium.Popup(popup_text, max_width=300)).add_to(map_obj)
-
             latitudes = filtered_df["Latitude"].values
             longitudes = filtered_df["Longitude"].values
             m = folium.Map(location=[latitudes[0], longitudes[0]], zoom_start=14)
@@ -2039,15 +1951,8 @@ class HighLoadPage(QMainWindow):
             for lat, lon in zip(latitudes, longitudes):
                 folium.Marker(location=[lat, lon], popup=f"Spot: {spot_area_num}").add_to(m)
 
-            for _, row in cell_df.iterrows():
-                lat, lon, azimuth = row["Latitude"], row["Longitude"], row["AZIMUTH"]
-                name = row["CellNAME"]
-                band = row.get("Freq Band", "Unknown")
-                color = get_band_color(band)
-                popup_html = f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
-                draw_sector(m, lat, lon, azimuth, popup_html, color=color)
-                folium.CircleMarker(location=[lat, lon], radius=3, color=color, fill=True,
-                                    fill_opacity=1, popup=f"{name} (site center)").add_to(m)
+            # Precomputed wedges of the cells around the spot samples
+            get_sector_layer("Uploaded_Cell.xlsx", SECTOR_RADII_KM[0]).draw(m, filtered_df["Latitude"], filtered_df["Longitude"], MAP_CELL_RADIUS_M, samples=filtered_df)
 
             # Create Maps directory if it doesn't exist
             maps_dir = os.path.join(base_dir, "Maps")
@@ -2636,34 +2541,6 @@ class HandoverPage(QMainWindow):
             if filtered_df.empty:
                 QMessageBox.information(self, "No Data", "No data found for this spot.")
                 return
-            cell_df = pd.read_excel("Uploaded_Cell.xlsx")
-            cell_df["AZIMUTH"] = pd.to_numeric(cell_df["AZIMUTH"], errors="coerce")
-            cell_df = cell_df.dropna(subset=["Latitude", "Longitude", "AZIMUTH"])
-
-            def get_band_color(band):
-                try:
-                    band = int(band)
-                except:
-                    return "gray"
-                return {
-                    1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"
-                }.get(band, "gray")
-
-            def draw_sector(map_obj, lat, lon, azimuth, popup_text, beamwidth=60, radius_km=0.3, color='blue'):
-                import math
-                points = []
-                steps = 10
-                start_angle = azimuth - beamwidth / 2
-                end_angle = azimuth + beamwidth / 2
-                for angle in range(int(start_angle), int(end_angle) + 1, int(beamwidth / steps)):
-                    rad = math.radians(angle)
-                    dlat = radius_km * math.cos(rad) / 111
-                    dlon = radius_km * math.sin(rad) / (111 * math.cos(math.radians(lat)))
-                    points.append([lat + dlat, lon + dlon])
-                points.insert(0, [lat, lon])
-                folium.Polygon(locations=points, color=color, fill=True, fill_opacity=0.3,
-                               popup=folium.Popup(popup_text, max_width=300)).add_to(map_obj)
-
             latitudes = filtered_df["Latitude"].values
             longitudes = filtered_df["Longitude"].values
             m = folium.Map(location=[latitudes[0], longitudes[0]], zoom_start=14)
@@ -2671,15 +2548,8 @@ class HandoverPage(QMainWindow):
             for lat, lon in zip(latitudes, longitudes):
                 folium.Marker(location=[lat, lon], popup=f"Spot: {spot_area_num}").add_to(m)
 
-            for _, row in cell_df.iterrows():
-                lat, lon, azimuth = row["Latitude"], row["Longitude"], row["AZIMUTH"]
-                name = row["CellNAME"]
-                band = row.get("Freq Band", "Unknown")
-                color = get_band_color(band)
-                popup_html = f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
-                draw_sector(m, lat, lon, azimuth, popup_html, color=color)
-                folium.CircleMarker(location=[lat, lon], radius=3, color=color, fill=True,
-                                    fill_opacity=1, popup=f"{name} (site center)").add_to(m)
+            # Precomputed wedges of the cells around the spot samples
+            get_sector_layer("Uploaded_Cell.xlsx", SECTOR_RADII_KM[0]).draw(m, filtered_df["Latitude"], filtered_df["Longitude"], MAP_CELL_RADIUS_M, samples=filtered_df)
 
             # Create Maps directory if it doesn't exist
             maps_dir = os.path.join(base_dir, "Maps")
@@ -2809,48 +2679,9 @@ class Actions(QMainWindow):
             cell_file_path = os.path.join(base_dir, "Uploaded_Cell.xlsx")
             if not os.path.exists(cell_file_path):
                 QMessageBox.warning(self, "Map Warning", f"Cell file not found at: {cell_file_path}. Cannot draw sectors.")
-                cell_df = pd.DataFrame() # Create empty DataFrame to avoid errors
             else:
-                cell_df = pd.read_excel(cell_file_path)
-                cell_df["AZIMUTH"] = pd.to_numeric(cell_df["AZIMUTH"], errors="coerce")
-                cell_df = cell_df.dropna(subset=["Latitude", "Longitude", "AZIMUTH"])
-
-            def get_band_color(band):
-                try:
-                    band = int(band)
-                except:
-                    return "gray"
-                return {
-                    1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"
-                }.get(band, "gray")
-
-            def draw_sector(map_obj, lat, lon, azimuth, popup_text, beamwidth=60, radius_km=0.1, color='blue'): # Set radius_km to 0.1 for small sectors
-                import math
-                points = []
-                steps = 10
-                start_angle = azimuth - beamwidth / 2
-                end_angle = azimuth + beamwidth / 2
-                for angle in range(int(start_angle), int(end_angle) + 1, int(beamwidth / steps)):
-                    rad = math.radians(angle)
-                    dlat = radius_km * math.cos(rad) / 111
-                    dlon = radius_km * math.sin(rad) / (111 * math.cos(math.radians(lat)))
-                    points.append([lat + dlat, lon + dlon])
-                points.insert(0, [lat, lon])
-                folium.Polygon(locations=points, color=color, fill=True, fill_opacity=0.3,
-                               popup=folium.Popup(popup_text, max_width=300)).add_to(map_obj)
-
-            # Add sectors to the map from cell_df, only if cell_df is not empty
-            if not cell_df.empty:
-                for _, row in cell_df.iterrows():
-                    lat, lon, azimuth = row["Latitude"], row["Longitude"], row["AZIMUTH"]
-                    name = row["CellNAME"]
-                    band = row.get("Freq Band", "Unknown")
-                    color = get_band_color(band)
-                    popup_html = f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
-                    # Draw the sector with a small radius
-                    draw_sector(m, lat, lon, azimuth, popup_html, color=color, radius_km=0.1) # Ensure small radius here too
-                    folium.CircleMarker(location=[lat, lon], radius=2, color=color, fill=True,
-                                        fill_opacity=1, popup=f"{name} (site center)").add_to(m)
+                # Precomputed small wedges of the cells around the shown spots
+                get_sector_layer(cell_file_path, SECTOR_RADII_KM[1]).draw(m, bad_coverage_spots["Latitude"], bad_coverage_spots["Longitude"], MAP_CELL_RADIUS_M, marker_radius=2, samples=bad_coverage_spots)
             # --- End: Cell Drawing Logic ---
 
 
@@ -2952,48 +2783,9 @@ class Actions(QMainWindow):
             cell_file_path = os.path.join(base_dir, "Uploaded_Cell.xlsx")
             if not os.path.exists(cell_file_path):
                 QMessageBox.warning(self, "Map Warning", f"Cell file not found at: {cell_file_path}. Cannot draw sectors.")
-                cell_df = pd.DataFrame() # Create empty DataFrame to avoid errors
             else:
-                cell_df = pd.read_excel(cell_file_path)
-                cell_df["AZIMUTH"] = pd.to_numeric(cell_df["AZIMUTH"], errors="coerce")
-                cell_df = cell_df.dropna(subset=["Latitude", "Longitude", "AZIMUTH"])
-
-            def get_band_color(band):
-                try:
-                    band = int(band)
-                except:
-                    return "gray"
-                return {
-                    1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"
-                }.get(band, "gray")
-
-            def draw_sector(map_obj, lat, lon, azimuth, popup_text, beamwidth=60, radius_km=0.1, color='blue'): # Set radius_km to 0.1 for small sectors
-                import math
-                points = []
-                steps = 10
-                start_angle = azimuth - beamwidth / 2
-                end_angle = azimuth + beamwidth / 2
-                for angle in range(int(start_angle), int(end_angle) + 1, int(beamwidth / steps)):
-                    rad = math.radians(angle)
-                    dlat = radius_km * math.cos(rad) / 111
-                    dlon = radius_km * math.sin(rad) / (111 * math.cos(math.radians(lat)))
-                    points.append([lat + dlat, lon + dlon])
-                points.insert(0, [lat, lon])
-                folium.Polygon(locations=points, color=color, fill=True, fill_opacity=0.3,
-                               popup=folium.Popup(popup_text, max_width=300)).add_to(map_obj)
-
-            # Add sectors to the map from cell_df, only if cell_df is not empty
-            if not cell_df.empty:
-                for _, row in cell_df.iterrows():
-                    lat, lon, azimuth = row["Latitude"], row["Longitude"], row["AZIMUTH"]
-                    name = row["CellNAME"]
-                    band = row.get("Freq Band", "Unknown")
-                    color = get_band_color(band)
-                    popup_html = f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
-                    # Draw the sector with a small radius
-                    draw_sector(m, lat, lon, azimuth, popup_html, color=color, radius_km=0.1) # Ensure small radius here too
-                    folium.CircleMarker(location=[lat, lon], radius=2, color=color, fill=True,
-                                        fill_opacity=1, popup=f"{name} (site center)").add_to(m)
+                # Precomputed small wedges of the cells around the shown spots
+                get_sector_layer(cell_file_path, SECTOR_RADII_KM[1]).draw(m, overlapping_spots["Latitude"], overlapping_spots["Longitude"], MAP_CELL_RADIUS_M, marker_radius=2, samples=overlapping_spots)
             # --- End: Cell Drawing Logic ---
 
 
@@ -3095,48 +2887,9 @@ class Actions(QMainWindow):
             cell_file_path = os.path.join(base_dir, "Uploaded_Cell.xlsx")
             if not os.path.exists(cell_file_path):
                 QMessageBox.warning(self, "Map Warning", f"Cell file not found at: {cell_file_path}. Cannot draw sectors.")
-                cell_df = pd.DataFrame() # Create empty DataFrame to avoid errors
             else:
-                cell_df = pd.read_excel(cell_file_path)
-                cell_df["AZIMUTH"] = pd.to_numeric(cell_df["AZIMUTH"], errors="coerce")
-                cell_df = cell_df.dropna(subset=["Latitude", "Longitude", "AZIMUTH"])
-
-            def get_band_color(band):
-                try:
-                    band = int(band)
-                except:
-                    return "gray"
-                return {
-                    1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"
-                }.get(band, "gray")
-
-            def draw_sector(map_obj, lat, lon, azimuth, popup_text, beamwidth=60, radius_km=0.1, color='blue'): # Set radius_km to 0.1 for small sectors
-                import math
-                points = []
-                steps = 10
-                start_angle = azimuth - beamwidth / 2
-                end_angle = azimuth + beamwidth / 2
-                for angle in range(int(start_angle), int(end_angle) + 1, int(beamwidth / steps)):
-                    rad = math.radians(angle)
-                    dlat = radius_km * math.cos(rad) / 111
-                    dlon = radius_km * math.sin(rad) / (111 * math.cos(math.radians(lat)))
-                    points.append([lat + dlat, lon + dlon])
-                points.insert(0, [lat, lon])
-                folium.Polygon(locations=points, color=color, fill=True, fill_opacity=0.3,
-                               popup=folium.Popup(popup_text, max_width=300)).add_to(map_obj)
-
-            # Add sectors to the map from cell_df, only if cell_df is not empty
-            if not cell_df.empty:
-                for _, row in cell_df.iterrows():
-                    lat, lon, azimuth = row["Latitude"], row["Longitude"], row["AZIMUTH"]
-                    name = row["CellNAME"]
-                    band = row.get("Freq Band", "Unknown")
-                    color = get_band_color(band)
-                    popup_html = f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
-                    # Draw the sector with a small radius
-                    draw_sector(m, lat, lon, azimuth, popup_html, color=color, radius_km=0.1) # Ensure small radius here too
-                    folium.CircleMarker(location=[lat, lon], radius=2, color=color, fill=True,
-                                        fill_opacity=1, popup=f"{name} (site center)").add_to(m)
+                # Precomputed small wedges of the cells around the shown spots
+                get_sector_layer(cell_file_path, SECTOR_RADII_KM[1]).draw(m, high_load_spots["Latitude"], high_load_spots["Longitude"], MAP_CELL_RADIUS_M, marker_radius=2, samples=high_load_spots)
             # --- End: Cell Drawing Logic ---
 
 
@@ -3292,32 +3045,6 @@ class OvershootingPage(QMainWindow):
             if filtered_df.empty:
                 QMessageBox.information(self, "No Data", "No data found for this spot.")
                 return
-            cell_df = pd.read_excel("Uploaded_Cell.xlsx")
-            cell_df["AZIMUTH"] = pd.to_numeric(cell_df["AZIMUTH"], errors="coerce")
-            cell_df = cell_df.dropna(subset=["Latitude", "Longitude", "AZIMUTH"])
-
-            def get_band_color(band):
-                try:
-                    band = int(band)
-                except:
-                    return "gray"
-                return {1800: "red", 2100: "blue", 900: "green", 2600: "purple", 800: "orange"}.get(band, "gray")
-
-            def draw_sector(map_obj, lat, lon, azimuth, popup_text, beamwidth=60, radius_km=0.3, color='blue'):
-                import math
-                points = []
-                steps = 10
-                start_angle = azimuth - beamwidth / 2
-                end_angle = azimuth + beamwidth / 2
-                for angle in range(int(start_angle), int(end_angle) + 1, int(beamwidth / steps)):
-                    rad = math.radians(angle)
-                    dlat = radius_km * math.cos(rad) / 111
-                    dlon = radius_km * math.sin(rad) / (111 * math.cos(math.radians(lat)))
-                    points.append([lat + dlat, lon + dlon])
-                points.insert(0, [lat, lon])
-                folium.Polygon(locations=points, color=color, fill=True, fill_opacity=0.3,
-                               popup=folium.Popup(popup_text, max_width=300)).add_to(map_obj)
-
             latitudes = filtered_df["Latitude"].values
             longitudes = filtered_df["Longitude"].values
             m = folium.Map(location=[latitudes[0], longitudes[0]], zoom_start=14)
@@ -3325,15 +3052,8 @@ class OvershootingPage(QMainWindow):
             for lat, lon in zip(latitudes, longitudes):
                 folium.Marker(location=[lat, lon], popup=f"Spot: {spot_area_num}").add_to(m)
 
-            for _, row in cell_df.iterrows():
-                lat, lon, azimuth = row["Latitude"], row["Longitude"], row["AZIMUTH"]
-                name = row["CellNAME"]
-                band = row.get("Freq Band", "Unknown")
-                color = get_band_color(band)
-                popup_html = f"<b>Cell:</b> {name}<br><b>Band:</b> {band}<br><b>Azimuth:</b> {azimuth}°"
-                draw_sector(m, lat, lon, azimuth, popup_html, color=color)
-                folium.CircleMarker(location=[lat, lon], radius=3, color=color, fill=True,
-                                    fill_opacity=1, popup=f"{name} (site center)").add_to(m)
+            # Precomputed wedges of the cells around the spot samples
+            get_sector_layer("Uploaded_Cell.xlsx", SECTOR_RADII_KM[0]).draw(m, filtered_df["Latitude"], filtered_df["Longitude"], MAP_CELL_RADIUS_M, samples=filtered_df)
 
             # Create Maps directory if it doesn't exist
             maps_dir = os.path.join(base_dir, "Maps")
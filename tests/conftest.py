@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the shared modules in the project root importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
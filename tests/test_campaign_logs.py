@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Drive_Test_Ingest
+from Drive_Test_Ingest import SOURCE_LOG_COLUMN, campaign_drive_test, find_campaign_columns
+
+N4_COLUMNS = ['Neighbor Cell RSRP (dBm): N4', 'Neighbor Cell Identity: N4', 'Neighbor Cell DL EARFCN: N4']
+
+# Function to build a small drive-test log, one sample per second
+def make_log(n, start_time, empty_columns=()):
+    seconds = start_time + np.arange(n)
+    data = pd.DataFrame({
+        'Date': '01/15/2024',
+        'Time': [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds],
+        'Latitude': 30.0 + np.arange(n) * 1e-4,
+        'Longitude': 31.3 + np.arange(n) * 1e-4,
+        'Cell Identity (eNB Part)': 1001.0,
+        'Cell Identity (Cell Part)': 1.0,
+        'HTTP Start': ['s'] + [None] * (n - 1),
+        'HTTP End': [None] * (n - 1) + ['e'],
+        'HTTP IP Service Access Failure': [None] * (n - 1) + ['f'],
+        'PDSCH Phy Throughput (kbps)': np.where(np.arange(n) % 10 < 8, 3000.0, 20000.0),
+        'Serving Cell RSRP (dBm)': -100.0,
+        'Serving Cell RSRQ (dB)': -10.0,
+        'Serving Cell RS SINR (dB)': 5.0,
+        'Serving Cell Identity': 46.0,
+        'Serving Cell DL EARFCN': 1760.0,
+        'Number of PDSCH Resource Blocks': 30.0,
+        'UE TX Power - PUSCH (dBm) Carrier 1': 10.0
+    })
+    for i in range(1, 5):
+        data[f'Neighbor Cell RSRP (dBm): N{i}'] = -105.0 - i
+        data[f'Neighbor Cell Identity: N{i}'] = 50.0 + i
+        data[f'Neighbor Cell DL EARFCN: N{i}'] = 1760.0
+    for col in empty_columns:
+        data[col] = np.nan
+    return data
+
+# Keep the caches written by the tests out of the project Cache folder
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "Cache"
+    monkeypatch.setattr(Drive_Test_Ingest, 'CACHE_DIR', str(cache_dir))
+    monkeypatch.setattr(Drive_Test_Ingest, 'DRIVE_TEST_CACHE_DIR', str(cache_dir / "Drive_Test"))
+    return cache_dir
+
+def test_find_campaign_columns(tmp_path):
+    first, second = tmp_path / "000_a.csv", tmp_path / "001_b.csv"
+    make_log(20, 36000).assign(Extra=np.nan).to_csv(first, index=False)
+    make_log(20, 37000, empty_columns=N4_COLUMNS).drop(columns=['Latitude']).to_csv(second, index=False)
+
+    columns, empty_columns = find_campaign_columns([str(first), str(second)])
+
+    assert columns == list(make_log(1, 0).columns) + ['Extra']
+    # N4 has values in the first log and Latitude in the first only: only Extra is empty everywhere
+    assert empty_columns == ['Extra']
+
+def test_campaign_logs_with_different_empty_columns(tmp_path, cache_dir):
+    logs = [tmp_path / "000_a.csv", tmp_path / "001_b.csv"]
+    make_log(40, 36000).to_csv(logs[0], index=False)
+    make_log(40, 37000, empty_columns=N4_COLUMNS).to_csv(logs[1], index=False)
+
+    # Sample counts given as floats (e.g. read from the GUI) still divide the spots by whole samples
+    frames = list(campaign_drive_test([str(log) for log in logs], 5000, 2.0, 5.0, max_workers=2))
+
+    # The worker outputs of the run are removed once read
+    assert not list(cache_dir.glob("Campaign_*"))
+    assert len(list((cache_dir / "Drive_Test").glob("*.parquet"))) == len(logs)
+
+    # Both logs keep the N4 columns, in the same place, so they can be appended under one header
+    assert list(frames[0].columns) == list(frames[1].columns)
+    assert all(col in frames[1].columns for col in N4_COLUMNS)
+    assert frames[0][N4_COLUMNS].notna().all().all()
+    assert frames[1][N4_COLUMNS].isna().all().all()
+
+    assert [frame[SOURCE_LOG_COLUMN].unique().tolist() for frame in frames] == [['000_a.csv'], ['001_b.csv']]
+    assert all(set(frame['Bad Throughput']) <= {0, 1} for frame in frames)
+    # Spot numbers continue from one log to the next
+    spots = pd.Series(np.concatenate([frame['Spot_Area_Num'].to_numpy() for frame in frames]))
+    spots = spots[spots > 0]
+    assert spots.is_monotonic_increasing and spots.nunique() == spots.max()
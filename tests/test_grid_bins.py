@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from Grid_Bins import GRID_METRIC_BUCKETS, GRID_METRIC_COLUMNS, GridBinAggregator, aggregate_grid_bins, get_grid_samples
+
+# Function to build analyzed samples spread over a few bins, with missing and repeated values
+def make_samples(n, seed):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        'Latitude': 30.0 + rng.integers(0, 4, n) * 5e-4,
+        'Longitude': 31.3 + rng.integers(0, 3, n) * 5e-4,
+        'Serving Cell RSRP (dBm)': np.round(rng.uniform(-130, -70, n), 2),
+        'Serving Cell RS SINR (dB)': np.where(rng.random(n) < 0.2, np.nan, np.round(rng.normal(5, 8, n), 1)),
+        'PDSCH Phy Throughput (kbps)': np.round(rng.lognormal(8, 1.5, n), 2),
+        'Bad Throughput': rng.integers(0, 2, n),
+        'Bad Coverage': rng.integers(0, 2, n)
+    })
+    return get_grid_samples(data)
+
+# Function to get the width of the bucket of each value
+def get_bucket_widths(values, edges):
+    buckets = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+    return edges[buckets + 1] - edges[buckets]
+
+def test_chunked_aggregates_equal_the_aggregates_of_all_samples():
+    samples = make_samples(2000, 0)
+    grid_bins = GridBinAggregator()
+    for start in range(0, len(samples), 300):
+        grid_bins.add_samples(samples.iloc[start:start + 300])
+    result = grid_bins.summarize()
+
+    # Chunking does not change the aggregates, whatever the order of the samples
+    pd.testing.assert_frame_equal(result, aggregate_grid_bins(samples.sample(frac=1, random_state=1)), check_exact=True)
+
+    expected = samples.groupby(['Grid_Row', 'Grid_Col']).agg(
+        **{name: (col, 'median') for col, name in GRID_METRIC_COLUMNS.items()},
+        **{col: (col, 'sum') for col in ['Bad Throughput', 'Bad Coverage']}
+    ).reset_index()
+    pd.testing.assert_frame_equal(result[['Grid_Row', 'Grid_Col', 'Bad Throughput', 'Bad Coverage']],
+                                  expected[['Grid_Row', 'Grid_Col', 'Bad Throughput', 'Bad Coverage']].astype({'Bad Throughput': 'int64', 'Bad Coverage': 'int64'}))
+    assert result['Samples'].sum() == len(samples)
+
+    # The interpolated medians are within one bucket of the medians of the samples
+    for col, name in GRID_METRIC_COLUMNS.items():
+        widths = get_bucket_widths(expected[name].to_numpy(), GRID_METRIC_BUCKETS[col])
+        assert (np.abs(result[name] - expected[name]) <= widths).all(), name
+
+def test_aggregate_size_is_bounded_by_the_bins():
+    grid_bins = GridBinAggregator()
+    for seed in range(20):
+        grid_bins.add_samples(make_samples(2000, seed))
+    assert grid_bins.summarize()['Samples'].sum() == 20 * 2000
+
+    # Histograms keep at most one entry per bin and bucket, however many samples fall in the bins
+    for col, edges in GRID_METRIC_BUCKETS.items():
+        codes, counts = grid_bins.histograms[col]
+        assert grid_bins.pending[col] == [] and len(codes) <= grid_bins.bin_count * (len(edges) - 1)
+        assert counts.sum() == 20 * 2000 - (col == 'Serving Cell RS SINR (dB)') * sum(
+            make_samples(2000, seed)[col].isna().sum() for seed in range(20))
+
+    # The aggregates stay far smaller than the samples they summarize
+    sample_bytes = 20 * make_samples(2000, 0).memory_usage(index=False).sum()
+    assert grid_bins.nbytes() < sample_bytes / 5
+
+def test_medians_keep_the_logged_values():
+    data = pd.DataFrame({'Latitude': [30.0] * 4, 'Longitude': [31.3, 31.3, 31.3, 31.31],
+                         'Serving Cell RSRP (dBm)': [-101.15, -101.15, -101.15, -99.3]})
+    assert aggregate_grid_bins(get_grid_samples(data))['Median RSRP (dBm)'].tolist() == [-101.15, -99.3]
+
+def test_summarize_without_samples():
+    assert GridBinAggregator().summarize() is None
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Drive_Test_Schema import apply_drive_test_schema
+from Problem_Detection import detect_problems
+from Problem_Rules import load_problem_rules
+
+# Reference: the row-by-row problem functions the rule expressions replaced, applied with DataFrame.apply
+
+def _neighbor_rsrps(row):
+    return [row[f'Neighbor Cell RSRP (dBm): N{i}'] for i in range(1, 5)]
+
+def bad_coverage(row, t):
+    bad_throughput_condition = row['PDSCH Phy Throughput (kbps)'] < t['TARGET_THROUGHPUT']
+    bad_serving_rsrp_condtion = row['Serving Cell RSRP (dBm)'] < t['TARGET_RSRP']
+    bad_neighbor_rsrp_condtion = all(val < t['TARGET_RSRP'] for val in _neighbor_rsrps(row))
+    if bad_throughput_condition and bad_serving_rsrp_condtion and ((bad_neighbor_rsrp_condtion) or (bad_neighbor_rsrp_condtion == 0 and row['Intra-Frequency Handover'] == 0 and row['Inter-Frequency Handover'] == 0)):
+        return 1
+    return 0
+
+def _stronger_neighbors(row, t, same_frequency):
+    serving_rsrp = row['Serving Cell RSRP (dBm)']
+    return any(
+        row[f'Neighbor Cell RSRP (dBm): N{i}'] > serving_rsrp + t['RSRP_NEIGHBOUR_DIFFERENCE'] and
+        (row[f'Neighbor Cell DL EARFCN: N{i}'] == row['Serving Cell DL EARFCN']) == same_frequency
+        for i in range(1, 5)
+    )
+
+def intra_frequency_handover(row, t):
+    bad_throughput_condition = row['PDSCH Phy Throughput (kbps)'] < t['TARGET_THROUGHPUT']
+    bad_serving_rsrp_condtion = row['Serving Cell RSRP (dBm)'] < t['TARGET_RSRP']
+    bad_neighbor_rsrp_condtion = all(val < t['TARGET_RSRP'] for val in _neighbor_rsrps(row))
+    distance_condition = row['Distance_Power_Check']
+    intra_frequency_handover_condition = _stronger_neighbors(row, t, True)
+    return 1 if bad_throughput_condition and ((bad_serving_rsrp_condtion and bad_neighbor_rsrp_condtion == 0 and intra_frequency_handover_condition) or (bad_serving_rsrp_condtion == 0 and distance_condition and intra_frequency_handover_condition)) else 0
+
+def inter_frequency_handover(row, t):
+    bad_throughput_condition = row['PDSCH Phy Throughput (kbps)'] < t['TARGET_THROUGHPUT']
+    bad_serving_rsrp_condtion = row['Serving Cell RSRP (dBm)'] < t['TARGET_RSRP']
+    bad_neighbor_rsrp_condtion = all(val < t['TARGET_RSRP'] for val in _neighbor_rsrps(row))
+    intra_frequency_handover_condition = row['Intra-Frequency Handover']
+    distance_condition = row['Distance_Power_Check']
+    serving_rsrp_min = row['Serving Cell RSRP (dBm)'] < t['MIN_SERVING_RSRP']
+    inter_frequency_handover_condition = _stronger_neighbors(row, t, False)
+    return 1 if bad_throughput_condition and ((bad_serving_rsrp_condtion and bad_neighbor_rsrp_condtion == 0 and intra_frequency_handover_condition == 0 and inter_frequency_handover_condition and serving_rsrp_min) or (bad_serving_rsrp_condtion == 0 and distance_condition and intra_frequency_handover_condition == 0 and inter_frequency_handover_condition and serving_rsrp_min)) else 0
+
+def overshooting(row, t):
+    bad_throughput_condition = row['PDSCH Phy Throughput (kbps)'] < t['TARGET_THROUGHPUT']
+    serving_rsrp_condtion = row['Serving Cell RSRP (dBm)'] > t['TARGET_RSRP']
+    return 1 if bad_throughput_condition and serving_rsrp_condtion and row['Distance_Power_Check'] == 1 and row['Intra-Frequency Handover'] == 0 and row['Inter-Frequency Handover'] == 0 else 0
+
+def overlapping(row, t):
+    serving_rsrp = row['Serving Cell RSRP (dBm)']
+    serving_earfcn = row['Serving Cell DL EARFCN']
+    try:
+        serving_cell_id = int(row['Serving Cell Identity'])
+    except (ValueError, TypeError):
+        serving_cell_id = None
+
+    neighbors = []
+    for i in range(1, 5):
+        rsrp = row.get(f'Neighbor Cell RSRP (dBm): N{i}')
+        earfcn = row.get(f'Neighbor Cell DL EARFCN: N{i}')
+        try:
+            cell_id = int(row.get(f'Neighbor Cell Identity: N{i}'))
+        except (ValueError, TypeError):
+            cell_id = None
+        if pd.notna(rsrp) and pd.notna(earfcn) and cell_id is not None:
+            neighbors.append((rsrp, earfcn, cell_id))
+
+    overlapping_cells = set()
+    overlap_count = 0
+    for neighbor_rsrp, neighbor_earfcn, neighbor_id in neighbors:
+        if abs(serving_rsrp - neighbor_rsrp) <= t['MAX_RSRP_OVERLAP_RANGE'] and neighbor_earfcn == serving_earfcn and neighbor_id != serving_cell_id:
+            overlap_count += 1
+            overlapping_cells.add(str(neighbor_id))
+
+    overlap_detected = 1 if (
+        row['PDSCH Phy Throughput (kbps)'] < t['TARGET_THROUGHPUT'] and
+        any(neighbor_rsrp > t['TARGET_RSRP'] for neighbor_rsrp, _, _ in neighbors) and overlap_count > 0 and
+        row['Serving Cell RS SINR (dB)'] < t['MIN_SINR'] and
+        serving_rsrp > t['TARGET_RSRP']
+    ) else 0
+    if overlap_detected and serving_cell_id is not None:
+        overlapping_cells.add(str(serving_cell_id))
+    overlapping_cells_str = ", ".join(sorted(overlapping_cells)) if overlapping_cells else "None"
+    return pd.Series([overlap_detected, overlap_count + 1, overlapping_cells_str])
+
+def highload(row, t):
+    try:
+        prb_util = float(row['PRB Utilization'])
+    except (ValueError, TypeError):
+        return 0
+    return 1 if (
+        row['PDSCH Phy Throughput (kbps)'] < t['TARGET_THROUGHPUT'] and
+        row['Bad Coverage'] == 0 and row['Overlapping'] == 0 and row['Overshooting'] == 0 and
+        row['Intra-Frequency Handover'] == 0 and row['Inter-Frequency Handover'] == 0 and
+        row['Number of PDSCH Resource Blocks'] < t['MIN_PRB'] and
+        prb_util > t['PRB_Utilization_Threshold']
+    ) else 0
+
+# Function to detect the problems of each sample with the reference row functions, in their original order
+def reference_problems(data, t):
+    data = data.copy()
+    data['Intra-Frequency Handover'] = data.apply(intra_frequency_handover, axis=1, t=t).astype(int)
+    data['Inter-Frequency Handover'] = data.apply(inter_frequency_handover, axis=1, t=t).astype(int)
+    data['Bad Coverage'] = data.apply(bad_coverage, axis=1, t=t).astype(int)
+    data['Overshooting'] = data.apply(overshooting, axis=1, t=t).astype(int)
+    data[['Overlapping', 'overlap_count', 'overlapping_cell_ids']] = data.apply(overlapping, axis=1, t=t)
+    data['High Load'] = data.apply(highload, axis=1, t=t).astype(int)
+    return data
+
+# One sample per case: (serving RSRP, SINR, serving identity, neighbors as (RSRP, EARFCN, identity))
+EDGE_CASES = [
+    # Neighbors exactly 5 dB below and above the serving cell, on the serving frequency
+    (-94.3, 5.0, 46, [(-99.3, 1760, 51), (-89.3, 1760, 52), (np.nan, np.nan, np.nan), (np.nan, np.nan, np.nan)]),
+    (-95.0, 5.0, 46, [(-100.0, 1760, 51), (-90.0, 1760, 52), (-90.01, 1760, 53), (-100.01, 1760, 54)]),
+    # Just outside the range, another frequency, and the serving cell itself reported as a neighbor
+    (-95.0, 5.0, 46, [(-100.01, 1760, 51), (-95.0, 525, 52), (-95.0, 1760, 46), (-96.0, 1760, 47)]),
+    # Neighbors missing their RSRP, EARFCN or identity
+    (-95.0, 5.0, 46, [(np.nan, 1760, 51), (-96.0, np.nan, 52), (-96.0, 1760, np.nan), (-97.0, 1760, 53)]),
+    # No neighbor reported, with a weak and a strong serving cell
+    (-110.0, 5.0, 46, [(np.nan, np.nan, np.nan)] * 4),
+    (-90.0, 5.0, 46, [(np.nan, np.nan, np.nan)] * 4),
+    # Stronger neighbors by exactly the handover difference and beyond, on both frequencies
+    (-120.0, 5.0, 46, [(-114.0, 1760, 51), (-113.9, 525, 52), (np.nan, 1760, 53), (-130.0, 1760, 54)]),
+    (-105.0, 5.0, 46, [(-98.9, 1760, 51), (-130.0, 525, 52), (np.nan, np.nan, np.nan), (np.nan, np.nan, np.nan)]),
+    # Serving identity missing
+    (-95.0, 5.0, np.nan, [(-96.0, 1760, 51), (np.nan, np.nan, np.nan), (np.nan, np.nan, np.nan), (np.nan, np.nan, np.nan)]),
+]
+
+# Function to build the samples: every edge case with each throughput, distance check, PRB count and utilization
+def make_samples(seed=0, random_samples=400):
+    rows = []
+    for serving_rsrp, sinr, serving_identity, neighbors in EDGE_CASES:
+        for throughput, distance_check, resource_blocks, utilization in [
+                (3000.0, 0, 20.0, 90.0), (3000.0, 1, 20.0, 50.0), (3000.0, 0, 20.0, ""), (20000.0, 1, 40.0, 90.0)]:
+            row = {'PDSCH Phy Throughput (kbps)': throughput, 'Serving Cell RSRP (dBm)': serving_rsrp,
+                   'Serving Cell RS SINR (dB)': sinr, 'Serving Cell Identity': serving_identity,
+                   'Serving Cell DL EARFCN': 1760.0, 'Number of PDSCH Resource Blocks': resource_blocks,
+                   'Distance_Power_Check': distance_check, 'PRB Utilization': utilization}
+            for i, (rsrp, earfcn, identity) in enumerate(neighbors, start=1):
+                row.update({f'Neighbor Cell RSRP (dBm): N{i}': rsrp, f'Neighbor Cell DL EARFCN: N{i}': earfcn,
+                            f'Neighbor Cell Identity: N{i}': identity})
+            rows.append(row)
+
+    # Random samples on coarse values, so that many of them fall exactly on the thresholds
+    rng = np.random.default_rng(seed)
+    n = random_samples
+    for _ in range(n):
+        row = {'PDSCH Phy Throughput (kbps)': rng.choice([3000.0, 10000.0, 20000.0]),
+               'Serving Cell RSRP (dBm)': rng.integers(-125, -80) + rng.choice([0.0, 0.3, 0.5]),
+               'Serving Cell RS SINR (dB)': float(rng.integers(0, 20)), 'Serving Cell Identity': float(rng.integers(45, 49)),
+               'Serving Cell DL EARFCN': rng.choice([1760.0, 525.0]), 'Number of PDSCH Resource Blocks': float(rng.integers(20, 40)),
+               'Distance_Power_Check': int(rng.integers(0, 2)), 'PRB Utilization': rng.choice([70.0, 80.0, 90.0, ""])}
+        for i in range(1, 5):
+            reported = rng.random() < 0.7
+            row.update({
+                f'Neighbor Cell RSRP (dBm): N{i}': row['Serving Cell RSRP (dBm)'] + rng.choice([-6.0, -5.0, -4.7, 0.0, 5.0, 6.0, 7.0]) if reported else np.nan,
+                f'Neighbor Cell DL EARFCN: N{i}': rng.choice([1760.0, 525.0]) if reported else np.nan,
+                f'Neighbor Cell Identity: N{i}': float(rng.integers(45, 49)) if reported and rng.random() < 0.95 else np.nan})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+@pytest.mark.parametrize("overrides", [{}, {'MAX_RSRP_OVERLAP_RANGE': 3, 'RSRP_NEIGHBOUR_DIFFERENCE': 5, 'TARGET_RSRP': -105}])
+def test_rules_match_the_row_functions(overrides):
+    rules = load_problem_rules()
+    thresholds = {**rules.thresholds, **overrides}
+    samples = make_samples()
+    expected = reference_problems(samples, thresholds)
+
+    # The pipeline evaluates the rules on samples with the drive-test schema (float64 KPIs, integer PCIs)
+    result = detect_problems(apply_drive_test_schema(samples.copy()), rules, thresholds)
+
+    for col in rules.output_columns:
+        assert result[col].tolist() == expected[col].tolist(), col
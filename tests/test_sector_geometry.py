@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from Cell_Index import CellIndex
+from Sector_Geometry import SectorLayer, build_sector_geojson
+from Site_Index import SiteIndex
+
+# Function to build a cell file with a near site, a far site and a cell without coordinates
+def make_cells():
+    return pd.DataFrame({
+        'eNodeB id': [1001.0, 1001.0, 2002.0, 3003.0],
+        'PCI': [46.0, 47.0, 80.0, 90.0],
+        'DLARFCN': [1760.0, 1760.0, 1760.0, 1760.0],
+        'CellNAME': ['NEAR_1', 'NEAR_2', 'FAR_1', 'NOPOS_1'],
+        'AZIMUTH': [0.0, 120.0, 240.0, 0.0],
+        'Latitude': [30.0, 30.0, 30.5, np.nan],
+        'Longitude': [31.3, 31.3, 31.8, 31.3],
+    })
+
+# Function to get the names of the cells drawn for the samples
+def drawn_names(layer, samples, radius_m):
+    return sorted(feature['properties']['name'] for feature in layer.features_near(samples['Latitude'], samples['Longitude'], radius_m, samples))
+
+def test_serving_cells_are_drawn_beyond_the_radius():
+    cells = make_cells()
+    site_index = SiteIndex(cells)
+    layer = SectorLayer(site_index, build_sector_geojson(site_index, 0.3), CellIndex(cells))
+    samples = pd.DataFrame({
+        'Latitude': [30.001, 30.002, 30.003], 'Longitude': [31.3, 31.3, 31.3],
+        'Serving Cell Identity': [46.0, 80.0, 90.0], 'Serving Cell DL EARFCN': [1760.0, 1760.0, 1760.0],
+        'Cell Identity (eNB Part)': [1001.0, 2002.0, 3003.0]
+    })
+
+    # The far site only comes from the serving cell lookup; a cell without coordinates has no wedge
+    assert drawn_names(layer, samples, 5000) == ['FAR_1', 'NEAR_1', 'NEAR_2']
+    assert drawn_names(layer, samples, 10) == ['FAR_1', 'NEAR_1']
+    # Samples without the serving cell columns only get the cells within the radius
+    assert drawn_names(layer, samples[['Latitude', 'Longitude']], 5000) == ['NEAR_1', 'NEAR_2']
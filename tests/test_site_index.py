@@ -0,0 +1,86 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from Site_Index import EARTH_RADIUS_M, SiteIndex, haversine_distance
+
+# Reference: the per-sample haversine the vectorized version replaced
+def reference_distance(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2)**2
+    return 2 * EARTH_RADIUS_M * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+# Function to get the distances from a point to every cell, one pair at a time
+def reference_distances(lat, lon, cells):
+    return np.array([reference_distance(lat, lon, cell_lat, cell_lon)
+                     for cell_lat, cell_lon in zip(cells['Latitude'], cells['Longitude'])])
+
+# Function to build random cells around a city, a few per site, some without coordinates
+def make_cells(n_sites, seed):
+    rng = np.random.default_rng(seed)
+    sites = pd.DataFrame({
+        'Physical_Site_Code': [f"S{i}" for i in range(n_sites)],
+        'Latitude': rng.uniform(29.9, 30.2, n_sites),
+        'Longitude': rng.uniform(31.1, 31.5, n_sites)
+    })
+    cells = sites.loc[sites.index.repeat(rng.integers(1, 4, n_sites))].reset_index(drop=True)
+    cells.loc[rng.random(len(cells)) < 0.05, 'Latitude'] = np.nan
+    return cells
+
+# Function to build random query points, in and around the area of the cells
+def make_points(n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(29.8, 30.3, n), rng.uniform(31.0, 31.6, n)
+
+def test_haversine_matches_the_reference():
+    rng = np.random.default_rng(0)
+    lat1, lat2 = rng.uniform(-89, 89, (2, 500))
+    lon1, lon2 = rng.uniform(-180, 180, (2, 500))
+    expected = [reference_distance(*coords) for coords in zip(lat1, lon1, lat2, lon2)]
+    np.testing.assert_allclose(haversine_distance(lat1, lon1, lat2, lon2), expected, rtol=1e-9, atol=1e-6)
+
+    # float32 stays within a meter at the site distances of a drive test
+    lat, lon = make_points(500, 1)
+    expected = [reference_distance(*coords) for coords in zip(lat, lon, lat[::-1], lon[::-1])]
+    distances = haversine_distance(lat, lon, lat[::-1], lon[::-1], dtype='float32')
+    assert distances.dtype == np.float32
+    np.testing.assert_allclose(distances, expected, atol=1.0)
+
+    # Missing coordinates give NaN
+    assert np.isnan(haversine_distance([np.nan, 30.0], [31.0, 31.0], [30.0, 30.0], [31.0, np.nan])).all()
+
+def test_nearest_cells_match_brute_force():
+    cells = make_cells(150, 2)
+    index = SiteIndex(cells)
+    lat, lon = make_points(200, 3)
+    distances, positions = index.query_nearest(lat, lon, k=3)
+
+    for i in range(len(lat)):
+        expected = np.sort(reference_distances(lat[i], lon[i], index.cells))[:3]
+        np.testing.assert_allclose(distances[i], expected, atol=1e-3)
+        np.testing.assert_allclose(reference_distances(lat[i], lon[i], index.cells.iloc[positions[i]]), expected, atol=1e-3)
+
+def test_radius_queries_match_brute_force():
+    cells = make_cells(150, 4)
+    index = SiteIndex(cells)
+    lat, lon = make_points(100, 5)
+    radius_m = 2500
+
+    found = index.query_radius(lat, lon, radius_m)
+    near = set()
+    for i in range(len(lat)):
+        distances = reference_distances(lat[i], lon[i], index.cells)
+        # Cells within a millimeter of the radius may fall either way
+        assert set(np.flatnonzero(distances < radius_m - 1e-3)) <= set(found[i]) <= set(np.flatnonzero(distances <= radius_m + 1e-3))
+        near.update(found[i])
+    np.testing.assert_array_equal(index.positions_near(lat, lon, radius_m), sorted(near))
+
+def test_median_site_distance_matches_brute_force():
+    cells = make_cells(120, 6)
+    sites = cells.dropna(subset=['Latitude', 'Longitude']).drop_duplicates(subset='Physical_Site_Code')
+    closest = [np.sort(reference_distances(site_lat, site_lon, sites))[1]
+               for site_lat, site_lon in zip(sites['Latitude'], sites['Longitude'])]
+    assert math.isclose(SiteIndex(cells).median_site_distance(), np.median(pd.unique(np.array(closest))), abs_tol=1e-6)
+
+    assert np.isnan(SiteIndex(cells[cells['Physical_Site_Code'] == 'S0']).median_site_distance())
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Drive_Test_Ingest import SPOT_MAX_GAP, DriveTestStreamState, segment_stream_chunk
+from Drive_Test_Preprocess import assign_spots_area_num
+from Drive_Test_Schema import TIMESTAMP_COLUMN
+
+# Reference: the row-by-row loop the vectorized segmentation replaced
+def reference_spots(df, min_num_samples, max_num_samples, max_gap=SPOT_MAX_GAP):
+    spot_area_num = 1
+    count = 0
+    prev_Time = None
+    spot_area_nums = []
+
+    for index, row in df.iterrows():
+        if row['Bad Throughput'] == 1:
+            if prev_Time is None or count >= max_num_samples or (row[TIMESTAMP_COLUMN] - prev_Time > max_gap):
+                spot_area_num += 1
+                count = 0
+            spot_area_nums.append(spot_area_num)
+            prev_Time = row[TIMESTAMP_COLUMN]
+            count += 1
+        else:
+            spot_area_nums.append(0)
+
+    spots = pd.Series(spot_area_nums, index=df.index)
+    group_sizes = spots.value_counts()
+    invalid_groups = group_sizes[group_sizes < min_num_samples].index
+    spots = spots.apply(lambda x: 0 if x in invalid_groups else x)
+    unique_spots = spots[spots > 0].unique()
+    spot_mapping = {old: new for new, old in enumerate(unique_spots, start=1)}
+    return spots.map(lambda x: spot_mapping.get(x, 0)).tolist()
+
+# Function to build samples from their bad-throughput flags and the seconds since the previous sample
+def make_samples(bad, steps):
+    times = pd.Timestamp("2024-05-01 10:00:00") + pd.to_timedelta(np.cumsum(steps), unit='s')
+    return pd.DataFrame({TIMESTAMP_COLUMN: times, 'Bad Throughput': np.asarray(bad, dtype=int)})
+
+# Function to build random samples, with steps around the maximum gap between two samples of a spot
+def make_random_samples(seed, n=600):
+    rng = np.random.default_rng(seed)
+    bad = rng.random(n) < 0.7
+    steps = rng.choice([0.5, 1.0, 2.0, 4.0, 4.001, 5.0, 30.0], size=n, p=[0.2, 0.4, 0.15, 0.1, 0.05, 0.05, 0.05])
+    return make_samples(bad, steps)
+
+EDGE_CASES = {
+    # 25 bad samples 1 s apart: split every MAX_NUM_SAMPLES samples
+    'max_split': make_samples([1] * 25, [1.0] * 25),
+    # Steps of exactly 4 s stay in the spot, longer ones open a new spot
+    'gaps': make_samples([1] * 12, [1.0, 4.0, 4.0, 4.001, 1.0, 1.0, 5.0, 1.0, 4.0, 60.0, 1.0, 1.0]),
+    # Good samples between bad ones only count through the time since the last bad sample
+    'interleaved': make_samples([1, 0, 0, 1, 0, 1, 1, 0, 1, 1, 1, 0, 1], [1.0, 2.0, 2.0, 1.0, 1.0, 1.0, 3.0, 3.0, 1.0, 1.0, 1.0, 1.0, 1.0]),
+    # Spots with fewer than MIN_NUM_SAMPLES samples, around valid ones
+    'small_groups': make_samples([1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1], [1.0, 1.0, 1.0, 10.0, 1.0, 1.0, 10.0, 1.0, 10.0, 1.0, 1.0, 1.0, 10.0]),
+    'no_bad_samples': make_samples([0] * 5, [1.0] * 5),
+}
+
+# Function to segment the samples chunk by chunk, as the streamed and campaign paths do
+def stream_spots(df, min_num_samples, max_num_samples, chunk_sizes):
+    state = DriveTestStreamState()
+    bounds = np.cumsum([0] + list(chunk_sizes))
+    frames = [segment_stream_chunk(df.iloc[start:end].copy(), min_num_samples, max_num_samples, state, final=end >= len(df))
+              for start, end in zip(bounds[:-1], bounds[1:])]
+    return pd.concat(frames)['Spot_Area_Num'].tolist()
+
+@pytest.mark.parametrize("case", sorted(EDGE_CASES))
+@pytest.mark.parametrize("min_num_samples, max_num_samples", [(3, 10), (1, 4), (5, 5)])
+def test_spots_match_the_reference_loop(case, min_num_samples, max_num_samples):
+    df = EDGE_CASES[case]
+    expected = reference_spots(df, min_num_samples, max_num_samples)
+
+    assert assign_spots_area_num(df.copy(), min_num_samples, max_num_samples)['Spot_Area_Num'].tolist() == expected
+    for chunk_size in (1, 3, len(df)):
+        chunk_sizes = [chunk_size] * (len(df) // chunk_size + 1)
+        assert stream_spots(df, min_num_samples, max_num_samples, chunk_sizes) == expected
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_spots_match_the_reference_loop(seed):
+    rng = np.random.default_rng(seed)
+    df = make_random_samples(seed)
+    min_num_samples, max_num_samples = int(rng.integers(1, 6)), int(rng.integers(4, 30))
+    expected = reference_spots(df, min_num_samples, max_num_samples)
+
+    assert assign_spots_area_num(df.copy(), min_num_samples, max_num_samples)['Spot_Area_Num'].tolist() == expected
+    chunk_sizes = rng.integers(1, 80, size=len(df))
+    assert stream_spots(df, min_num_samples, max_num_samples, chunk_sizes) == expected
+
+def test_missing_timestamps_match_the_reference_loop():
+    df = make_random_samples(7, n=200)
+    df.loc[df.sample(frac=0.1, random_state=7).index, TIMESTAMP_COLUMN] = pd.NaT
+    expected = reference_spots(df, 3, 10)
+    assert assign_spots_area_num(df.copy(), 3, 10)['Spot_Area_Num'].tolist() == expected
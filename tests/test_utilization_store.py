@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from Utilization_Store import CELL_NAME_COLUMN, HOUR_COLUMN, UTILIZATION_COLUMN, UtilizationStore
+
+# Function to build a store with two hours of cell A and one hour of cell B
+def make_store():
+    return UtilizationStore(pd.DataFrame({
+        CELL_NAME_COLUMN: ['A', 'B', 'A'],
+        HOUR_COLUMN: pd.to_datetime(['2024-01-15 10:00', '2024-01-15 10:00', '2024-01-15 11:00']),
+        UTILIZATION_COLUMN: [50.0, 20.0, 90.0]
+    }))
+
+def test_lookup_at_the_hour_of_each_sample():
+    times = pd.Series(pd.to_datetime(['2024-01-15 10:30', '2024-01-15 11:05', '2024-01-15 10:59', '2024-01-15 10:10']))
+    utilization = make_store().lookup(['A', 'A', 'B', 'C'], times)
+    np.testing.assert_array_equal(utilization, [50.0, 90.0, 20.0, np.nan])
+
+def test_samples_at_the_end_of_the_reported_hour():
+    times = pd.Series(pd.to_datetime(['2024-01-15 11:00', '2024-01-15 11:00', '2024-01-15 12:00']))
+    times[0] -= pd.Timedelta(1, unit='ns')
+    # B reports 10:00 only and A reports up to 11:00: the start of the next hour is outside the report
+    np.testing.assert_array_equal(make_store().lookup(['B', 'B', 'A'], times), [20.0, np.nan, np.nan])
+
+def test_samples_outside_the_reported_hours():
+    store = make_store()
+    times = pd.Series(pd.to_datetime(['2024-01-15 13:30', '2024-01-15 09:00', None]))
+    np.testing.assert_array_equal(store.lookup(['A', 'B', 'A'], times), [np.nan, np.nan, np.nan])
+    # Busy-hour values only when requested
+    np.testing.assert_array_equal(store.lookup(['A', 'B', 'A'], times, busy_hour_fallback=True), [90.0, 20.0, 90.0])
+
+def test_flat_sheet_uses_the_value_of_the_cell():
+    store = UtilizationStore(pd.DataFrame({CELL_NAME_COLUMN: ['A', 'B'], HOUR_COLUMN: pd.NaT, UTILIZATION_COLUMN: [50.0, 20.0]}))
+    np.testing.assert_array_equal(store.lookup(['B', 'A', 'C'], pd.Series(pd.to_datetime(['2024-01-15 10:00'] * 3))), [20.0, 50.0, np.nan])